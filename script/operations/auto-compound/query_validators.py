@@ -37,6 +37,7 @@ import argparse
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List
 
@@ -51,11 +52,15 @@ from utils.validator_utils import (
     list_operators,
     query_validators,
     fetch_beacon_state,
-    calculate_sweep_time,
+    load_validator_registry,
+    fetch_pending_partials,
+    calculate_sweep_times,
     format_duration,
     filter_consolidated_validators,
     spread_validators_across_queue,
     pick_representative_validators,
+    set_beacon_concurrency,
+    DEFAULT_BEACON_CONCURRENCY,
 )
 
 
@@ -200,6 +205,12 @@ def main():
         default='https://beaconcha.in/api/v1',
         help='Beacon chain API base URL (default: https://beaconcha.in/api/v1)'
     )
+    parser.add_argument(
+        '--beacon-concurrency',
+        type=int,
+        default=DEFAULT_BEACON_CONCURRENCY,
+        help=f'Beacon API requests in flight at once, across all stages (default: {DEFAULT_BEACON_CONCURRENCY}, 1 = sequential)'
+    )
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -217,6 +228,11 @@ def main():
         default=6,
         help='Bucket size in hours for sweep time distribution (default: 6)'
     )
+    parser.add_argument(
+        '--validator-registry',
+        help='Validator registry snapshot (.json beacon API response or .npz) for the exact sweep '
+             'simulation (default: cached bulk fetch from BEACON_NODE_URL, else the linear estimate)'
+    )
     
     args = parser.parse_args()
 
@@ -226,6 +242,12 @@ def main():
         print("Bucket hours must be greater than 0 to avoid division by zero errors.")
         sys.exit(1)
 
+    if args.beacon_concurrency < 1:
+        print(f"Error: --beacon-concurrency must be at least 1, got {args.beacon_concurrency}")
+        sys.exit(1)
+    # Background stages and batch pools share this one limit on beacon requests
+    set_beacon_concurrency(args.beacon_concurrency)
+
     try:
         conn = get_db_connection()
     except ValueError as e:
@@ -236,6 +258,9 @@ def main():
         print(f"Database connection error: {e}")
         sys.exit(1)
     
+    # Background stage for the beacon sweep state, which does not depend on the query
+    stages = ThreadPoolExecutor(max_workers=1)
+    
     try:
         if args.list_operators:
             operators = list_operators(conn)
@@ -267,6 +292,13 @@ def main():
         # Query all validators for the operator, then filter and limit after
         # This ensures we get exactly the right number of non-consolidated validators
         MAX_VALIDATORS_QUERY = 100000
+        beacon_state_future = None
+        registry_future = None
+        partials_future = None
+        if not args.include_consolidated and args.use_sweep_bucketing:
+            beacon_state_future = stages.submit(fetch_beacon_state)
+            registry_future = stages.submit(load_validator_registry, args.validator_registry)
+            partials_future = stages.submit(fetch_pending_partials)
         query_count = MAX_VALIDATORS_QUERY if not args.include_consolidated else args.count
         
         print(f"Querying validators for {operator_name} ({operator})")
@@ -296,7 +328,8 @@ def main():
                 validators,
                 exclude_consolidated=True,
                 beacon_api=args.beacon_api,
-                show_progress=True
+                show_progress=True,
+                max_workers=args.beacon_concurrency
             )
             
             print(f"\nFiltered results:")
@@ -316,34 +349,36 @@ def main():
 
                 try:
                     # Fetch beacon chain state for sweep calculations
-                    beacon_state = fetch_beacon_state()
+                    beacon_state = beacon_state_future.result()
                     sweep_index = beacon_state['next_withdrawal_validator_index']
                     total_validators = beacon_state['validator_count']
 
                     print(f"  Sweep index: {sweep_index:,}")
                     print(f"  Total validators: {total_validators:,}")
 
-                    # Calculate sweep times for all validators
-                    print("  Calculating sweep times...")
+                    # Calculate sweep times for all validators in one pass; with the full
+                    # registry the sweep is simulated exactly instead of estimated linearly
+                    registry = registry_future.result()
+                    print("  Calculating sweep times" + (" (registry simulation)..." if registry is not None else "..."))
+                    indexed = [v for v in filtered_validators if v.get('index') is not None]
+                    excluded_count = len(filtered_validators) - len(indexed)
+                    sweep_infos = calculate_sweep_times(
+                        [int(v['index']) for v in indexed], sweep_index, total_validators,
+                        registry=registry, pending_partials=partials_future.result()
+                    )
                     sweep_results = []
-                    excluded_count = 0
-                    for validator in filtered_validators:
-                        validator_index = validator.get('index')
-                        if validator_index is not None:
-                            sweep_info = calculate_sweep_time(validator_index, sweep_index, total_validators)
-                            sweep_results.append({
-                                'pubkey': validator['pubkey'],
-                                'validatorIndex': validator['id'],  # Use id as validatorIndex for compatibility
-                                'nodeAddress': validator.get('etherfi_node', 'unknown'),
-                                'balance': '0.00',  # Not available in current data
-                                'secondsUntilSweep': sweep_info['secondsUntilSweep'],
-                                'estimatedSweepTime': sweep_info['estimatedSweepTime'],
-                                'positionInQueue': sweep_info['positionInQueue'],
-                                # Include original validator data
-                                **validator
-                            })
-                        else:
-                            excluded_count += 1
+                    for validator, sweep_info in zip(indexed, sweep_infos):
+                        sweep_results.append({
+                            'pubkey': validator['pubkey'],
+                            'validatorIndex': validator['id'],  # Use id as validatorIndex for compatibility
+                            'nodeAddress': validator.get('etherfi_node', 'unknown'),
+                            'balance': '0.00',  # Not available in current data
+                            'secondsUntilSweep': sweep_info['secondsUntilSweep'],
+                            'estimatedSweepTime': sweep_info['estimatedSweepTime'],
+                            'positionInQueue': sweep_info['positionInQueue'],
+                            # Include original validator data
+                            **validator
+                        })
 
                     # Sort by sweep time
                     sweep_results.sort(key=lambda x: x['secondsUntilSweep'])
@@ -482,6 +517,7 @@ def main():
         write_output(validators, args.output, operator_name)
         
     finally:
+        stages.shutdown(wait=False, cancel_futures=True)
         conn.close()
 
 
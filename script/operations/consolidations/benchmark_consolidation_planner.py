@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+benchmark_consolidation_planner.py - Benchmark the consolidation planner core
+
+Generates a synthetic operator (0x01 sources spread over EigenPods plus existing
+0x02 targets with random balances), runs the Step 4 planner core from
+query_validators_consolidation.py and reports wall-clock time.
+
+The original rescanning implementation is kept here as a reference. On a
+smaller fleet the script checks that both produce exactly the same plan
+(same targets, same sources in the same order, same balances).
+
+Usage:
+    python3 benchmark_consolidation_planner.py
+    python3 benchmark_consolidation_planner.py --validators 100000 --pods 20
+    python3 benchmark_consolidation_planner.py --verify-validators 2000 --seed 7
+    python3 benchmark_consolidation_planner.py --validators 300000 --pods 300 --workers 0
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add the parent directory to sys.path to enable absolute imports
+parent_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from query_validators_consolidation import (
+    BATCH_SIZE,
+    DEFAULT_MAX_TARGET_BALANCE,
+    calculate_consolidation_capacity,
+    get_validator_balance_eth,
+    build_validator_to_bucket,
+    build_consolidation_batches,
+)
+
+
+# =============================================================================
+# Synthetic Data
+# =============================================================================
+
+def generate_fleet(num_validators: int, num_pods: int, seed: int) -> Dict[str, List[Dict]]:
+    """
+    Generate validators grouped by EigenPod.
+
+    About 2% of validators are existing 0x02 targets with random balances.
+    About 10% of 0x01 validators carry a non-default balance so that the
+    overflow checks are exercised; the rest use the 32 ETH default.
+    """
+    rng = random.Random(seed)
+    wc_groups = {}
+    pods = [f"{rng.getrandbits(160):040x}" for _ in range(num_pods)]
+
+    for i in range(num_validators):
+        wc = pods[rng.randrange(num_pods)]
+        v = {
+            'id': i,
+            'pubkey': f"0x{rng.getrandbits(384):096x}",
+            'withdrawal_credentials': f"0x01{'0' * 22}{wc}",
+            'index': i,
+        }
+        roll = rng.random()
+        if roll < 0.02:
+            v['_is_existing_target'] = True
+            v['balance_eth'] = rng.choice([32.0, 64.0, 500.0, 1200.0, 1850.0, 1890.0, 2000.0])
+        elif roll < 0.12:
+            v['balance_eth'] = round(rng.uniform(31.5, 33.0), 6)
+        wc_groups.setdefault(wc, []).append(v)
+
+    return wc_groups
+
+
+# =============================================================================
+# Reference Implementation (original rescanning loop)
+# =============================================================================
+
+def reference_plan(
+    wc_groups: Dict[str, List[Dict]],
+    count: int,
+    max_target_balance: float,
+    validator_to_bucket: Dict[str, int]
+) -> List[Dict]:
+    """Original Step 4 loop from create_consolidation_plan (O(n^2) per pod)."""
+    consolidations = []
+    total_sources = 0
+    used_target_pubkeys = set()
+
+    for wc_address, wc_validators in wc_groups.items():
+        if total_sources >= count:
+            break
+
+        source_candidates = [v for v in wc_validators if not v.get('_is_existing_target')]
+        if not source_candidates:
+            continue
+
+        available_validators = sorted(wc_validators, key=lambda v: (
+            0 if v.get('_is_existing_target') else 1,
+            get_validator_balance_eth(v)
+        ))
+
+        while total_sources < count and \
+              any(not v.get('_is_existing_target') for v in available_validators) and \
+              len(available_validators) >= 2:
+            target = None
+            target_idx = None
+            for idx, candidate in enumerate(available_validators):
+                candidate_pubkey = candidate.get('pubkey', '').lower()
+                if candidate_pubkey not in used_target_pubkeys:
+                    candidate_balance = get_validator_balance_eth(candidate)
+                    candidate_capacity = calculate_consolidation_capacity(candidate_balance, max_target_balance)
+                    if candidate_capacity > 0:
+                        target = candidate
+                        target_idx = idx
+                        break
+
+            if target is None:
+                break
+
+            target_pubkey = target.get('pubkey', '').lower()
+            target_balance = get_validator_balance_eth(target)
+            bucket_idx = validator_to_bucket.get(target_pubkey, 0)
+            used_target_pubkeys.add(target_pubkey)
+
+            sources_pool = [v for i, v in enumerate(available_validators)
+                            if i != target_idx and not v.get('_is_existing_target')]
+
+            batch_sources = []
+            running_balance = target_balance
+            batch_limit = BATCH_SIZE - 1
+
+            for source in sources_pool:
+                if len(batch_sources) >= batch_limit:
+                    break
+                if total_sources + len(batch_sources) >= count:
+                    break
+                source_balance = get_validator_balance_eth(source)
+                new_balance = running_balance + source_balance
+                if new_balance <= max_target_balance:
+                    batch_sources.append(source)
+                    running_balance = new_balance
+
+            if not batch_sources:
+                available_validators = [v for v in available_validators if v.get('pubkey', '').lower() != target_pubkey]
+                continue
+
+            sources = [target] + batch_sources
+            consolidations.append({
+                'target': target,
+                'target_balance_eth': target_balance,
+                'sources': sources,
+                'source_total_eth': sum(get_validator_balance_eth(s) for s in sources),
+                'post_consolidation_balance_eth': running_balance,
+                'bucket_index': bucket_idx,
+                'wc_address': wc_address
+            })
+            total_sources += len(batch_sources)
+
+            used_pubkeys = {s.get('pubkey', '').lower() for s in sources}
+            available_validators = [v for v in available_validators if v.get('pubkey', '').lower() not in used_pubkeys]
+
+    return consolidations
+
+
+def indexed_plan(
+    wc_groups: Dict[str, List[Dict]],
+    count: int,
+    max_target_balance: float,
+    validator_to_bucket: Dict[str, int],
+    workers: int = 1
+) -> List[Dict]:
+    """Step 4 as run by create_consolidation_plan."""
+    consolidations, _, _ = build_consolidation_batches(
+        list(wc_groups), wc_groups, count, max_target_balance,
+        validator_to_bucket, workers=workers
+    )
+    return consolidations
+
+
+def plan_fingerprint(consolidations: List[Dict]) -> List[tuple]:
+    """Comparable representation of a plan."""
+    return [
+        (
+            c['wc_address'],
+            tuple(s['pubkey'] for s in c['sources']),
+            c['target_balance_eth'],
+            c['source_total_eth'],
+            c['post_consolidation_balance_eth'],
+            c['bucket_index'],
+        )
+        for c in consolidations
+    ]
+
+
+# =============================================================================
+# Main Entry Point
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the consolidation planner core')
+    parser.add_argument('--validators', type=int, default=100000,
+                        help='Validators in the timed run (default: 100000)')
+    parser.add_argument('--pods', type=int, default=20,
+                        help='EigenPods in the synthetic operator (default: 20)')
+    parser.add_argument('--verify-validators', type=int, default=20000,
+                        help='Validators in the reference comparison run (default: 20000, 0 = skip)')
+    parser.add_argument('--max-target-balance', type=float, default=DEFAULT_MAX_TARGET_BALANCE,
+                        help=f'Maximum target balance (default: {DEFAULT_MAX_TARGET_BALANCE})')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for the timed run (default: 1 = serial, 0 = all cores)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    args = parser.parse_args()
+
+    # Bucket indices do not affect batch selection; a simple mapping is enough
+    validator_to_bucket = build_validator_to_bucket([])
+
+    if args.verify_validators > 0:
+        print(f"Verifying against reference implementation ({args.verify_validators:,} validators)...")
+        for count in (args.verify_validators, args.verify_validators // 3, 1):
+            wc_groups = generate_fleet(args.verify_validators, max(1, args.pods // 4), args.seed)
+            start = time.perf_counter()
+            expected = reference_plan(wc_groups, count, args.max_target_balance, validator_to_bucket)
+            reference_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            actual = indexed_plan(wc_groups, count, args.max_target_balance, validator_to_bucket)
+            indexed_seconds = time.perf_counter() - start
+
+            if plan_fingerprint(expected) != plan_fingerprint(actual):
+                print(f"  ✗ Plans differ for count={count}")
+                sys.exit(1)
+            print(f"  ✓ count={count:<8} {len(actual):>6} batches   "
+                  f"reference {reference_seconds:8.3f}s   indexed {indexed_seconds:8.3f}s")
+
+    print(f"\nTimed run ({args.validators:,} validators across {args.pods} EigenPods)...")
+    wc_groups = generate_fleet(args.validators, args.pods, args.seed)
+    start = time.perf_counter()
+    consolidations = indexed_plan(wc_groups, args.validators, args.max_target_balance, validator_to_bucket)
+    elapsed = time.perf_counter() - start
+
+    total_sources = sum(len(c['sources']) - 1 for c in consolidations)
+    print(f"  Batches:  {len(consolidations):,}")
+    print(f"  Sources:  {total_sources:,}")
+    print(f"  Serial:   {elapsed:.3f}s")
+
+    if args.workers != 1:
+        start = time.perf_counter()
+        parallel = indexed_plan(
+            wc_groups, args.validators, args.max_target_balance, validator_to_bucket, workers=args.workers
+        )
+        parallel_elapsed = time.perf_counter() - start
+        if plan_fingerprint(parallel) != plan_fingerprint(consolidations):
+            print(f"  ✗ Parallel plan differs from serial plan")
+            sys.exit(1)
+        print(f"  Parallel: {parallel_elapsed:.3f}s (identical plan)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+"""
+fleet_liquidity.py - Raise an ETH amount across all operators in one plan
+
+Combines the two withdrawal paths that unrestake_validators.py and
+submarine_withdrawal.py plan operator by operator:
+
+  - Unrestake:  queueETHWithdrawal directly from a pod's unqueued balance
+  - Submarine:  consolidate sources into a target, let the beacon chain sweep
+                the excess above 2048 ETH, then queueETHWithdrawal
+
+Flow:
+  1. One database query for every active validator in the fleet
+  2. Pending withdrawals for every node via batched JSON-RPC eth_calls
+  3. Per pod: unrestake economics (evaluate_pod_unrestake) and submarine
+     economics (evaluate_pod + real balances), both capped by unqueued ETH
+  4. One knapsack over all pods picks the cheapest mix of actions
+     (fewest transactions, then least overshoot)
+  5. One combined transaction set
+
+Usage:
+    python3 fleet_liquidity.py --amount 20000 --dry-run
+    python3 fleet_liquidity.py --amount 20000
+    python3 fleet_liquidity.py --amount 5000 --operator "Cosmostation" --operator "Infstones"
+    python3 fleet_liquidity.py --amount 20000 --unrestake-cost 3
+
+Environment Variables:
+    VALIDATOR_DB: PostgreSQL connection string for validator database
+    MAINNET_RPC_URL: Ethereum mainnet RPC URL (pending withdrawals, link checks)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add parent directory to sys.path for absolute imports
+parent_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from utils.validator_utils import (
+    get_db_connection,
+    get_operator_address,
+    load_operators_from_db,
+    fetch_validator_details_batch,
+)
+
+from query_validators_consolidation import (
+    group_by_withdrawal_credentials,
+    is_consolidated_credentials,
+)
+
+from submarine_withdrawal import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_FEE,
+    MIN_WITHDRAWAL_AMOUNT,
+    apply_withdrawal_hotfix,
+    build_pod_withdrawal_profile,
+    collect_src0_ids_and_pubkeys,
+    count_submarine_transactions,
+    evaluate_pod,
+    evaluate_pod_unrestake,
+    filter_unlinked_validators,
+    generate_consolidation_batches,
+    plan_from_withdrawal_profiles,
+    write_linking_transaction,
+    write_transaction_files,
+)
+
+from unrestaking.unrestake_validators import (
+    get_pending_withdrawals_batch,
+    write_transactions as write_queue_withdrawals,
+)
+
+from generate_gnosis_txns import (
+    ADMIN_EOA,
+    DEFAULT_CHAIN_ID,
+)
+
+
+# =============================================================================
+# Fleet Data
+# =============================================================================
+
+def query_fleet_validators(conn, operator_addresses: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Query every active validator in the latest snapshot in one round trip.
+
+    Balances come from the database (wei); 0x02 status from the stored
+    withdrawal credentials. Use --beacon-balances to refresh both.
+    """
+    query = """
+        SELECT
+            pubkey,
+            id,
+            withdrawal_credentials,
+            index,
+            node_address,
+            operator,
+            balance
+        FROM "etherfi_validators"
+        WHERE timestamp = (SELECT MAX(timestamp) FROM "etherfi_validators")
+          AND status = 'active_ongoing'
+          AND operator IS NOT NULL
+    """
+    params = []
+    if operator_addresses:
+        query += " AND LOWER(operator) = ANY(%s)"
+        params.append(operator_addresses)
+    query += " ORDER BY id"
+
+    validators = []
+    with conn.cursor() as cur:
+        cur.execute(query, params)
+        for pubkey, vid, wc, index, node_address, operator, balance in cur.fetchall():
+            if pubkey and not pubkey.startswith('0x'):
+                pubkey = '0x' + pubkey
+            if wc and not wc.startswith('0x'):
+                wc = '0x' + wc
+            v = {
+                'id': vid,
+                'pubkey': pubkey,
+                'withdrawal_credentials': wc,
+                'etherfi_node': node_address,
+                'index': index,
+                'operator': operator.lower(),
+                'is_consolidated': is_consolidated_credentials(wc),
+            }
+            if balance:
+                v['balance_eth'] = int(balance) / 1e18
+            validators.append(v)
+    return validators
+
+
+def refresh_from_beacon(validators: List[Dict], beacon_api: str):
+    """Overwrite balances and 0x02 status with beacon chain data (as submarine_withdrawal does)."""
+    pubkeys = [v['pubkey'] for v in validators if v.get('pubkey')]
+    details = fetch_validator_details_batch(pubkeys, beacon_api=beacon_api)
+    for v in validators:
+        d = details.get(v.get('pubkey', ''))
+        if not d:
+            continue
+        v['beacon_balance_eth'] = d['balance_eth']
+        v['beacon_effective_balance_eth'] = d.get('effective_balance_eth', d['balance_eth'])
+        if d['is_consolidated'] is not None:
+            v['is_consolidated'] = d['is_consolidated']
+        if d['validator_index'] is not None:
+            v['validator_index'] = d['validator_index']
+
+
+# =============================================================================
+# Pod Evaluation
+# =============================================================================
+
+def build_fleet_profiles(
+    wc_groups: Dict[str, List[Dict]],
+    pending_by_node: Dict[str, float],
+    sources_per_tx: int,
+    unrestake_cost: int,
+    paths: str,
+) -> List[Dict]:
+    """
+    Withdrawal options for every pod, both paths, capped by unqueued ETH.
+
+    Option (0, 0, x) is a direct unrestake of up to x ETH; (t, low, high) is a
+    submarine withdrawal using t consolidation transactions.
+    """
+    evaluations = [evaluate_pod(wc, vals) for wc, vals in wc_groups.items()]
+    apply_withdrawal_hotfix(evaluations)
+
+    profiles = []
+    for pod_eval in evaluations:
+        wc_address = pod_eval['wc_address']
+        pod_validators = wc_groups[wc_address]
+        node_address = pod_validators[0].get('etherfi_node')
+        pending = pending_by_node.get(node_address, 0.0)
+        available = max(0.0, pod_eval['total_eth'] - pending)
+        cap = min(pod_eval.get('withdrawal_cap_eth', float('inf')), available)
+
+        unrestake_eval = evaluate_pod_unrestake(wc_address, pod_validators)
+        unrestake_eval['node_address'] = node_address
+        unrestake_eval['pending_withdrawal_eth'] = pending
+        unrestake_eval['available_eth'] = available
+
+        options = []
+        if paths in ('all', 'unrestake'):
+            unrestake_max = min(unrestake_eval['max_withdrawal_eth'], cap)
+            if unrestake_max > 0:
+                options.append((0, 0.0, unrestake_max))
+
+        profile = {'pod_eval': pod_eval, 'target': pod_eval['target'], 'options': options}
+        if paths in ('all', 'submarine') and pod_eval['target'] is not None:
+            pod_eval['withdrawal_cap_eth'] = cap
+            profile = build_pod_withdrawal_profile(pod_eval, pod_validators, sources_per_tx)
+            profile['options'] = options + profile['options']
+
+        if not node_address:
+            # queueETHWithdrawal needs the node; skip pods the database has no node for
+            profile['options'] = []
+        profile['unrestake_eval'] = unrestake_eval
+        profile['unrestake_cost'] = unrestake_cost
+        profile['operator'] = pod_validators[0].get('operator')
+        profile['node_address'] = node_address
+        profiles.append(profile)
+
+    return profiles
+
+
+def summarize_by_operator(selections: List[Dict], address_to_name: Dict[str, str]) -> List[Dict]:
+    """Withdrawal and action counts per operator, largest first."""
+    by_operator = {}
+    for sel in selections:
+        op = by_operator.setdefault(sel['operator'], {
+            'operator': address_to_name.get(sel['operator'], 'Unknown'),
+            'operator_address': sel['operator'],
+            'unrestake_pods': 0,
+            'submarine_pods': 0,
+            'withdrawal_eth': 0.0,
+        })
+        op[f"{sel['action']}_pods"] += 1
+        op['withdrawal_eth'] += sel['withdrawal_eth']
+    return sorted(by_operator.values(), key=lambda o: o['withdrawal_eth'], reverse=True)
+
+
+# =============================================================================
+# Output Generation
+# =============================================================================
+
+def write_fleet_plan(
+    selections: List[Dict],
+    all_batches: List[Dict],
+    operators: List[Dict],
+    amount_eth: float,
+    total_withdrawal: float,
+    output_dir: str,
+    needs_linking: bool,
+) -> str:
+    """Write fleet-liquidity-plan.json with per-pod actions and execution order."""
+    unrestake = [s for s in selections if s['action'] == 'unrestake']
+    submarine = [s for s in selections if s['action'] == 'submarine']
+
+    pods_info = []
+    for sel in selections:
+        pe = sel['pod_eval']
+        pods_info.append({
+            'action': sel['action'],
+            'operator': sel['operator'],
+            'eigenpod': f"0x{pe['wc_address']}",
+            'node_address': sel['node_address'],
+            'target_pubkey': sel['target'].get('pubkey', ''),
+            'target_id': sel['target'].get('id'),
+            'num_sources': sel['num_sources'],
+            'withdrawal_eth': sel['withdrawal_eth'],
+        })
+
+    plan = {
+        'type': 'fleet_liquidity',
+        'requested_amount_eth': amount_eth,
+        'total_withdrawal_eth': total_withdrawal,
+        'operators': operators,
+        'pods': pods_info,
+        'transactions': {
+            'linking': 1 if needs_linking else 0,
+            'consolidation': len(all_batches),
+            'queue_withdrawals': len(selections),
+            'total': (1 if needs_linking else 0) + len(all_batches) + len(selections),
+        },
+        'files': {
+            'queue_withdrawals': 'queue-withdrawals.json' if unrestake else None,
+            'link_validators': 'link-validators.json' if needs_linking else None,
+            'consolidation_txns': [f'consolidation-txns-{b["tx_index"]}.json' for b in all_batches],
+            'post_sweep_queue_withdrawals': 'post-sweep/queue-withdrawals.json' if submarine else None,
+        },
+        'execution_order': fleet_execution_order(unrestake, all_batches, needs_linking),
+        'generated_at': datetime.now().isoformat(),
+    }
+
+    filepath = os.path.join(output_dir, 'fleet-liquidity-plan.json')
+    with open(filepath, 'w') as f:
+        json.dump(plan, f, indent=2, default=str)
+    return filepath
+
+
+def fleet_execution_order(unrestake: List[Dict], all_batches: List[Dict], needs_linking: bool) -> List[str]:
+    steps = []
+    if unrestake:
+        steps.append("Execute queue-withdrawals.json from ADMIN_EOA (direct unrestake)")
+    if needs_linking:
+        steps.append("Execute link-validators.json from ADMIN_EOA")
+    for b in all_batches:
+        steps.append(f"Execute consolidation-txns-{b['tx_index']}.json from ADMIN_EOA")
+    if all_batches:
+        steps.append("Wait for beacon chain consolidation + sweep (excess above 2048 ETH is auto-withdrawn)")
+        steps.append("Execute post-sweep/queue-withdrawals.json from ADMIN_EOA")
+    steps.append("Wait for EigenLayer withdrawal delay, then completeQueuedETHWithdrawals")
+    return [f"{i}. {step}" for i, step in enumerate(steps, start=1)]
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Raise an ETH amount across all operators with unrestake and submarine withdrawals',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Preview the cheapest fleet-wide plan for 20k ETH
+  python3 fleet_liquidity.py --amount 20000 --dry-run
+
+  # Generate the combined transaction set
+  python3 fleet_liquidity.py --amount 20000
+
+  # Restrict to some operators
+  python3 fleet_liquidity.py --amount 5000 --operator "Cosmostation" --operator "Infstones"
+
+  # Treat a direct unrestake as 3 transactions' worth of cost (prefer consolidation)
+  python3 fleet_liquidity.py --amount 20000 --unrestake-cost 3
+
+  # Submarine path only, balances refreshed from the beacon chain
+  python3 fleet_liquidity.py --amount 20000 --paths submarine --beacon-balances
+        """
+    )
+    parser.add_argument('--amount', type=float, required=True, help='ETH amount to raise')
+    parser.add_argument('--operator', action='append',
+                        help='Operator name or address (repeatable; default: all operators)')
+    parser.add_argument('--paths', choices=['all', 'unrestake', 'submarine'], default='all',
+                        help='Withdrawal paths to consider (default: all)')
+    parser.add_argument('--unrestake-cost', type=int, default=1,
+                        help='Transaction-equivalent cost of one direct unrestake (default: 1)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Validators per consolidation tx including target at [0] (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--fee', type=int, default=DEFAULT_FEE,
+                        help=f'Fee per consolidation request in wei (default: {DEFAULT_FEE})')
+    parser.add_argument('--ignore-pending-withdrawals', action='store_true',
+                        help='Skip pending withdrawal check, treat full balance as available')
+    parser.add_argument('--beacon-balances', action='store_true',
+                        help='Refresh balances and 0x02 status from the beacon chain (slow for the whole fleet)')
+    parser.add_argument('--beacon-api', default='https://beaconcha.in/api/v1',
+                        help='Beacon chain API base URL')
+    parser.add_argument('--output-dir', help='Output directory (auto-generated if omitted)')
+    parser.add_argument('--dry-run', action='store_true', help='Preview plan without writing files')
+
+    args = parser.parse_args()
+
+    if args.amount < MIN_WITHDRAWAL_AMOUNT:
+        print(f"Error: --amount must be at least {MIN_WITHDRAWAL_AMOUNT} ETH")
+        sys.exit(1)
+    if args.unrestake_cost < 1:
+        print(f"Error: --unrestake-cost must be a positive integer, got {args.unrestake_cost}")
+        sys.exit(1)
+    if args.batch_size < 2:
+        print(f"Error: --batch-size must be at least 2, got {args.batch_size}")
+        sys.exit(1)
+
+    try:
+        conn = get_db_connection()
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    try:
+        address_to_name, _ = load_operators_from_db(conn)
+
+        operator_addresses = None
+        if args.operator:
+            operator_addresses = []
+            for name in args.operator:
+                address = get_operator_address(conn, name)
+                if not address:
+                    print(f"Error: Operator '{name}' not found")
+                    sys.exit(1)
+                operator_addresses.append(address)
+
+        print(f"\n{'=' * 60}")
+        print(f"FLEET LIQUIDITY PLANNER")
+        print(f"{'=' * 60}")
+        print(f"Target amount:   {args.amount:,.0f} ETH")
+        print(f"Operators:       {', '.join(args.operator) if args.operator else 'all'}")
+        print(f"Paths:           {args.paths}")
+        if args.paths == 'all':
+            print(f"Unrestake cost:  {args.unrestake_cost} tx")
+        print()
+
+        # ================================================================
+        # Step 1: Query the fleet
+        # ================================================================
+        print("Step 1: Querying validators for the fleet...")
+        validators = query_fleet_validators(conn, operator_addresses)
+        if not validators:
+            print("Error: No active validators found")
+            sys.exit(1)
+        if args.beacon_balances:
+            refresh_from_beacon(validators, args.beacon_api)
+        wc_groups = group_by_withdrawal_credentials(validators)
+        operator_count = len({v['operator'] for v in validators})
+        print(f"  Found {len(validators)} validators in {len(wc_groups)} EigenPods across {operator_count} operator(s)")
+
+        # ================================================================
+        # Step 2: Pending withdrawals
+        # ================================================================
+        rpc_url = os.environ.get('MAINNET_RPC_URL', '')
+        pending_by_node = {}
+        if args.ignore_pending_withdrawals:
+            print("\nStep 2: Skipping pending withdrawal check (--ignore-pending-withdrawals)")
+        elif rpc_url:
+            nodes = list(dict.fromkeys(
+                vals[0].get('etherfi_node') for vals in wc_groups.values() if vals[0].get('etherfi_node')
+            ))
+            print(f"\nStep 2: Checking pending withdrawals for {len(nodes)} node(s)...")
+            pending_by_node = get_pending_withdrawals_batch(nodes, rpc_url)
+            print(f"  Pending: {sum(pending_by_node.values()):,.0f} ETH")
+        else:
+            print("\nStep 2: Skipping pending withdrawal check (MAINNET_RPC_URL not set)")
+
+        # ================================================================
+        # Step 3: Evaluate pods and choose actions
+        # ================================================================
+        print(f"\nStep 3: Choosing actions for {args.amount:,.0f} ETH...")
+        sources_per_tx = args.batch_size - 1
+        profiles = build_fleet_profiles(
+            wc_groups, pending_by_node, sources_per_tx, args.unrestake_cost, args.paths
+        )
+        selections, total_withdrawal = plan_from_withdrawal_profiles(profiles, args.amount, sources_per_tx)
+        if not selections:
+            capacity = sum(max((o[2] for o in p['options']), default=0) for p in profiles)
+            print(f"\n  Error: The fleet can raise at most {capacity:,.0f} ETH with --paths {args.paths}")
+            sys.exit(1)
+
+        by_pod = {p['pod_eval']['wc_address']: p for p in profiles}
+        for sel in selections:
+            profile = by_pod[sel['pod_eval']['wc_address']]
+            sel['operator'] = profile['operator']
+            sel['node_address'] = profile['node_address']
+
+        unrestake = [s for s in selections if s['action'] == 'unrestake']
+        submarine = [s for s in selections if s['action'] == 'submarine']
+        consolidation_txs = count_submarine_transactions(submarine, args.batch_size) - len(submarine)
+        operators = summarize_by_operator(selections, address_to_name)
+
+        # ================================================================
+        # Step 4: Print plan
+        # ================================================================
+        print(f"\n{'=' * 60}")
+        print(f"FLEET LIQUIDITY PLAN")
+        print(f"{'=' * 60}")
+        print(f"Requested amount:        {args.amount:,.0f} ETH")
+        print(f"Total withdrawal:        {total_withdrawal:,.2f} ETH")
+        surplus = total_withdrawal - args.amount
+        if surplus > 0:
+            print(f"Surplus over requested:  {surplus:,.2f} ETH")
+        print(f"Unrestake pods:          {len(unrestake)} ({sum(s['withdrawal_eth'] for s in unrestake):,.2f} ETH)")
+        print(f"Submarine pods:          {len(submarine)} ({sum(s['withdrawal_eth'] for s in submarine):,.2f} ETH)")
+        print(f"Consolidation txs:       {consolidation_txs}")
+        print(f"Queue withdrawal calls:  {len(selections)}")
+
+        print(f"\n  {'Operator':<30} {'Unrestake':>9} {'Submarine':>9} {'Withdrawal':>14}")
+        print(f"  {'-' * 66}")
+        for op in operators:
+            print(f"  {op['operator'][:30]:<30} {op['unrestake_pods']:>9} {op['submarine_pods']:>9} "
+                  f"{op['withdrawal_eth']:>10,.2f} ETH")
+
+        print(f"\n  Planned in {time.perf_counter() - started:.1f}s")
+
+        if args.dry_run:
+            print(f"\n(Dry run - no files written)")
+            return
+
+        # ================================================================
+        # Step 5: Generate the combined transaction set
+        # ================================================================
+        print(f"\nStep 5: Generating output files...")
+
+        if args.output_dir:
+            output_dir = args.output_dir
+        else:
+            script_dir = Path(__file__).resolve().parent
+            timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+            output_dir = str(script_dir / 'txns' / f"fleet_liquidity_{int(args.amount)}eth_{timestamp}")
+        os.makedirs(output_dir, exist_ok=True)
+
+        chain_id = int(os.environ.get('CHAIN_ID', DEFAULT_CHAIN_ID))
+        admin_address = os.environ.get('ADMIN_ADDRESS', ADMIN_EOA)
+
+        # 5a: direct unrestake (executable now)
+        if unrestake:
+            write_queue_withdrawals(
+                [{'node_address': s['node_address'], 'eigenpod': f"0x{s['pod_eval']['wc_address']}",
+                  'withdrawal_eth': s['withdrawal_eth']} for s in unrestake],
+                output_dir, chain_id, admin_address,
+            )
+
+        # 5b: linking + consolidation for submarine pods
+        needs_linking = False
+        all_batches = []
+        if submarine:
+            all_ids, all_pubkeys = collect_src0_ids_and_pubkeys(submarine)
+            if all_ids and rpc_url:
+                print(f"\n  Checking on-chain linking status for {len(all_ids)} src[0] validator(s)...")
+                all_ids, all_pubkeys = filter_unlinked_validators(all_ids, all_pubkeys, rpc_url)
+            if all_ids:
+                link_file = write_linking_transaction(all_ids, all_pubkeys, chain_id, admin_address, output_dir)
+                needs_linking = link_file is not None
+
+            tx_index = 1
+            for sel in submarine:
+                batches = generate_consolidation_batches(
+                    sel['target'], sel['sources'], args.batch_size, args.fee, tx_start_index=tx_index,
+                )
+                all_batches.extend(batches)
+                tx_index += len(batches)
+            for f in write_transaction_files(all_batches, output_dir, chain_id, admin_address):
+                print(f"  Written: {os.path.basename(f)}")
+
+            # 5c: queueETHWithdrawal after the sweep
+            post_sweep_dir = os.path.join(output_dir, 'post-sweep')
+            os.makedirs(post_sweep_dir, exist_ok=True)
+            write_queue_withdrawals(
+                [{'node_address': s['node_address'], 'eigenpod': f"0x{s['pod_eval']['wc_address']}",
+                  'withdrawal_eth': s['withdrawal_eth']} for s in submarine],
+                post_sweep_dir, chain_id, admin_address,
+            )
+
+        # 5d: fleet-liquidity-plan.json
+        write_fleet_plan(
+            selections, all_batches, operators, args.amount, total_withdrawal, output_dir, needs_linking,
+        )
+        print(f"  Written: fleet-liquidity-plan.json")
+
+        print(f"\n{'=' * 60}")
+        print(f"OUTPUT COMPLETE")
+        print(f"{'=' * 60}")
+        print(f"Directory: {output_dir}")
+        print(f"\nExecution order:")
+        for step in fleet_execution_order(unrestake, all_batches, needs_linking):
+            print(f"  {step}")
+        print()
+
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,9 @@ Features:
 - Withdrawal credential grouping: Sources must match target's withdrawal credentials
 - Balance overflow prevention: Targets won't exceed max_target_balance post-consolidation
 - Sweep queue distribution: Ensures consolidations are spread across the withdrawal timeline
+- Optimize mode (--optimize): Bin-packs each EigenPod to minimise targets and transactions
+- Incremental mode (--previous-plan): Keeps an earlier plan's sources and targets, plans only the delta
+- Parameter sweep (--sweep): Compares plans across max target balances and bucket sizes
 
 Usage:
     python3 query_validators_consolidation.py --list-operators
@@ -24,6 +27,12 @@ Examples:
     # Use custom max target balance and bucket interval
     python3 query_validators_consolidation.py --operator "Validation Cloud" --count 50 --max-target-balance 1984 --bucket-hours 12
 
+    # Minimise targets and transactions with the bin-packing optimizer
+    python3 query_validators_consolidation.py --operator "Validation Cloud" --optimize
+
+    # Compare targets, transactions and fees across a parameter grid
+    python3 query_validators_consolidation.py --operator "Validation Cloud" --sweep
+
 Environment Variables:
     VALIDATOR_DB: PostgreSQL connection string for validator database
     BEACON_CHAIN_URL: Beacon chain API URL (default: https://beaconcha.in/api/v1)
@@ -33,10 +42,17 @@ Output:
 """
 
 import argparse
+import io
 import json
+import math
 import os
 import sys
+import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stdout
 from datetime import datetime
+from itertools import combinations
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -52,10 +68,15 @@ from utils.validator_utils import (
     query_validators,
     fetch_beacon_state,
     fetch_validator_details_batch,
-    calculate_sweep_time,
+    load_validator_registry,
+    fetch_pending_partials,
+    calculate_sweep_times,
     filter_consolidated_validators,
     spread_validators_across_queue,
+    set_beacon_concurrency,
+    DEFAULT_BEACON_CONCURRENCY,
 )
+from generate_gnosis_txns import DEFAULT_CONSOLIDATION_FEE
 
 
 # =============================================================================
@@ -67,6 +88,10 @@ DEFAULT_MAX_TARGET_BALANCE = 1900 # ETH
 DEFAULT_SOURCE_BALANCE = 32  # ETH - Standard validator balance
 DEFAULT_BUCKET_HOURS = 6
 BATCH_SIZE=58 # max number of validators that can be consolidated into a target in one transaction
+OPTIMIZE_EXACT_MAX_VALIDATORS = 12  # pods up to this size are solved exactly in --optimize mode
+DEFAULT_MAX_TARGET_BALANCE_GRID = "1856,1900,1984,2016"  # --sweep defaults
+DEFAULT_BUCKET_HOURS_GRID = "3,6,12,24"
+DETAILS_REQUEST_SIZE = 100  # pubkeys per beaconcha.in details request (API maximum)
 
 
 # =============================================================================
@@ -290,40 +315,694 @@ def select_targets_from_buckets(
 
 
 # =============================================================================
-# Consolidation Planning
+# Per-Pod Planner Core
 # =============================================================================
 
-def create_consolidation_plan(
-    validators: List[Dict],
-    count: int,
+def build_validator_to_bucket(buckets: List[Dict]) -> Dict[str, int]:
+    """Map lowercase pubkey -> sweep bucket index."""
+    validator_to_bucket = {}
+    for bucket in buckets:
+        for v in bucket.get('validators', []):
+            pubkey = v.get('pubkey', '')
+            if pubkey:
+                validator_to_bucket[pubkey.lower()] = bucket['bucketIndex']
+    return validator_to_bucket
+
+
+def plan_pod_consolidations(
+    wc_address: str,
+    wc_validators: List[Dict],
+    remaining: int,
     max_target_balance: float,
-    bucket_hours: int,
-    existing_targets: List[Dict] = None
-) -> Dict:
+    used_target_pubkeys: set,
+    validator_to_bucket: Dict[str, int]
+) -> List[Dict]:
     """
-    Create a consolidation plan with targets and sources.
-    
+    Create consolidation batches for a single EigenPod.
+
+    Candidates are ordered once (existing 0x02 targets first, then by balance,
+    lowest first) and consumed through head cursors instead of rescanning and
+    refiltering the pool after every batch:
+    - The target is the first unused candidate with capacity. Capacity only
+      shrinks as balance grows, so candidates past the capacity cut-off are
+      never considered as targets.
+    - Sources are taken from the head of the 0x01 list (skipping the target)
+      until the batch is full, the count is reached, or the next source would
+      overflow max_target_balance. Sources are sorted by balance, so once one
+      overflows every later one would too.
+    - Removed pubkeys are dropped lazily, so duplicate pubkeys behave exactly
+      as in the original filter-by-pubkey loop.
+
     Args:
-        validators: All eligible 0x01 validators (can be targets or sources)
-        count: Number of source validators to consolidate
+        wc_address: EigenPod withdrawal credential address
+        wc_validators: Validators in this pod (0x01 sources + existing 0x02 targets)
+        remaining: Number of sources still needed across the whole plan
         max_target_balance: Maximum ETH balance for targets
-        bucket_hours: Bucket interval for sweep queue distribution
-        existing_targets: Existing 0x02 validators with capacity (target-only, never sources).
-                         Must have 'balance_eth' populated from beacon chain.
+        used_target_pubkeys: Targets already used (shared across pods, updated in place)
+        validator_to_bucket: Lowercase pubkey -> sweep bucket index
 
     Returns:
-        Consolidation plan dictionary
+        List of consolidation dicts for this pod
     """
-    if existing_targets is None:
-        existing_targets = []
+    consolidations = []
+
+    # Need at least 1 source (non-existing-target) + 1 target
+    if remaining <= 0 or all(v.get('_is_existing_target') for v in wc_validators):
+        return consolidations
+
+    balances = [get_validator_balance_eth(v) for v in wc_validators]
+    pubkeys = [v.get('pubkey', '').lower() for v in wc_validators]
+    is_existing = [bool(v.get('_is_existing_target')) for v in wc_validators]
+    has_capacity = [
+        calculate_consolidation_capacity(b, max_target_balance) > 0 for b in balances
+    ]
+
+    # Sort: prefer existing 0x02 targets first (already consolidated, no linking needed),
+    # then by balance (lowest first = more capacity)
+    order = sorted(range(len(wc_validators)), key=lambda i: (0 if is_existing[i] else 1, balances[i]))
+    existing_order = [i for i in order if is_existing[i]]
+    source_order = [i for i in order if not is_existing[i]]
+
+    # Capacity is monotone in balance, so candidates with capacity form a prefix
+    existing_cap_end = sum(1 for i in existing_order if has_capacity[i])
+    source_cap_end = sum(1 for i in source_order if has_capacity[i])
+
+    # Live counts per pubkey let removals by pubkey update pool sizes in O(1)
+    live_by_pubkey = {}
+    live_sources_by_pubkey = {}
+    for i, pk in enumerate(pubkeys):
+        live_by_pubkey[pk] = live_by_pubkey.get(pk, 0) + 1
+        if not is_existing[i]:
+            live_sources_by_pubkey[pk] = live_sources_by_pubkey.get(pk, 0) + 1
+    live_total = len(wc_validators)
+    live_sources = len(source_order)
+    removed = set()
+
+    existing_head = 0
+    source_head = 0
+
+    def find_target(index_order: List[int], head: int, cap_end: int) -> Tuple[Optional[int], int]:
+        # Advance the head past removed entries, then return the first unused candidate
+        while head < cap_end and pubkeys[index_order[head]] in removed:
+            head += 1
+        for pos in range(head, cap_end):
+            i = index_order[pos]
+            if pubkeys[i] not in removed and pubkeys[i] not in used_target_pubkeys:
+                return i, head
+        return None, head
+
+    total_sources = 0
+    batch_limit = BATCH_SIZE - 1  # Reserve 1 slot for target
+
+    # Keep consolidating until we run out of source validators or hit count
+    while total_sources < remaining and live_sources > 0 and live_total >= 2:
+        target_idx, existing_head = find_target(existing_order, existing_head, existing_cap_end)
+        if target_idx is None:
+            target_idx, source_head = find_target(source_order, source_head, source_cap_end)
+        if target_idx is None:
+            break  # No valid target available in this WC group
+
+        target = wc_validators[target_idx]
+        target_pubkey = pubkeys[target_idx]
+        target_balance = balances[target_idx]
+        bucket_idx = validator_to_bucket.get(target_pubkey, 0)
+
+        # Mark target as used
+        used_target_pubkeys.add(target_pubkey)
+
+        # Select sources that fit within max_target_balance limit
+        while source_head < len(source_order) and pubkeys[source_order[source_head]] in removed:
+            source_head += 1
+        batch_limit_now = min(batch_limit, remaining - total_sources)
+        batch_indices = []
+        running_balance = target_balance
+        pos = source_head
+        while pos < len(source_order) and len(batch_indices) < batch_limit_now:
+            i = source_order[pos]
+            pos += 1
+            if i == target_idx or pubkeys[i] in removed:
+                continue
+            new_balance = running_balance + balances[i]
+            if new_balance > max_target_balance:
+                break
+            batch_indices.append(i)
+            running_balance = new_balance
+
+        if batch_indices:
+            batch_sources = [wc_validators[i] for i in batch_indices]
+            sources = [target] + batch_sources
+            consolidations.append({
+                'target': target,
+                'target_balance_eth': target_balance,
+                'sources': sources,
+                # Calculate source total (includes target balance for reporting)
+                'source_total_eth': sum(balances[i] for i in [target_idx] + batch_indices),
+                'post_consolidation_balance_eth': running_balance,
+                'bucket_index': bucket_idx,
+                'wc_address': wc_address
+            })
+            total_sources += len(batch_sources)
+            consumed = [target_pubkey] + [pubkeys[i] for i in batch_indices]
+        else:
+            # Remove target from available and try next
+            consumed = [target_pubkey]
+
+        for pk in consumed:
+            if pk not in removed:
+                removed.add(pk)
+                live_total -= live_by_pubkey.get(pk, 0)
+                live_sources -= live_sources_by_pubkey.get(pk, 0)
+
+    return consolidations
 
-    print(f"\n=== Creating Consolidation Plan ===")
-    print(f"  Target count: {count} source validators")
-    print(f"  Max target balance: {max_target_balance} ETH")
-    print(f"  Bucket interval: {bucket_hours}h")
-    if existing_targets:
-        print(f"  Existing 0x02 targets with capacity: {len(existing_targets)}")
 
+# =============================================================================
+# Bin-Packing Optimizer (--optimize)
+# =============================================================================
+
+def count_consolidation_transactions(consolidations: List[Dict]) -> int:
+    """Number of consolidation transactions needed (target is included in each batch)."""
+    return sum(math.ceil(len(c['sources']) / BATCH_SIZE) for c in consolidations)
+
+
+def count_link_transactions(consolidations: List[Dict]) -> int:
+    """
+    Number of link transactions the plan emits. generate_gnosis_txns.py links
+    every target and the first source of every batch in one
+    linkLegacyValidatorIds transaction (see collect_validators_needing_linking).
+    """
+    needs_linking = any(
+        c['target'].get('id') is not None
+        or any(s.get('id') is not None for s in c['sources'][::BATCH_SIZE])
+        for c in consolidations
+    )
+    return 1 if needs_linking else 0
+
+
+def count_plan_transactions(consolidations: List[Dict]) -> Dict:
+    """Consolidation and link transactions the plan emits, and their total."""
+    consolidation = count_consolidation_transactions(consolidations)
+    link = count_link_transactions(consolidations)
+    return {'consolidation': consolidation, 'link': link, 'total': consolidation + link}
+
+
+def _assign_exact(
+    items: List[int],
+    rooms: List[float],
+    balances: List[float],
+    slots: int
+) -> Optional[List[List[int]]]:
+    """Exact backtracking assignment of items into bins with ETH room and slot limits."""
+    order = sorted(items, key=lambda i: balances[i], reverse=True)
+    room_left = list(rooms)
+    assigned = [[] for _ in rooms]
+
+    def place(pos: int) -> bool:
+        if pos == len(order):
+            return True
+        item = order[pos]
+        tried = set()
+        for b in range(len(rooms)):
+            state = (room_left[b], len(assigned[b]))
+            # Bins in the same state are interchangeable
+            if state in tried or len(assigned[b]) >= slots or balances[item] > room_left[b]:
+                continue
+            tried.add(state)
+            room_left[b] -= balances[item]
+            assigned[b].append(item)
+            if place(pos + 1):
+                return True
+            assigned[b].pop()
+            room_left[b] += balances[item]
+        return False
+
+    return assigned if place(0) else None
+
+
+def _solve_pod_exact(
+    balances: List[float],
+    source_order: List[int],
+    candidates: List[int],
+    coverage: int,
+    max_target_balance: float,
+    max_bins: int
+) -> Optional[List[Tuple[int, List[int]]]]:
+    """
+    Minimum number of targets covering `coverage` sources, by exhaustive search.
+
+    Only used for small pods. Candidates are tried in preference order
+    (existing 0x02 first, least-used sweep bucket, lowest balance), so the
+    first feasible combination for the smallest k is returned.
+    """
+    slots = BATCH_SIZE - 1
+    for k in range(1, max_bins):
+        for combo in combinations(candidates, k):
+            promoted = set(combo)
+            pool = [i for i in source_order if i not in promoted]
+            if len(pool) < coverage:
+                continue
+            # Smallest sources are always the easiest to fit
+            items = pool[:coverage]
+            rooms = [max_target_balance - balances[t] for t in combo]
+            if coverage > k * slots or sum(balances[i] for i in items) > sum(rooms):
+                continue
+            assigned = _assign_exact(items, rooms, balances, slots)
+            if assigned is not None:
+                return list(zip(combo, assigned))
+    return None
+
+
+def _solve_pod_first_fit_decreasing(
+    balances: List[float],
+    existing_order: List[int],
+    source_order: List[int],
+    has_capacity: List[bool],
+    coverage: int,
+    max_target_balance: float,
+    bucket_of: List[int],
+    bucket_usage: Dict[int, int]
+) -> Optional[List[Tuple[int, List[int]]]]:
+    """
+    First-fit-decreasing packing of `coverage` sources, followed by local improvement.
+
+    Targets are opened largest-capacity first (capacity = number of the smallest
+    remaining sources that fit). Promoting a 0x01 validator to target costs one
+    source, so it is only done while enough sources remain to reach `coverage`.
+    Ties prefer existing 0x02 targets (no linking) and less-used sweep buckets.
+    Local improvement then repeatedly tries to empty the least-filled target
+    into the spare room of the others.
+    """
+    slots = BATCH_SIZE - 1
+    usage = dict(bucket_usage)
+
+    prefix = [0.0]
+    for i in source_order:
+        prefix.append(prefix[-1] + balances[i])
+
+    def estimate(target: int) -> int:
+        return min(slots, bisect_right(prefix, max_target_balance - balances[target]))
+
+    existing_candidates = sorted(
+        (i for i in existing_order if has_capacity[i]),
+        key=lambda i: (-estimate(i), usage.get(bucket_of[i], 0), balances[i])
+    )
+    promotable = [i for i in source_order if has_capacity[i]]
+    existing_ptr = 0
+    promote_ptr = 0
+    promoted = set()
+
+    def next_target(need_sources: int) -> Optional[int]:
+        nonlocal existing_ptr, promote_ptr
+        existing = existing_candidates[existing_ptr] if existing_ptr < len(existing_candidates) else None
+        while promote_ptr < len(promotable) and promotable[promote_ptr] in assigned_items:
+            promote_ptr += 1
+        promote = None
+        if promote_ptr < len(promotable) and len(source_order) - len(promoted) - 1 >= need_sources:
+            promote = promotable[promote_ptr]
+        if existing is None and promote is None:
+            return None
+        if promote is None or (existing is not None and (
+                estimate(existing), -usage.get(bucket_of[existing], 0)) >= (
+                estimate(promote), -usage.get(bucket_of[promote], 0))):
+            existing_ptr += 1
+            choice = existing
+        else:
+            promote_ptr += 1
+            promoted.add(promote)
+            choice = promote
+        usage[bucket_of[choice]] = usage.get(bucket_of[choice], 0) + 1
+        return choice
+
+    # Open targets until their estimated capacity covers the required sources
+    assigned_items = set()
+    bins = []
+    estimated = 0
+    while estimated < coverage:
+        target = next_target(coverage)
+        if target is None:
+            break
+        bins.append([target, max_target_balance - balances[target], []])
+        estimated += estimate(target)
+
+    # Sources to place: the smallest ones that were not promoted
+    items = [i for i in source_order if i not in promoted][:coverage]
+    if len(items) < coverage:
+        return None
+    assigned_items.update(items)
+
+    for item in sorted(items, key=lambda i: balances[i], reverse=True):
+        placed = False
+        for b in bins:
+            if len(b[2]) < slots and balances[item] <= b[1]:
+                b[1] -= balances[item]
+                b[2].append(item)
+                placed = True
+                break
+        while not placed:
+            target = next_target(0)
+            if target is None:
+                return None
+            if target in assigned_items:
+                continue
+            bins.append([target, max_target_balance - balances[target], []])
+            if balances[item] <= bins[-1][1]:
+                bins[-1][1] -= balances[item]
+                bins[-1][2].append(item)
+                placed = True
+
+    bins = [b for b in bins if b[2]]
+
+    # Local improvement: empty the least-filled target into the others
+    while len(bins) > 1:
+        bins.sort(key=lambda b: len(b[2]))
+        victim, rest = bins[0], bins[1:]
+        rooms = [b[1] for b in rest]
+        counts = [len(b[2]) for b in rest]
+        moves = []
+        for item in sorted(victim[2], key=lambda i: balances[i], reverse=True):
+            for j in range(len(rest)):
+                if counts[j] < slots and balances[item] <= rooms[j]:
+                    rooms[j] -= balances[item]
+                    counts[j] += 1
+                    moves.append((item, j))
+                    break
+            else:
+                break
+        if len(moves) != len(victim[2]):
+            break
+        for item, j in moves:
+            rest[j][1] -= balances[item]
+            rest[j][2].append(item)
+        bins = rest
+
+    return [(b[0], b[2]) for b in bins]
+
+
+def optimize_pod_consolidations(
+    wc_address: str,
+    wc_validators: List[Dict],
+    remaining: int,
+    max_target_balance: float,
+    used_target_pubkeys: set,
+    validator_to_bucket: Dict[str, int],
+    bucket_usage: Dict[int, int]
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Bin-packing variant of plan_pod_consolidations.
+
+    Consolidates the same number of sources as the greedy plan for this pod,
+    using as few targets as possible (every target costs one transaction and,
+    for 0x01 targets, one link). Pods up to OPTIMIZE_EXACT_MAX_VALIDATORS are
+    solved exactly; larger pods use first-fit-decreasing plus local improvement.
+    The greedy plan is kept whenever the optimizer cannot beat it.
+
+    Args:
+        wc_address: EigenPod withdrawal credential address
+        wc_validators: Validators in this pod (0x01 sources + existing 0x02 targets)
+        remaining: Number of sources still needed across the whole plan
+        max_target_balance: Maximum ETH balance for targets
+        used_target_pubkeys: Targets already used (shared across pods, updated in place)
+        validator_to_bucket: Lowercase pubkey -> sweep bucket index
+        bucket_usage: Targets per sweep bucket so far (updated in place)
+
+    Returns:
+        Tuple of (optimized consolidations, greedy consolidations) for this pod
+    """
+    greedy = plan_pod_consolidations(
+        wc_address, wc_validators, remaining, max_target_balance,
+        set(used_target_pubkeys), validator_to_bucket
+    )
+    coverage = sum(len(c['sources']) - 1 for c in greedy)
+
+    pubkeys = [v.get('pubkey', '').lower() for v in wc_validators]
+    result = greedy
+    # Duplicate or previously used pubkeys only occur with inconsistent data; keep greedy there
+    if len(greedy) > 1 and len(set(pubkeys)) == len(pubkeys) and \
+            not any(pk in used_target_pubkeys for pk in pubkeys):
+        balances = [get_validator_balance_eth(v) for v in wc_validators]
+        is_existing = [bool(v.get('_is_existing_target')) for v in wc_validators]
+        has_capacity = [
+            calculate_consolidation_capacity(b, max_target_balance) > 0 for b in balances
+        ]
+        bucket_of = [validator_to_bucket.get(pk, 0) for pk in pubkeys]
+        order = sorted(range(len(wc_validators)), key=lambda i: (0 if is_existing[i] else 1, balances[i]))
+        existing_order = [i for i in order if is_existing[i]]
+        source_order = [i for i in order if not is_existing[i]]
+
+        if len(wc_validators) <= OPTIMIZE_EXACT_MAX_VALIDATORS:
+            candidates = sorted(
+                (i for i in order if has_capacity[i]),
+                key=lambda i: (0 if is_existing[i] else 1, bucket_usage.get(bucket_of[i], 0), balances[i])
+            )
+            bins = _solve_pod_exact(
+                balances, source_order, candidates,
+                coverage, max_target_balance, len(greedy)
+            )
+        else:
+            bins = _solve_pod_first_fit_decreasing(
+                balances, existing_order, source_order, has_capacity,
+                coverage, max_target_balance, bucket_of, bucket_usage
+            )
+
+        if bins is not None and len(bins) < len(greedy) and \
+                sum(len(items) for _, items in bins) == coverage:
+            result = []
+            for target_idx, items in bins:
+                items = sorted(items, key=lambda i: (balances[i], i))
+                running_balance = balances[target_idx]
+                for i in items:
+                    running_balance += balances[i]
+                result.append({
+                    'target': wc_validators[target_idx],
+                    'target_balance_eth': balances[target_idx],
+                    'sources': [wc_validators[target_idx]] + [wc_validators[i] for i in items],
+                    'source_total_eth': sum(balances[i] for i in [target_idx] + items),
+                    'post_consolidation_balance_eth': running_balance,
+                    'bucket_index': bucket_of[target_idx],
+                    'wc_address': wc_address
+                })
+
+    for c in result:
+        used_target_pubkeys.add(c['target'].get('pubkey', '').lower())
+        bucket_usage[c['bucket_index']] = bucket_usage.get(c['bucket_index'], 0) + 1
+
+    return result, greedy
+
+
+# =============================================================================
+# Parallel Per-Pod Planning
+# =============================================================================
+
+def _encode_consolidations(wc_validators: List[Dict], consolidations: List[Dict]) -> List[Tuple]:
+    """Encode consolidations as (source positions within the pod, balance fields, bucket)."""
+    position = {id(v): i for i, v in enumerate(wc_validators)}
+    return [
+        (
+            [position[id(s)] for s in c['sources']],
+            c['target_balance_eth'],
+            c['source_total_eth'],
+            c['post_consolidation_balance_eth'],
+            c['bucket_index'],
+        )
+        for c in consolidations
+    ]
+
+
+def _decode_consolidations(wc_address: str, wc_validators: List[Dict], encoded: List[Tuple]) -> List[Dict]:
+    """Rebuild consolidation dicts from _encode_consolidations output."""
+    consolidations = []
+    for positions, target_balance, source_total, post_balance, bucket_idx in encoded:
+        sources = [wc_validators[i] for i in positions]
+        consolidations.append({
+            'target': sources[0],
+            'target_balance_eth': target_balance,
+            'sources': sources,
+            'source_total_eth': source_total,
+            'post_consolidation_balance_eth': post_balance,
+            'bucket_index': bucket_idx,
+            'wc_address': wc_address
+        })
+    return consolidations
+
+
+def _plan_pod_worker(task: Tuple) -> Tuple[str, List[Tuple], List[Tuple], List[str]]:
+    """
+    Plan one EigenPod in a worker process.
+
+    The pod is planned as if it were the first pod (no targets used elsewhere,
+    no bucket usage from other pods). Results are returned as positions so
+    that only small tuples cross the process boundary.
+    """
+    wc_address, compact_validators, remaining, max_target_balance, validator_to_bucket, optimize = task
+    # Only the fields the planners read are shipped to workers
+    wc_validators = []
+    for pubkey, balance, is_existing in compact_validators:
+        v = {'pubkey': pubkey, 'balance_eth': balance}
+        if is_existing:
+            v['_is_existing_target'] = True
+        wc_validators.append(v)
+    used_target_pubkeys = set()
+    if optimize:
+        pod_consolidations, pod_greedy = optimize_pod_consolidations(
+            wc_address, wc_validators, remaining, max_target_balance,
+            used_target_pubkeys, validator_to_bucket, {}
+        )
+    else:
+        pod_consolidations = plan_pod_consolidations(
+            wc_address, wc_validators, remaining, max_target_balance,
+            used_target_pubkeys, validator_to_bucket
+        )
+        pod_greedy = pod_consolidations
+    return (
+        wc_address,
+        _encode_consolidations(wc_validators, pod_consolidations),
+        _encode_consolidations(wc_validators, pod_greedy),
+        sorted(used_target_pubkeys),
+    )
+
+
+def build_consolidation_batches(
+    pod_order: List[str],
+    wc_groups: Dict[str, List[Dict]],
+    count: int,
+    max_target_balance: float,
+    validator_to_bucket: Dict[str, int],
+    optimize: bool = False,
+    workers: int = 1
+) -> Tuple[List[Dict], List[Dict], set]:
+    """
+    Create consolidation batches for all EigenPods, in pod_order.
+
+    With workers > 1, every pod is planned independently on a process pool
+    and a serial merge walks the pods in order applying the global count and
+    target-uniqueness limits:
+    - A pod whose candidate plan stays below the remaining count is taken as is.
+      The greedy planner only depends on the remaining count once it is reached,
+      so this is exactly what the serial loop would produce.
+    - The pod that reaches the count, and any pod whose candidate targets were
+      already used by an earlier pod, is re-planned in the parent with the real
+      remaining count and used-target set.
+    For the default planner the merged plan is identical to the serial one.
+    With --optimize, sweep-bucket tie-breaks in workers only see targets
+    within the same pod.
+
+    Returns:
+        Tuple of (consolidations, greedy consolidations, used target pubkeys)
+    """
+    consolidations = []
+    greedy_consolidations = []
+    used_target_pubkeys = set()  # Track used targets to prevent reuse
+    bucket_usage = {}
+    total_sources = 0
+
+    if workers == 0:
+        workers = os.cpu_count() or 1
+
+    candidates = {}
+    if workers > 1 and len(pod_order) > 1:
+        tasks = []
+        for wc_address in pod_order:
+            compact_validators = []
+            pod_buckets = {}
+            for v in wc_groups.get(wc_address, []):
+                pk = v.get('pubkey', '').lower()
+                compact_validators.append((pk, get_validator_balance_eth(v), bool(v.get('_is_existing_target'))))
+                if pk in validator_to_bucket:
+                    pod_buckets[pk] = validator_to_bucket[pk]
+            tasks.append((wc_address, compact_validators, count, max_target_balance, pod_buckets, optimize))
+        # Largest pods first so the slowest tasks start early
+        tasks.sort(key=lambda t: len(t[1]), reverse=True)
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                for result in executor.map(_plan_pod_worker, tasks, chunksize=max(1, len(tasks) // (workers * 4))):
+                    candidates[result[0]] = result[1:]
+            print(f"  Planned {len(tasks)} EigenPods on {min(workers, len(tasks))} worker processes")
+        except Exception as e:
+            print(f"  ⚠ Warning: Parallel planning failed ({e}), planning serially")
+            candidates = {}
+
+    # Process each WC group
+    for wc_address in pod_order:
+        if total_sources >= count:
+            break
+        wc_validators = wc_groups.get(wc_address, [])
+        remaining = count - total_sources
+
+        candidate = candidates.get(wc_address)
+        if candidate is not None:
+            encoded, encoded_greedy, pod_used = candidate
+            coverage = sum(len(e[0]) - 1 for e in encoded)
+            conflict = any(pk in used_target_pubkeys for pk in pod_used) or \
+                (optimize and any(v.get('pubkey', '').lower() in used_target_pubkeys for v in wc_validators))
+            if coverage < remaining and not conflict:
+                pod_consolidations = _decode_consolidations(wc_address, wc_validators, encoded)
+                greedy_consolidations.extend(
+                    _decode_consolidations(wc_address, wc_validators, encoded_greedy)
+                )
+                used_target_pubkeys.update(pod_used)
+                for c in pod_consolidations:
+                    bucket_usage[c['bucket_index']] = bucket_usage.get(c['bucket_index'], 0) + 1
+                consolidations.extend(pod_consolidations)
+                total_sources += coverage
+                continue
+
+        if optimize:
+            pod_consolidations, pod_greedy = optimize_pod_consolidations(
+                wc_address,
+                wc_validators,
+                remaining,
+                max_target_balance,
+                used_target_pubkeys,
+                validator_to_bucket,
+                bucket_usage
+            )
+            greedy_consolidations.extend(pod_greedy)
+        else:
+            pod_consolidations = plan_pod_consolidations(
+                wc_address,
+                wc_validators,
+                remaining,
+                max_target_balance,
+                used_target_pubkeys,
+                validator_to_bucket
+            )
+            greedy_consolidations.extend(pod_consolidations)
+        consolidations.extend(pod_consolidations)
+        # sources[0] is the target itself
+        total_sources += sum(len(c['sources']) - 1 for c in pod_consolidations)
+
+    return consolidations, greedy_consolidations, used_target_pubkeys
+
+
+# =============================================================================
+# Consolidation Planning
+# =============================================================================
+
+def prepare_consolidation_inputs(
+    validators: List[Dict],
+    existing_targets: List[Dict],
+    beacon_state: Optional[Dict] = None,
+    registry: Optional[Dict] = None,
+    pending_partials: int = 0
+) -> Dict:
+    """
+    Group validators by EigenPod and attach sweep times (Steps 1-2).
+
+    This is the I/O part of planning: it needs the beacon sweep state but none
+    of the planning parameters, so its result can be reused across many
+    max_target_balance / bucket_hours combinations (see run_parameter_sweep).
+
+    Args:
+        validators: All eligible 0x01 validators (can be targets or sources)
+        existing_targets: Existing 0x02 validators (target-only, never sources)
+        beacon_state: Pre-fetched fetch_beacon_state() result (fetched if None)
+        registry: load_validator_registry() result for the exact sweep simulation
+                  (linear estimate if None)
+        pending_partials: fetch_pending_partials() result, served ahead of the sweep
+
+    Returns:
+        Dict with 'all_with_sweep' (sorted by sweep time) and 'wc_groups_with_sweep'
+    """
     # Step 1: Group validators by withdrawal credentials
     print(f"\nStep 1: Grouping by withdrawal credentials...")
     wc_groups = group_by_withdrawal_credentials(validators)
@@ -355,10 +1034,11 @@ def create_consolidation_plan(
     if len(wc_groups) > 5:
         print(f"    ... and {len(wc_groups) - 5} more EigenPods")
     
-    # Step 2: Calculate sweep times and create buckets
+    # Step 2: Calculate sweep times
     print(f"\nStep 2: Calculating sweep times...")
     try:
-        beacon_state = fetch_beacon_state()
+        if beacon_state is None:
+            beacon_state = fetch_beacon_state()
         sweep_index = beacon_state['next_withdrawal_validator_index']
         total_validators = beacon_state['validator_count']
         print(f"  Sweep index: {sweep_index:,}")
@@ -369,28 +1049,20 @@ def create_consolidation_plan(
         sweep_index = 0
         total_validators = 1200000
 
-    # Add sweep time info to all validators (0x01 + existing 0x02 targets)
-    all_validators = list(validators) + list(existing_targets)
-    all_with_sweep = []
-    for v in all_validators:
-        validator_index = v.get('index')
-        if validator_index is not None:
-            sweep_info = calculate_sweep_time(validator_index, sweep_index, total_validators)
-            v_with_sweep = {**v, **sweep_info}
-            all_with_sweep.append(v_with_sweep)
+    # Add sweep time info to all validators (0x01 + existing 0x02 targets), in one pass;
+    # with the full registry the sweep is simulated exactly instead of estimated linearly
+    all_validators = [v for v in list(validators) + list(existing_targets) if v.get('index') is not None]
+    sweep_infos = calculate_sweep_times(
+        [int(v['index']) for v in all_validators], sweep_index, total_validators,
+        registry=registry, pending_partials=pending_partials
+    )
+    all_with_sweep = [{**v, **sweep_info} for v, sweep_info in zip(all_validators, sweep_infos)]
+    if registry is not None:
+        print(f"  Simulated the sweep over {len(registry['balance']):,} registry validators"
+              f"{f' ({pending_partials} pending partial withdrawals first)' if pending_partials else ''}")
     
     all_with_sweep.sort(key=lambda x: x.get('secondsUntilSweep', 0))
     print(f"  Calculated sweep times for {len(all_with_sweep)} validators")
-    
-    # Create buckets
-    if all_with_sweep:
-        bucket_result = spread_validators_across_queue(all_with_sweep, bucket_hours)
-        buckets = bucket_result.get('buckets', [])
-    else:
-        buckets = []
-    
-    # Step 3: Select targets distributed across sweep queue buckets
-    print(f"\nStep 3: Selecting targets from across withdrawal queue...")
 
     # Re-group validators with sweep info by WC
     wc_groups_with_sweep = {}
@@ -401,6 +1073,38 @@ def create_consolidation_plan(
                 wc_groups_with_sweep[wc_address] = []
             wc_groups_with_sweep[wc_address].append(v)
 
+    return {
+        'all_with_sweep': all_with_sweep,
+        'wc_groups_with_sweep': wc_groups_with_sweep
+    }
+
+
+def plan_consolidations(
+    inputs: Dict,
+    count: int,
+    max_target_balance: float,
+    bucket_hours: int,
+    optimize: bool = False,
+    workers: int = 1
+) -> Dict:
+    """
+    Build, validate and summarise a plan from prepare_consolidation_inputs output (Steps 3-6).
+
+    Pure computation: no database or beacon chain access.
+    """
+    all_with_sweep = inputs['all_with_sweep']
+    wc_groups_with_sweep = inputs['wc_groups_with_sweep']
+
+    # Create buckets
+    if all_with_sweep:
+        bucket_result = spread_validators_across_queue(all_with_sweep, bucket_hours)
+        buckets = bucket_result.get('buckets', [])
+    else:
+        buckets = []
+    
+    # Step 3: Select targets distributed across sweep queue buckets
+    print(f"\nStep 3: Selecting targets from across withdrawal queue...")
+
     # Use select_targets_from_buckets to pick targets spread across the withdrawal queue
     # (0x02 validators are preferred via prefer_consolidated=True)
     selected_targets = select_targets_from_buckets(
@@ -418,120 +1122,37 @@ def create_consolidation_plan(
     # - If more sources remain after using a target, select a new target from remaining validators
     print(f"\nStep 4: Creating consolidation batches...")
 
-    consolidations = []
-    total_sources = 0
-    used_target_pubkeys = set()  # Track used targets to prevent reuse
-
-    # Build validator -> bucket mapping for selecting new targets
-    validator_to_bucket = {}
-    for bucket in buckets:
-        for v in bucket.get('validators', []):
-            pubkey = v.get('pubkey', '')
-            if pubkey:
-                validator_to_bucket[pubkey.lower()] = bucket['bucketIndex']
-
-    # Process each WC group
-    for wc_address, target_info in selected_targets.items():
-        if total_sources >= count:
-            break
-
-        # Get all validators in this WC group
-        wc_validators = wc_groups_with_sweep.get(wc_address, [])
-
-        # Need at least 1 source (non-existing-target) + 1 target
-        source_candidates = [v for v in wc_validators if not v.get('_is_existing_target')]
-        if not source_candidates:
-            continue
-
-        # Sort: prefer existing 0x02 targets first (already consolidated, no linking needed),
-        # then by balance (lowest first = more capacity)
-        available_validators = sorted(wc_validators, key=lambda v: (
-            0 if v.get('_is_existing_target') else 1,
-            get_validator_balance_eth(v)
-        ))
-
-        # Keep consolidating until we run out of source validators or hit count
-        # Need at least 1 source (non-existing-target) and 1 target candidate
-        while total_sources < count and \
-              any(not v.get('_is_existing_target') for v in available_validators) and \
-              len(available_validators) >= 2:
-            # Select a target from available validators (not yet used)
-            target = None
-            target_idx = None
-            for idx, candidate in enumerate(available_validators):
-                candidate_pubkey = candidate.get('pubkey', '').lower()
-                if candidate_pubkey not in used_target_pubkeys:
-                    candidate_balance = get_validator_balance_eth(candidate)
-                    candidate_capacity = calculate_consolidation_capacity(candidate_balance, max_target_balance)
-                    if candidate_capacity > 0:
-                        target = candidate
-                        target_idx = idx
-                        break
-
-            if target is None:
-                break  # No valid target available in this WC group
-
-            target_pubkey = target.get('pubkey', '').lower()
-            target_balance = get_validator_balance_eth(target)
-            bucket_idx = validator_to_bucket.get(target_pubkey, 0)
-
-            # Mark target as used
-            used_target_pubkeys.add(target_pubkey)
-
-            # Get sources (all validators except the target, excluding existing 0x02 targets)
-            sources_pool = [v for i, v in enumerate(available_validators)
-                           if i != target_idx and not v.get('_is_existing_target')]
-
-            # Select sources that fit within max_target_balance limit
-            batch_sources = []
-            running_balance = target_balance
-            batch_limit = BATCH_SIZE - 1  # Reserve 1 slot for target
-
-            for source in sources_pool:
-                if len(batch_sources) >= batch_limit:
-                    break
-                if total_sources + len(batch_sources) >= count:
-                    break
-
-                source_balance = get_validator_balance_eth(source)
-                new_balance = running_balance + source_balance
-
-                # Only add source if it doesn't exceed max_target_balance
-                if new_balance <= max_target_balance:
-                    batch_sources.append(source)
-                    running_balance = new_balance
-
-            if not batch_sources:
-                # Remove target from available and try next
-                available_validators = [v for v in available_validators if v.get('pubkey', '').lower() != target_pubkey]
-                continue
-
-            # Build sources list with target as first element
-            sources = [target] + batch_sources
-            post_balance = running_balance
-
-            # Calculate source total (includes target balance for reporting)
-            source_total = sum(get_validator_balance_eth(s) for s in sources)
-
-            consolidations.append({
-                'target': target,
-                'target_balance_eth': target_balance,
-                'sources': sources,
-                'source_total_eth': source_total,
-                'post_consolidation_balance_eth': post_balance,
-                'bucket_index': bucket_idx,
-                'wc_address': wc_address
-            })
-
-            total_sources += len(batch_sources)
-
-            # Remove used validators (target + sources) from available pool
-            used_pubkeys = {s.get('pubkey', '').lower() for s in sources}
-            available_validators = [v for v in available_validators if v.get('pubkey', '').lower() not in used_pubkeys]
+    validator_to_bucket = build_validator_to_bucket(buckets)
+    consolidations, greedy_consolidations, used_target_pubkeys = build_consolidation_batches(
+        list(selected_targets),
+        wc_groups_with_sweep,
+        count,
+        max_target_balance,
+        validator_to_bucket,
+        optimize=optimize,
+        workers=workers
+    )
+    consolidations = order_pending_conversions_first(consolidations)
+    # sources[0] is the target itself
+    total_sources = sum(len(c['sources']) - 1 for c in consolidations)
 
     print(f"  Created {len(consolidations)} consolidation batches")
     print(f"  Total sources to consolidate: {total_sources}")
     print(f"  Unique targets used: {len(used_target_pubkeys)}")
+
+    optimizer_report = None
+    if optimize:
+        greedy_transactions = count_plan_transactions(greedy_consolidations)
+        optimized_transactions = count_plan_transactions(consolidations)
+        optimizer_report = {
+            'greedy_targets': len(greedy_consolidations),
+            'optimized_targets': len(consolidations),
+            'greedy_transactions': greedy_transactions['total'],
+            'optimized_transactions': optimized_transactions['total'],
+            'transactions_saved': greedy_transactions['total'] - optimized_transactions['total'],
+        }
+        print(f"  Optimizer: {optimized_transactions['total']} transactions vs {greedy_transactions['total']} greedy "
+              f"({optimizer_report['transactions_saved']} saved, link transaction included)")
     
     # Step 5: Validate the plan
     print(f"\nStep 5: Validating consolidation plan...")
@@ -546,14 +1167,20 @@ def create_consolidation_plan(
     existing_0x02_targets_used = sum(
         1 for c in consolidations if c['target'].get('_is_existing_target')
     )
+    transactions = count_plan_transactions(consolidations)
     summary = {
         'total_targets': len(consolidations),
+        'consolidation_transactions': transactions['consolidation'],
+        'link_transactions': transactions['link'],
+        'total_transactions': transactions['total'],
         'total_sources': sum(len(c['sources']) for c in consolidations),
         'total_eth_consolidated': sum(c['source_total_eth'] for c in consolidations),
         'existing_0x02_targets_used': existing_0x02_targets_used,
         'bucket_distribution': bucket_distribution,
         'withdrawal_credential_groups': len(set(c['wc_address'] for c in consolidations))
     }
+    if optimizer_report:
+        summary['optimizer'] = optimizer_report
     
     return {
         'consolidations': consolidations,
@@ -562,6 +1189,60 @@ def create_consolidation_plan(
     }
 
 
+def create_consolidation_plan(
+    validators: List[Dict],
+    count: int,
+    max_target_balance: float,
+    bucket_hours: int,
+    existing_targets: List[Dict] = None,
+    optimize: bool = False,
+    workers: int = 1,
+    beacon_state: Dict = None,
+    registry: Optional[Dict] = None,
+    pending_partials: int = 0
+) -> Dict:
+    """
+    Create a consolidation plan with targets and sources.
+    
+    Args:
+        validators: All eligible 0x01 validators (can be targets or sources)
+        count: Number of source validators to consolidate
+        max_target_balance: Maximum ETH balance for targets
+        bucket_hours: Bucket interval for sweep queue distribution
+        existing_targets: Existing 0x02 validators with capacity (target-only, never sources).
+                         Must have 'balance_eth' populated from beacon chain.
+        optimize: Bin-pack each EigenPod to minimise targets and transactions
+                  (see optimize_pod_consolidations)
+        workers: Worker processes for per-pod planning (1 = serial, 0 = all cores)
+        beacon_state: Pre-fetched beacon sweep state (fetched here if None)
+        registry: Full validator registry for the sweep simulation (see load_validator_registry)
+        pending_partials: Pending partial withdrawals served ahead of the sweep
+
+    Returns:
+        Consolidation plan dictionary
+    """
+    if existing_targets is None:
+        existing_targets = []
+
+    print(f"\n=== Creating Consolidation Plan ===")
+    print(f"  Target count: {count} source validators")
+    print(f"  Max target balance: {max_target_balance} ETH")
+    print(f"  Bucket interval: {bucket_hours}h")
+    if optimize:
+        print(f"  Mode: optimize (bin-packing)")
+    if existing_targets:
+        print(f"  Existing 0x02 targets with capacity: {len(existing_targets)}")
+
+    inputs = prepare_consolidation_inputs(
+        validators, existing_targets, beacon_state=beacon_state,
+        registry=registry, pending_partials=pending_partials
+    )
+    return plan_consolidations(
+        inputs, count, max_target_balance, bucket_hours,
+        optimize=optimize, workers=workers
+    )
+
+
 def validate_consolidation_plan(consolidations: List[Dict], max_target_balance: float) -> Dict:
     """
     Validate the consolidation plan for safety.
@@ -644,6 +1325,267 @@ def validate_consolidation_plan(consolidations: List[Dict], max_target_balance:
     return validation
 
 
+# =============================================================================
+# Incremental Re-planning (--previous-plan)
+# =============================================================================
+
+def load_previous_plan(plan_file: str) -> Dict:
+    """
+    Load a consolidation-data.json written by a previous run.
+
+    Returns:
+        Dictionary with:
+        - consumed_source_pubkeys: sources already assigned to a target
+        - pinned_targets: target pubkey -> planned post-consolidation balance (ETH)
+        - num_consolidations: consolidation entries (targets) in the previous plan
+        - num_transactions: consolidation plus link transactions in the previous plan
+    """
+    with open(plan_file, 'r') as f:
+        data = json.load(f)
+
+    consumed_source_pubkeys = set()
+    pinned_targets = {}
+    for c in data.get('consolidations', []):
+        target_pubkey = c.get('target', {}).get('pubkey', '').lower()
+        if not target_pubkey:
+            continue
+        # A target may appear in several batches; the last one carries the highest balance
+        post_balance = c.get('post_consolidation_balance_eth') or 0
+        pinned_targets[target_pubkey] = max(pinned_targets.get(target_pubkey, 0), post_balance)
+        # sources[0] is the target itself
+        for source in c.get('sources', []):
+            source_pubkey = source.get('pubkey', '').lower()
+            if source_pubkey and source_pubkey != target_pubkey:
+                consumed_source_pubkeys.add(source_pubkey)
+
+    return {
+        'plan_file': plan_file,
+        'num_consolidations': len(data.get('consolidations', [])),
+        'num_transactions': count_plan_transactions(data.get('consolidations', []))['total'],
+        'consumed_source_pubkeys': consumed_source_pubkeys,
+        'pinned_targets': pinned_targets
+    }
+
+
+def exclude_consumed_sources(validators: List[Dict], previous_plan: Dict) -> List[Dict]:
+    """Drop validators already consolidated (or signed for) in the previous plan."""
+    consumed = previous_plan['consumed_source_pubkeys']
+    return [v for v in validators if v.get('pubkey', '').lower() not in consumed]
+
+
+def pin_previous_targets(
+    validators: List[Dict],
+    existing_candidates: List[Dict],
+    previous_plan: Dict
+) -> Tuple[List[Dict], int, int]:
+    """
+    Keep previous targets out of the 0x01 pool so they are never re-chosen or used as sources.
+
+    Every previous target stays available as a target-only candidate, at the
+    higher of its current balance and the balance the previous plan will bring
+    it to (its sources may not have landed yet):
+    - Targets already 0x02 on the beacon chain are updated in place.
+    - Targets still 0x01 (the previous plan has not executed yet) are moved to
+      existing_candidates and marked _pending_0x02. Their batches still start
+      with the target itself, i.e. the switch to 0x02, and are ordered first
+      in the plan (see order_pending_conversions_first).
+
+    Args:
+        validators: 0x01 validators for the delta plan
+        existing_candidates: 0x02 validators with beacon balances (updated in place)
+        previous_plan: Output of load_previous_plan
+
+    Returns:
+        (0x01 validators without previous targets, number of pinned 0x02 targets
+        carried over, number of pinned targets still awaiting their 0x02 conversion)
+    """
+    pinned_targets = previous_plan['pinned_targets']
+    remaining = []
+    pending = 0
+    for v in validators:
+        planned_balance = pinned_targets.get(v.get('pubkey', '').lower())
+        if planned_balance is None:
+            remaining.append(v)
+            continue
+        v['balance_eth'] = max(get_validator_balance_eth(v), planned_balance)
+        v['_pending_0x02'] = True
+        existing_candidates.append(v)
+        pending += 1
+
+    carried = 0
+    for v in existing_candidates:
+        planned_balance = pinned_targets.get(v.get('pubkey', '').lower())
+        if planned_balance is not None and not v.get('_pending_0x02'):
+            v['balance_eth'] = max(v['balance_eth'], planned_balance)
+            carried += 1
+
+    return remaining, carried, pending
+
+
+def order_pending_conversions_first(consolidations: List[Dict]) -> List[Dict]:
+    """Move batches into pinned targets still awaiting their 0x02 conversion to the front (stable)."""
+    return sorted(consolidations, key=lambda c: 0 if c['target'].get('_pending_0x02') else 1)
+
+
+# =============================================================================
+# Parameter Sweep (--sweep)
+# =============================================================================
+
+# Shared inputs for sweep workers (set once per process by _init_sweep_worker)
+_SWEEP_INPUTS = None
+
+
+def filter_existing_targets(candidates: List[Dict], max_target_balance: float) -> List[Dict]:
+    """Existing 0x02 validators that can still receive at least one source."""
+    return [
+        v for v in candidates
+        if v['balance_eth'] < max_target_balance
+        and calculate_consolidation_capacity(v['balance_eth'], max_target_balance) > 0
+    ]
+
+
+def filter_inputs_for_max_target_balance(inputs: Dict, max_target_balance: float) -> Dict:
+    """
+    Restrict prepare_consolidation_inputs output to the existing 0x02 targets
+    that qualify at max_target_balance, as a normal run with that value would.
+    """
+    def keep(v: Dict) -> bool:
+        if not v.get('_is_existing_target'):
+            return True
+        return calculate_consolidation_capacity(get_validator_balance_eth(v), max_target_balance) > 0
+
+    wc_groups_with_sweep = {}
+    for wc_address, vals in inputs['wc_groups_with_sweep'].items():
+        kept = [v for v in vals if keep(v)]
+        if kept:
+            wc_groups_with_sweep[wc_address] = kept
+
+    return {
+        'all_with_sweep': [v for v in inputs['all_with_sweep'] if keep(v)],
+        'wc_groups_with_sweep': wc_groups_with_sweep
+    }
+
+
+def _init_sweep_worker(inputs: Dict):
+    global _SWEEP_INPUTS
+    _SWEEP_INPUTS = inputs
+
+
+def _sweep_point_worker(task: Tuple) -> Dict:
+    """Plan one grid point against the shared inputs (no I/O)."""
+    max_target_balance, bucket_hours, count, optimize, fee_per_request = task
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        inputs = filter_inputs_for_max_target_balance(_SWEEP_INPUTS, max_target_balance)
+        plan = plan_consolidations(inputs, count, max_target_balance, bucket_hours, optimize=optimize)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    summary = plan['summary']
+    requests = sum(len(c['sources']) for c in plan['consolidations'])
+    return {
+        'max_target_balance': max_target_balance,
+        'bucket_hours': bucket_hours,
+        'targets': summary['total_targets'],
+        'new_targets': summary['total_targets'] - summary['existing_0x02_targets_used'],
+        'transactions': summary['total_transactions'],
+        'sources': summary['total_sources'] - summary['total_targets'],
+        'requests': requests,
+        'fees_wei': requests * fee_per_request,
+        'total_eth_consolidated': summary['total_eth_consolidated'],
+        'sweep_distribution_score': plan['validation']['sweep_distribution_score'],
+        'has_errors': bool(plan['validation'].get('errors')),
+        'elapsed_ms': elapsed_ms,
+    }
+
+
+def run_parameter_sweep(
+    validators: List[Dict],
+    existing_candidates: List[Dict],
+    count: int,
+    max_target_balances: List[float],
+    bucket_hours_list: List[int],
+    optimize: bool = False,
+    fee_per_request: int = DEFAULT_CONSOLIDATION_FEE,
+    workers: int = 0,
+    beacon_state: Dict = None,
+    registry: Optional[Dict] = None,
+    pending_partials: int = 0
+) -> List[Dict]:
+    """
+    Plan every (max_target_balance, bucket_hours) combination.
+
+    Grouping, the beacon sweep state and sweep times are computed once;
+    each grid point is then pure computation, run on a process pool.
+    Every point produces the same plan a normal run with those parameters would.
+
+    Args:
+        validators: All eligible 0x01 validators
+        existing_candidates: Existing 0x02 validators with beacon balances
+                             (filtered per max_target_balance)
+        count: Number of source validators to consolidate
+        max_target_balances: Grid values for max_target_balance
+        bucket_hours_list: Grid values for bucket_hours
+        optimize: Use the bin-packing optimizer for every point
+        fee_per_request: Consolidation fee per request in wei
+        workers: Worker processes (1 = serial, 0 = all cores)
+        beacon_state: Pre-fetched beacon sweep state (fetched here if None)
+        registry: Full validator registry for the sweep simulation (see load_validator_registry)
+        pending_partials: Pending partial withdrawals served ahead of the sweep
+
+    Returns:
+        One result dict per grid point, in grid order
+    """
+    print(f"\n=== Parameter Sweep ===")
+    print(f"  Max target balances: {', '.join(str(m) for m in max_target_balances)}")
+    print(f"  Bucket hours: {', '.join(str(b) for b in bucket_hours_list)}")
+
+    inputs = prepare_consolidation_inputs(
+        validators, existing_candidates, beacon_state=beacon_state,
+        registry=registry, pending_partials=pending_partials
+    )
+
+    tasks = [
+        (max_target_balance, bucket_hours, count, optimize, fee_per_request)
+        for max_target_balance in max_target_balances
+        for bucket_hours in bucket_hours_list
+    ]
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tasks))
+
+    print(f"\nPlanning {len(tasks)} grid points on {workers} worker process(es)...")
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_sweep_worker,
+            initargs=(inputs,)
+        ) as executor:
+            results = list(executor.map(_sweep_point_worker, tasks))
+    else:
+        _init_sweep_worker(inputs)
+        results = [_sweep_point_worker(task) for task in tasks]
+    print(f"  Done in {time.perf_counter() - start:.2f}s")
+
+    return results
+
+
+def print_sweep_table(results: List[Dict]):
+    """Print parameter sweep results, one row per grid point."""
+    print(f"\n  {'Max ETH':>8} {'Bucket':>6} {'Targets':>8} {'New 0x02':>8} {'Txns':>6} {'Sources':>8} "
+          f"{'Fees (wei)':>11} {'ETH consolidated':>17} {'Sweep':>6} {'ms':>8}")
+    print(f"  {'-' * 98}")
+    for r in results:
+        flag = " ⚠" if r['has_errors'] else ""
+        print(f"  {r['max_target_balance']:>8,.0f} {str(r['bucket_hours']) + 'h':>6} {r['targets']:>8} "
+              f"{r['new_targets']:>8} {r['transactions']:>6} {r['sources']:>8} {r['fees_wei']:>11,} "
+              f"{r['total_eth_consolidated']:>17,.2f} {r['sweep_distribution_score']:>6.2f} "
+              f"{r['elapsed_ms']:>8.1f}{flag}")
+    print(f"\n  Txns = consolidation transactions + the link transaction")
+    if any(r['has_errors'] for r in results):
+        print(f"\n  ⚠ = plan has validation errors")
+
+
 # =============================================================================
 # Output Generation
 # =============================================================================
@@ -667,7 +1609,8 @@ def convert_to_output_format(plan: Dict) -> Dict:
             'validator_index': target.get('index'),
             'id': target.get('id'),
             'current_balance_eth': c['target_balance_eth'],
-            'is_existing_0x02': bool(target.get('_is_existing_target')),
+            'is_existing_0x02': bool(target.get('_is_existing_target')) and not target.get('_pending_0x02'),
+            'pending_0x02_conversion': bool(target.get('_pending_0x02')),
             'withdrawal_credentials': full_wc,
             'sweep_bucket': f"bucket_{c['bucket_index']}"
         }
@@ -758,7 +1701,18 @@ def write_output(plan: Dict, output_file: str, operator_name: str):
     print(f"Operator: {operator_name}")
     print(f"Total targets: {plan['summary']['total_targets']}")
     print(f"Total sources: {plan['summary']['total_sources']}")
+    print(f"Transactions: {plan['summary']['total_transactions']} "
+          f"({plan['summary']['consolidation_transactions']} consolidation + "
+          f"{plan['summary']['link_transactions']} link)")
     print(f"Total ETH to consolidate: {plan['summary']['total_eth_consolidated']:.2f}")
+    if plan['summary'].get('incremental'):
+        incremental = plan['summary']['incremental']
+        print(f"New transactions only (previous plan {incremental['previous_plan']} "
+              f"has {incremental['previous_transactions']})")
+    if plan['summary'].get('optimizer'):
+        optimizer = plan['summary']['optimizer']
+        print(f"Transactions saved by --optimize: {optimizer['transactions_saved']} "
+              f"({optimizer['optimized_transactions']} vs {optimizer['greedy_transactions']} greedy)")
     
     # Print bucket distribution
     print(f"\nBucket distribution:")
@@ -796,6 +1750,20 @@ Examples:
 
   # Dry run to preview plan without writing output
   python3 query_validators_consolidation.py --operator "Validation Cloud" --count 50 --dry-run
+
+  # Bin-pack each EigenPod to minimise targets and transactions
+  python3 query_validators_consolidation.py --operator "Validation Cloud" --optimize
+
+  # Plan EigenPods in parallel on all cores (large operators)
+  python3 query_validators_consolidation.py --operator "Validation Cloud" --workers 0
+
+  # Plan only validators not covered by an earlier plan (new transactions only)
+  python3 query_validators_consolidation.py --operator "Validation Cloud" \\
+    --previous-plan consolidation-data.json --output consolidation-data-2.json
+
+  # Compare plans across max target balances and bucket sizes
+  python3 query_validators_consolidation.py --operator "Validation Cloud" --sweep \\
+    --max-target-balance-grid 1856,1984,2016 --bucket-hours-grid 6,12,24
         """
     )
     parser.add_argument(
@@ -834,6 +1802,45 @@ Examples:
         action='store_true',
         help='List all operators with validator counts'
     )
+    parser.add_argument(
+        '--optimize',
+        action='store_true',
+        help='Bin-pack each EigenPod to minimise targets, then transactions (reports savings vs greedy)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes, 0 = all cores (default: all cores with --sweep, else 1 = serial); '
+             'pass --workers 1 to run the sweep serially'
+    )
+    parser.add_argument(
+        '--previous-plan',
+        help='Consolidation data JSON from an earlier run: keep its sources and targets, '
+             'plan only new transactions for the remaining validators'
+    )
+    parser.add_argument(
+        '--sweep',
+        action='store_true',
+        help='Plan every combination of --max-target-balance-grid and --bucket-hours-grid '
+             'and print a comparison table (no output file is written)'
+    )
+    parser.add_argument(
+        '--max-target-balance-grid',
+        default=DEFAULT_MAX_TARGET_BALANCE_GRID,
+        help=f'Comma-separated max target balances for --sweep (default: {DEFAULT_MAX_TARGET_BALANCE_GRID})'
+    )
+    parser.add_argument(
+        '--bucket-hours-grid',
+        default=DEFAULT_BUCKET_HOURS_GRID,
+        help=f'Comma-separated bucket sizes in hours for --sweep (default: {DEFAULT_BUCKET_HOURS_GRID})'
+    )
+    parser.add_argument(
+        '--fee',
+        type=int,
+        default=DEFAULT_CONSOLIDATION_FEE,
+        help=f'Consolidation fee per request in wei, used for --sweep fee totals (default: {DEFAULT_CONSOLIDATION_FEE})'
+    )
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -849,6 +1856,17 @@ Examples:
         default='https://beaconcha.in/api/v1',
         help='Beacon chain API base URL (default: https://beaconcha.in/api/v1)'
     )
+    parser.add_argument(
+        '--beacon-concurrency',
+        type=int,
+        default=DEFAULT_BEACON_CONCURRENCY,
+        help=f'Beacon API requests in flight at once, across all stages (default: {DEFAULT_BEACON_CONCURRENCY}, 1 = sequential)'
+    )
+    parser.add_argument(
+        '--validator-registry',
+        help='Validator registry snapshot (.json beacon API response or .npz) for the exact sweep '
+             'simulation (default: cached bulk fetch from BEACON_NODE_URL, else the linear estimate)'
+    )
     
     args = parser.parse_args()
     
@@ -861,10 +1879,58 @@ Examples:
         print(f"Error: --max-target-balance cannot exceed {MAX_EFFECTIVE_BALANCE} ETH (protocol max)")
         sys.exit(1)
     
+    if args.workers is None:
+        # Grid points are independent plans; per-pod planning stays serial so
+        # --optimize tie-breaks see every pod
+        args.workers = 0 if args.sweep else 1
+    if args.workers < 0:
+        print(f"Error: --workers must be 0 (all cores) or a positive integer, got {args.workers}")
+        sys.exit(1)
+    
+    if args.beacon_concurrency < 1:
+        print(f"Error: --beacon-concurrency must be at least 1, got {args.beacon_concurrency}")
+        sys.exit(1)
+    # Background stages and batch pools share this one limit on beacon requests
+    set_beacon_concurrency(args.beacon_concurrency)
+    
     if args.max_target_balance < DEFAULT_SOURCE_BALANCE * 2:
         print(f"Error: --max-target-balance must be at least {DEFAULT_SOURCE_BALANCE * 2} ETH")
         sys.exit(1)
     
+    previous_plan = None
+    if args.previous_plan:
+        if not args.dry_run and os.path.abspath(args.previous_plan) == os.path.abspath(args.output):
+            print("Error: --output must differ from --previous-plan (the previous plan would be overwritten)")
+            sys.exit(1)
+        try:
+            previous_plan = load_previous_plan(args.previous_plan)
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not load previous plan {args.previous_plan}: {e}")
+            sys.exit(1)
+    
+    if args.sweep:
+        try:
+            max_target_balance_grid = [float(x) for x in args.max_target_balance_grid.split(',') if x.strip()]
+            bucket_hours_grid = [int(x) for x in args.bucket_hours_grid.split(',') if x.strip()]
+        except ValueError as e:
+            print(f"Error: Invalid sweep grid value: {e}")
+            sys.exit(1)
+        if not max_target_balance_grid or not bucket_hours_grid:
+            print("Error: --max-target-balance-grid and --bucket-hours-grid must not be empty")
+            sys.exit(1)
+        for value in max_target_balance_grid:
+            if value > MAX_EFFECTIVE_BALANCE or value < DEFAULT_SOURCE_BALANCE * 2:
+                print(f"Error: --max-target-balance-grid values must be between "
+                      f"{DEFAULT_SOURCE_BALANCE * 2} and {MAX_EFFECTIVE_BALANCE} ETH, got {value}")
+                sys.exit(1)
+        for value in bucket_hours_grid:
+            if value <= 0:
+                print(f"Error: --bucket-hours-grid values must be positive integers, got {value}")
+                sys.exit(1)
+        if args.fee < 0:
+            print(f"Error: --fee must not be negative, got {args.fee}")
+            sys.exit(1)
+    
     # Connect to database
     try:
         conn = get_db_connection()
@@ -876,6 +1942,9 @@ Examples:
         print(f"Database connection error: {e}")
         sys.exit(1)
     
+    # Background stages for independent network fetches
+    stages = ThreadPoolExecutor(max_workers=args.beacon_concurrency + 1)
+    
     try:
         if args.list_operators:
             operators = list_operators(conn)
@@ -904,6 +1973,12 @@ Examples:
             parser.print_help()
             sys.exit(1)
         
+        # The sweep position does not depend on the operator's validators;
+        # fetch it while the database and consolidation status queries run
+        beacon_state_future = stages.submit(fetch_beacon_state)
+        registry_future = stages.submit(load_validator_registry, args.validator_registry)
+        partials_future = stages.submit(fetch_pending_partials)
+        
         # Query validators - get more than needed to allow for filtering
         MAX_VALIDATORS_QUERY = 100000
         
@@ -923,15 +1998,46 @@ Examples:
             sys.exit(1)
         
         print(f"Found {len(validators)} validators from database")
+
+        if previous_plan:
+            remaining_validators = exclude_consumed_sources(validators, previous_plan)
+            print(f"\nPrevious plan: {previous_plan['plan_file']}")
+            print(f"  Transactions: {previous_plan['num_transactions']} "
+                  f"({previous_plan['num_consolidations']} consolidation entries)")
+            print(f"  Pinned targets: {len(previous_plan['pinned_targets'])}")
+            print(f"  Sources already consumed: {len(validators) - len(remaining_validators)}")
+            validators = remaining_validators
         
-        # Filter out already consolidated validators (we want 0x01 -> 0x02)
+        # Filter out already consolidated validators (we want 0x01 -> 0x02).
+        # Balances for the 0x02 validators are fetched while the status check
+        # runs, in full requests of DETAILS_REQUEST_SIZE pubkeys; the
+        # remainder is flushed once the check is done.
+        details_futures = []
+        pending_details = []
+
+        def submit_details(pubkeys: List[str]):
+            details_futures.append(stages.submit(
+                fetch_validator_details_batch, pubkeys,
+                beacon_api=args.beacon_api, show_progress=False
+            ))
+
+        def start_details(batch_filtered: List[Dict], batch_consolidated: List[Dict]):
+            pending_details.extend(v['pubkey'] for v in batch_consolidated if v.get('pubkey'))
+            while len(pending_details) >= DETAILS_REQUEST_SIZE:
+                submit_details(pending_details[:DETAILS_REQUEST_SIZE])
+                del pending_details[:DETAILS_REQUEST_SIZE]
+
         print(f"\nChecking consolidation status on beacon chain...")
         filtered_validators, consolidated_validators = filter_consolidated_validators(
             validators,
             exclude_consolidated=True,
             beacon_api=args.beacon_api,
-            show_progress=True
+            show_progress=True,
+            max_workers=args.beacon_concurrency,
+            on_batch=start_details
         )
+        if pending_details:
+            submit_details(list(pending_details))
         
         print(f"\nFiltered results:")
         print(f"  Already consolidated (0x02): {len(consolidated_validators)}")
@@ -942,11 +2048,12 @@ Examples:
             sys.exit(1)
 
         # Fetch beacon chain balances for existing 0x02 validators to use as targets
-        existing_targets = []
+        existing_candidates = []
         if consolidated_validators:
             print(f"\nFetching beacon chain balances for {len(consolidated_validators)} existing 0x02 validators...")
-            consolidated_pubkeys = [v.get('pubkey', '') for v in consolidated_validators if v.get('pubkey')]
-            beacon_details = fetch_validator_details_batch(consolidated_pubkeys, beacon_api=args.beacon_api)
+            beacon_details = {}
+            for future in details_futures:
+                beacon_details.update(future.result())
             missing_balance_pubkeys = []
 
             for v in consolidated_validators:
@@ -960,14 +2067,12 @@ Examples:
                     missing_balance_pubkeys.append(pubkey)
                     continue
 
-                if balance_eth > 0 and balance_eth < args.max_target_balance:
-                    capacity = calculate_consolidation_capacity(balance_eth, args.max_target_balance)
-                    if capacity > 0:
-                        v['balance_eth'] = balance_eth
-                        # Use beacon withdrawal credentials (already 0x02)
-                        if details.get('beacon_withdrawal_credentials'):
-                            v['beacon_withdrawal_credentials'] = details['beacon_withdrawal_credentials']
-                        existing_targets.append(v)
+                if balance_eth > 0:
+                    v['balance_eth'] = balance_eth
+                    # Use beacon withdrawal credentials (already 0x02)
+                    if details.get('beacon_withdrawal_credentials'):
+                        v['beacon_withdrawal_credentials'] = details['beacon_withdrawal_credentials']
+                    existing_candidates.append(v)
 
             if missing_balance_pubkeys:
                 print("\nError: Missing beacon balance for existing 0x02 validator targets.")
@@ -979,6 +2084,19 @@ Examples:
                 print("Aborting to avoid using fallback/default balances for existing 0x02 targets.")
                 sys.exit(1)
 
+        if previous_plan:
+            filtered_validators, carried_targets, pending_targets = pin_previous_targets(
+                filtered_validators, existing_candidates, previous_plan
+            )
+            print(f"\nNew 0x01 validators to plan: {len(filtered_validators)}")
+            print(f"Pinned targets already 0x02 (reusable at planned balance): {carried_targets}")
+            print(f"Pinned targets still 0x01 (kept as targets, 0x02 conversion scheduled first): {pending_targets}")
+            if not filtered_validators:
+                print("Nothing to plan: every 0x01 validator is covered by the previous plan")
+                return
+
+        existing_targets = filter_existing_targets(existing_candidates, args.max_target_balance)
+        if consolidated_validators:
             print(f"  0x02 validators with capacity (balance < {args.max_target_balance} ETH): {len(existing_targets)}")
             if existing_targets:
                 total_capacity = sum(
@@ -992,15 +2110,53 @@ Examples:
         source_count = args.count if args.count > 0 else len(filtered_validators)
         print(f"\nUsing source count: {source_count}")
 
+        # A failed background fetch is retried (with fallback) by the planner
+        try:
+            beacon_state = beacon_state_future.result()
+        except Exception:
+            beacon_state = None
+        registry = registry_future.result()
+        pending_partials = partials_future.result()
+
+        if args.sweep:
+            results = run_parameter_sweep(
+                filtered_validators,
+                existing_candidates,
+                source_count,
+                max_target_balance_grid,
+                bucket_hours_grid,
+                optimize=args.optimize,
+                fee_per_request=args.fee,
+                workers=args.workers,
+                beacon_state=beacon_state,
+                registry=registry,
+                pending_partials=pending_partials
+            )
+            print_sweep_table(results)
+            return
+
         # Create consolidation plan
         plan = create_consolidation_plan(
             filtered_validators,
             source_count,
             args.max_target_balance,
             args.bucket_hours,
-            existing_targets=existing_targets
+            existing_targets=existing_targets,
+            optimize=args.optimize,
+            workers=args.workers,
+            beacon_state=beacon_state,
+            registry=registry,
+            pending_partials=pending_partials
         )
         
+        if previous_plan:
+            plan['summary']['incremental'] = {
+                'previous_plan': previous_plan['plan_file'],
+                'previous_transactions': previous_plan['num_transactions'],
+                'pinned_targets': len(previous_plan['pinned_targets']),
+                'consumed_sources': len(previous_plan['consumed_source_pubkeys']),
+            }
+        
         if plan['summary']['total_sources'] == 0:
             print("\nError: Could not create any consolidations")
             print("This may happen if all validators are already targets or at capacity")
@@ -1021,6 +2177,7 @@ Examples:
             write_output(plan, args.output, operator_name)
         
     finally:
+        stages.shutdown(wait=False, cancel_futures=True)
         conn.close()
 
 
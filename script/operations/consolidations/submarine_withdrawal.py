@@ -15,6 +15,10 @@ Key design:
   - This auto-compounds 0x01 -> 0x02 if needed, with no separate step or waiting
   - Linking is done once for all validators
 
+Optimize mode (--optimize):
+  - Uses each validator's beacon balance instead of 32 ETH per source
+  - Picks pods and sources for the fewest transactions, then the least overshoot
+
 Unrestake mode (--unrestake-only):
   - Skips consolidation entirely; queues ETH withdrawals directly from existing pod balances
   - Each pod's full balance is withdrawable (no 2048 ETH cap math)
@@ -23,6 +27,7 @@ Unrestake mode (--unrestake-only):
 Usage:
     python3 submarine_withdrawal.py --operator "Cosmostation" --amount 10000
     python3 submarine_withdrawal.py --operator "Cosmostation" --amount 10000 --dry-run
+    python3 submarine_withdrawal.py --operator "Cosmostation" --amount 10000 --optimize
     python3 submarine_withdrawal.py --operator "Cosmostation" --amount 1000 --unrestake-only
     python3 submarine_withdrawal.py --list-operators
 
@@ -38,7 +43,9 @@ import math
 import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import accumulate
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -52,6 +59,8 @@ from utils.validator_utils import (
     list_operators,
     query_validators,
     fetch_validator_details_batch,
+    set_beacon_concurrency,
+    DEFAULT_BEACON_CONCURRENCY,
 )
 
 from query_validators_consolidation import (
@@ -84,6 +93,14 @@ DEFAULT_BATCH_SIZE = 150      # validators per tx (including target at [0])
 DEFAULT_FEE = 1               # wei per consolidation request
 MIN_WITHDRAWAL_AMOUNT = 32    # ETH - minimum sensible withdrawal
 MAX_VALIDATORS_QUERY = 100000
+DEFAULT_RPC_CONCURRENCY = 8   # concurrent cast calls for link checks and node lookups
+MAX_FRONT_STATES = 8         # knapsack states kept per transaction count (--optimize)
+MAX_TIE_CANDIDATES = 16       # minimum-transaction combinations compared on overshoot
+MAX_SWAP_PASSES = 50          # equal-cost pod swaps tried to cut the optimizer's overshoot
+
+# HOTFIX: cap max withdrawal for specific pod
+HOTFIX_POD = "82a5b8abea11b1c969ccd7ea59f0f4c2fb392089"
+HOTFIX_MAX_WITHDRAWAL = 3099
 
 
 # =============================================================================
@@ -177,6 +194,16 @@ def evaluate_pod_unrestake(wc_address: str, validators: List[Dict]) -> Dict:
     }
 
 
+def apply_withdrawal_hotfix(evaluations: List[Dict]):
+    """HOTFIX: cap max withdrawal for specific pod."""
+    for e in evaluations:
+        if e['wc_address'].lower() == HOTFIX_POD:
+            if e['max_withdrawal_eth'] > HOTFIX_MAX_WITHDRAWAL:
+                print(f"  HOTFIX: Capping 0x{HOTFIX_POD} max withdrawal from {e['max_withdrawal_eth']:,.0f} to {HOTFIX_MAX_WITHDRAWAL} ETH")
+                e['max_withdrawal_eth'] = HOTFIX_MAX_WITHDRAWAL
+            e['withdrawal_cap_eth'] = HOTFIX_MAX_WITHDRAWAL
+
+
 def display_eigenpods_table(evaluations: List[Dict]):
     """Always print a table of all EigenPods for the operator."""
     # Sort by total ETH descending
@@ -260,6 +287,345 @@ def select_pods_for_withdrawal(
     return selections, total_withdrawal
 
 
+def count_submarine_transactions(selections: List[Dict], batch_size: int) -> int:
+    """Consolidation batches plus one queueETHWithdrawal per pod (linking excluded)."""
+    sources_per_tx = batch_size - 1
+    return sum(math.ceil(s['num_sources'] / sources_per_tx) + 1 for s in selections)
+
+
+def beacon_withdrawal_eth(selections: List[Dict]) -> float:
+    """Total withdrawal of pod selections at beacon balances (target + sources - 2048 per pod)."""
+    return sum(
+        s['pod_eval']['target_balance_eth'] + sum(get_balance(v) for v in s['sources']) - MAX_EFFECTIVE_BALANCE
+        for s in selections
+    )
+
+
+def build_pod_withdrawal_profile(
+    pod_eval: Dict,
+    pod_validators: List[Dict],
+    sources_per_tx: int,
+) -> Dict:
+    """
+    Withdrawal range per consolidation transaction count for one pod, from real balances.
+
+    Sources are sorted ascending and summed once (prefix sums). Using t transactions
+    means between (t-1)*sources_per_tx+1 and t*sources_per_tx sources; the smallest
+    such set gives the low end of the range, the largest balances the high end.
+
+    Returns:
+        Dict with target, sorted sources, prefix sums and options [(num_txs, low_eth, high_eth)]
+    """
+    target = pod_eval['target']
+    target_pubkey = target.get('pubkey', '').lower()
+    sources = [v for v in pod_validators if v.get('pubkey', '').lower() != target_pubkey]
+    sources.sort(key=get_balance)
+    prefix = [0.0] + list(accumulate(get_balance(v) for v in sources))
+
+    n = len(sources)
+    base = pod_eval['target_balance_eth'] - MAX_EFFECTIVE_BALANCE
+    cap = pod_eval.get('withdrawal_cap_eth', float('inf'))
+
+    options = []
+    for num_txs in range(1, math.ceil(n / sources_per_tx) + 1):
+        k_min = (num_txs - 1) * sources_per_tx + 1
+        k_max = min(num_txs * sources_per_tx, n)
+        low = max(0.0, base + prefix[k_min])
+        high = min(cap, base + prefix[n] - prefix[n - k_max])
+        if low > cap:
+            break
+        if high > 0:
+            options.append((num_txs, low, high))
+
+    return {
+        'pod_eval': pod_eval,
+        'target': target,
+        'sources': sources,
+        'prefix': prefix,
+        'base': base,
+        'options': options,
+    }
+
+
+def select_sources_for_amount(profile: Dict, num_txs: int, need_eth: float, sources_per_tx: int) -> List[Dict]:
+    """
+    Fewest sources (within num_txs transactions) whose withdrawal reaches need_eth,
+    choosing the window of consecutive balances that overshoots least.
+    """
+    sources = profile['sources']
+    prefix = profile['prefix']
+    n = len(sources)
+    required = need_eth - profile['base']
+
+    k = (num_txs - 1) * sources_per_tx + 1
+    k_max = min(num_txs * sources_per_tx, n)
+    while k < k_max and prefix[n] - prefix[n - k] < required:
+        k += 1
+
+    # Window sums over ascending balances are non-decreasing: binary search the first that fits
+    lo, hi = 0, n - k
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if prefix[mid + k] - prefix[mid] >= required:
+            hi = mid
+        else:
+            lo = mid + 1
+    return sources[lo:lo + k]
+
+
+def option_cost(profile: Dict, option: Tuple[int, float, float]) -> int:
+    """Transactions for a profile option: consolidation batches + queueETHWithdrawal,
+    or profile['unrestake_cost'] for a direct unrestake (0 batches)."""
+    if option[0] == 0:
+        return profile.get('unrestake_cost', 1)
+    return option[0] + 1
+
+
+def solve_min_transaction_options(
+    profiles: List[Dict],
+    amount_eth: float,
+    cost_bound: int,
+) -> List[List[Tuple[int, int]]]:
+    """
+    Multiple-choice knapsack: pick at most one option per pod so the high ends
+    cover amount_eth with the fewest transactions.
+
+    Each cost keeps the Pareto front of (sum of low ends, sum of high ends),
+    at most MAX_FRONT_STATES states. Among combinations with the fewest
+    transactions, a lower sum of low ends can land closer to amount_eth and a
+    higher sum of high ends leaves more room to place it, so the covering
+    states at that cost are all tie candidates; the caller keeps the one with
+    the least overshoot.
+
+    Returns:
+        Up to MAX_TIE_CANDIDATES [(profile_index, option_index)] lists with the
+        minimum number of transactions (the most-headroom one included);
+        [] if amount_eth is unreachable
+    """
+    # fronts[c]: [(low, high, picks)] with picks a linked list (profile_idx, opt_idx, rest)
+    fronts = [[] for _ in range(cost_bound + 1)]
+    fronts[0] = [(0.0, 0.0, None)]
+
+    for profile_idx, profile in enumerate(profiles):
+        added = {}
+        for opt_idx, option in enumerate(profile['options']):
+            cost = option_cost(profile, option)
+            if cost > cost_bound:
+                continue
+            _, low, high = option
+            for c in range(cost_bound - cost + 1):
+                if fronts[c]:
+                    added.setdefault(c + cost, []).extend(
+                        (state_low + low, state_high + high, (profile_idx, opt_idx, picks))
+                        for state_low, state_high, picks in fronts[c]
+                    )
+        for c, states in added.items():
+            fronts[c] = pareto_front(fronts[c] + states, amount_eth)
+
+    for front in fronts:
+        covering = [state for state in front if state[1] >= amount_eth - 1e-9]
+        if covering:
+            candidates = []
+            for _, _, picks in thin(covering, MAX_TIE_CANDIDATES):
+                picked = []
+                while picks is not None:
+                    profile_idx, opt_idx, picks = picks
+                    picked.append((profile_idx, opt_idx))
+                candidates.append(picked)
+            return candidates
+    return []
+
+
+def pareto_front(states: List[Tuple], amount_eth: float) -> List[Tuple]:
+    """
+    States not beaten on both a lower low end and a higher high end (high ends
+    compared up to amount_eth), lowest low first, plus the state with the most
+    headroom.
+    """
+    if not states:
+        return states
+    front = []
+    reach = float('-inf')
+    for state in sorted(states, key=lambda s: (s[0], -s[1])):
+        capped = min(state[1], amount_eth)
+        if capped > reach + 1e-9:
+            front.append(state)
+            reach = capped
+    front = thin(front, MAX_FRONT_STATES)
+    headroom = max(states, key=lambda s: s[1])
+    if headroom[1] > front[-1][1]:
+        front.append(headroom)
+    return front
+
+
+def thin(items: List, limit: int) -> List:
+    """At most limit items, evenly spaced, keeping the first and the last."""
+    if len(items) <= limit:
+        return items
+    step = (len(items) - 1) / (limit - 1)
+    return [items[round(i * step)] for i in range(limit)]
+
+
+def optimize_pods_for_withdrawal(
+    evaluations: List[Dict],
+    wc_groups: Dict[str, List[Dict]],
+    amount_eth: float,
+    batch_size: int,
+) -> Tuple[List[Dict], float]:
+    """
+    Select pods and sources for the fewest transactions, then the least overshoot.
+
+    Unlike select_pods_for_withdrawal this uses each validator's beacon balance
+    instead of DEFAULT_SOURCE_BALANCE. Pods are reduced to a few (transactions,
+    withdrawal range) options, a knapsack over all pods picks the cheapest
+    combination covering amount_eth, and the amount is then spread over the
+    chosen pods so each takes the window of sources that overshoots least.
+
+    Returns:
+        Same shape as select_pods_for_withdrawal: (pod_selections, total_withdrawal_eth)
+    """
+    sources_per_tx = batch_size - 1
+    profiles = [
+        build_pod_withdrawal_profile(e, wc_groups[e['wc_address']], sources_per_tx)
+        for e in evaluations if e['target'] is not None
+    ]
+    return plan_from_withdrawal_profiles(profiles, amount_eth, sources_per_tx)
+
+
+def plan_from_withdrawal_profiles(
+    profiles: List[Dict],
+    amount_eth: float,
+    sources_per_tx: int,
+) -> Tuple[List[Dict], float]:
+    """
+    Solve the knapsack over pod profiles and turn the chosen options into pod selections.
+
+    Every minimum-transaction combination the solver returns is allocated and
+    the one with the least overshoot over amount_eth is kept; single-pod swaps
+    at equal cost then reduce the overshoot further where they can.
+
+    An option with 0 consolidation transactions is a direct unrestake: no sources,
+    one queueETHWithdrawal for exactly the amount allocated to the pod
+    (profile['unrestake_eval'] supplies the pod evaluation).
+
+    Returns:
+        (pod_selections, total_withdrawal_eth); each selection carries
+        'action' = 'submarine' or 'unrestake'
+    """
+    profiles = [p for p in profiles if p['options']]
+
+    # Upper bound on the answer: largest pods first, each at its largest option
+    cost_bound = 0
+    covered = 0.0
+    for p in sorted(profiles, key=lambda p: max(o[2] for o in p['options']), reverse=True):
+        if covered >= amount_eth:
+            break
+        option = max(p['options'], key=lambda o: o[2])
+        cost_bound += option_cost(p, option)
+        covered += option[2]
+    if covered < amount_eth:
+        return [], 0.0
+
+    candidates = solve_min_transaction_options(profiles, amount_eth, cost_bound)
+    if not candidates:
+        return [], 0.0
+
+    def overshoot(picked):
+        return allocate_withdrawal_options(profiles, list(picked), amount_eth, sources_per_tx)[1] - amount_eth
+
+    best = min(candidates, key=overshoot)
+    best_overshoot = overshoot(best)
+
+    # Same transaction count, less overshoot: swap one pod's option for another pod's option of equal cost
+    for _ in range(MAX_SWAP_PASSES):
+        improved = False
+        for i, (profile_idx, opt_idx) in enumerate(list(best)):
+            cost = option_cost(profiles[profile_idx], profiles[profile_idx]['options'][opt_idx])
+            others = best[:i] + best[i + 1:]
+            used = {p for p, _ in others}
+            high_others = sum(profiles[p]['options'][o][2] for p, o in others)
+            for j, profile in enumerate(profiles):
+                if j in used:
+                    continue
+                for k, option in enumerate(profile['options']):
+                    if (j, k) == (profile_idx, opt_idx) or option_cost(profile, option) != cost:
+                        continue
+                    if high_others + option[2] < amount_eth - 1e-9:
+                        continue
+                    swapped = others + [(j, k)]
+                    swapped_overshoot = overshoot(swapped)
+                    if swapped_overshoot < best_overshoot - 1e-9:
+                        best, best_overshoot, improved = swapped, swapped_overshoot, True
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+        if not improved:
+            break
+
+    return allocate_withdrawal_options(profiles, list(best), amount_eth, sources_per_tx)
+
+
+def allocate_withdrawal_options(
+    profiles: List[Dict],
+    picked: List[Tuple[int, int]],
+    amount_eth: float,
+    sources_per_tx: int,
+) -> Tuple[List[Dict], float]:
+    """Spread amount_eth over the picked (profile, option) pairs and select each pod's sources."""
+    # Largest pods take the amount first; the rest stay as low as their transaction count allows
+    picked.sort(key=lambda item: profiles[item[0]]['options'][item[1]][2], reverse=True)
+    lows_after = [0.0] * (len(picked) + 1)
+    for i in range(len(picked) - 1, -1, -1):
+        profile_idx, opt_idx = picked[i]
+        lows_after[i] = lows_after[i + 1] + profiles[profile_idx]['options'][opt_idx][1]
+
+    selections = []
+    remaining = amount_eth
+    for i, (profile_idx, opt_idx) in enumerate(picked):
+        profile = profiles[profile_idx]
+        num_txs, low, high = profile['options'][opt_idx]
+        need = min(high, max(low, remaining - lows_after[i + 1]))
+
+        if num_txs == 0:
+            if need <= 0:
+                continue
+            pod_eval = profile['unrestake_eval']
+            selections.append({
+                'pod_eval': pod_eval,
+                'target': pod_eval['target'],
+                'sources': [],
+                'num_sources': 0,
+                'post_consolidation_eth': pod_eval['total_eth'],
+                'withdrawal_eth': need,
+                'action': 'unrestake',
+            })
+            remaining -= need
+            continue
+
+        sources = select_sources_for_amount(profile, num_txs, need, sources_per_tx)
+        target_balance = profile['pod_eval']['target_balance_eth']
+        post_consolidation = target_balance + sum(get_balance(v) for v in sources)
+        withdrawal = post_consolidation - MAX_EFFECTIVE_BALANCE
+        if withdrawal <= 0:
+            continue
+
+        selections.append({
+            'pod_eval': profile['pod_eval'],
+            'target': profile['target'],
+            'sources': sources,
+            'num_sources': len(sources),
+            'post_consolidation_eth': post_consolidation,
+            'withdrawal_eth': withdrawal,
+            'action': 'submarine',
+        })
+        remaining -= withdrawal
+
+    total_withdrawal = sum(s['withdrawal_eth'] for s in selections)
+    return selections, total_withdrawal
+
+
 def select_pods_for_unrestake(
     evaluations: List[Dict],
     amount_eth: float,
@@ -411,6 +777,7 @@ def filter_unlinked_validators(
     ids: List[int],
     pubkeys: List[bytes],
     rpc_url: str,
+    max_workers: int = 1,
 ) -> Tuple[List[int], List[bytes]]:
     """Filter out already-linked validators, returning only those that need linking."""
     if not ids:
@@ -419,9 +786,11 @@ def filter_unlinked_validators(
     unlinked_ids = []
     unlinked_pubkeys = []
 
-    for vid, pk_bytes in zip(ids, pubkeys):
-        pk_hex = '0x' + pk_bytes.hex()
-        linked = is_pubkey_linked(pk_hex, rpc_url)
+    pk_hexes = ['0x' + pk_bytes.hex() for pk_bytes in pubkeys]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        linked_flags = list(executor.map(lambda pk_hex: is_pubkey_linked(pk_hex, rpc_url), pk_hexes))
+
+    for vid, pk_bytes, pk_hex, linked in zip(ids, pubkeys, pk_hexes, linked_flags):
         if linked:
             print(f"    Target {pk_hex[:20]}... (id={vid}) already linked, skipping")
         else:
@@ -723,6 +1092,18 @@ def get_node_address(validator_id: int, rpc_url: str) -> Optional[str]:
         return None
 
 
+def resolve_node_addresses(
+    validator_ids: List[int],
+    rpc_url: str,
+    max_workers: int = 1,
+) -> Dict[int, Optional[str]]:
+    """Resolve node addresses for several validator IDs, max_workers cast calls at a time."""
+    unique_ids = list(dict.fromkeys(validator_ids))
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        addresses = executor.map(lambda vid: get_node_address(vid, rpc_url), unique_ids)
+        return dict(zip(unique_ids, addresses))
+
+
 def encode_queue_eth_withdrawal(node_address: str, amount_wei: int) -> str:
     """Encode queueETHWithdrawal(address,uint256) calldata."""
     selector = bytes.fromhex(QUEUE_ETH_WITHDRAWAL_SELECTOR)
@@ -737,6 +1118,7 @@ def write_queue_withdrawal_transactions(
     from_address: str,
     rpc_url: str,
     subdirectory: Optional[str] = "post-sweep",
+    node_addresses: Optional[Dict[int, Optional[str]]] = None,
 ) -> Optional[str]:
     """
     Generate queue-withdrawals.json with queueETHWithdrawal calls for each pod.
@@ -748,6 +1130,8 @@ def write_queue_withdrawal_transactions(
     Args:
         subdirectory: Subdirectory within output_dir. Default "post-sweep" for submarine mode.
                       Pass None to write directly to output_dir (unrestake mode).
+        node_addresses: Pre-resolved validator ID -> node address (see resolve_node_addresses).
+                        IDs not present are resolved here.
     """
     if not rpc_url:
         print("  Warning: MAINNET_RPC_URL not set, writing queue-withdrawals metadata only")
@@ -763,7 +1147,10 @@ def write_queue_withdrawal_transactions(
 
         node_address = None
         if rpc_url and target_id is not None:
-            node_address = get_node_address(target_id, rpc_url)
+            if node_addresses is not None and target_id in node_addresses:
+                node_address = node_addresses[target_id]
+            else:
+                node_address = get_node_address(target_id, rpc_url)
             if node_address:
                 print(f"    Target id={target_id} -> node {node_address}")
 
@@ -829,6 +1216,9 @@ Examples:
   # Custom batch size and output directory
   python3 submarine_withdrawal.py --operator "Cosmostation" --amount 10000 --batch-size 100 --output-dir ./my-txns
 
+  # Fewest transactions for the amount, using real beacon balances
+  python3 submarine_withdrawal.py --operator "Cosmostation" --amount 10000 --optimize --dry-run
+
   # Unrestake: withdraw directly from pod balances (no consolidation)
   python3 submarine_withdrawal.py --operator "Cosmostation" --amount 1000 --unrestake-only
         """
@@ -842,10 +1232,17 @@ Examples:
                         help=f'Fee per consolidation request in wei (default: {DEFAULT_FEE})')
     parser.add_argument('--unrestake-only', action='store_true',
                         help='Skip consolidation; queue ETH withdrawals directly from existing pod balances')
+    parser.add_argument('--optimize', action='store_true',
+                        help='Choose pods and sources from beacon balances for the fewest transactions, '
+                             'then the least overshoot (reports savings vs greedy)')
     parser.add_argument('--dry-run', action='store_true', help='Preview plan without writing files')
     parser.add_argument('--list-operators', action='store_true', help='List available operators')
     parser.add_argument('--beacon-api', default='https://beaconcha.in/api/v1',
                         help='Beacon chain API base URL')
+    parser.add_argument('--beacon-concurrency', type=int, default=DEFAULT_BEACON_CONCURRENCY,
+                        help=f'Beacon API requests in flight at once, across all stages (default: {DEFAULT_BEACON_CONCURRENCY})')
+    parser.add_argument('--rpc-concurrency', type=int, default=DEFAULT_RPC_CONCURRENCY,
+                        help=f'Concurrent on-chain lookups in Step 6 (default: {DEFAULT_RPC_CONCURRENCY})')
 
     args = parser.parse_args()
 
@@ -860,10 +1257,20 @@ Examples:
         parser.print_help()
         sys.exit(1)
 
+    if args.optimize and args.unrestake_only:
+        print("Error: --optimize applies to submarine mode only")
+        sys.exit(1)
+
     if args.amount and args.amount < MIN_WITHDRAWAL_AMOUNT:
         print(f"Error: --amount must be at least {MIN_WITHDRAWAL_AMOUNT} ETH")
         sys.exit(1)
 
+    if args.beacon_concurrency < 1 or args.rpc_concurrency < 1:
+        print("Error: --beacon-concurrency and --rpc-concurrency must be at least 1")
+        sys.exit(1)
+    # Background stages and batch pools share this one limit on beacon requests
+    set_beacon_concurrency(args.beacon_concurrency)
+
     # Connect to DB
     try:
         conn = get_db_connection()
@@ -916,7 +1323,9 @@ Examples:
         # ================================================================
         print("\nStep 2: Fetching beacon chain details (balance + status)...")
         pubkeys = [v.get('pubkey', '') for v in validators if v.get('pubkey')]
-        details = fetch_validator_details_batch(pubkeys, beacon_api=args.beacon_api)
+        details = fetch_validator_details_batch(
+            pubkeys, beacon_api=args.beacon_api, max_workers=args.beacon_concurrency
+        )
 
         for v in validators:
             pk = v.get('pubkey', '')
@@ -950,14 +1359,7 @@ Examples:
         for wc_address, pod_validators in wc_groups.items():
             evaluations.append(eval_fn(wc_address, pod_validators))
 
-        # HOTFIX: cap max withdrawal for specific pod
-        HOTFIX_POD = "82a5b8abea11b1c969ccd7ea59f0f4c2fb392089"
-        HOTFIX_MAX_WITHDRAWAL = 3099
-        for e in evaluations:
-            if e['wc_address'].lower() == HOTFIX_POD:
-                if e['max_withdrawal_eth'] > HOTFIX_MAX_WITHDRAWAL:
-                    print(f"  HOTFIX: Capping 0x{HOTFIX_POD} max withdrawal from {e['max_withdrawal_eth']:,.0f} to {HOTFIX_MAX_WITHDRAWAL} ETH")
-                    e['max_withdrawal_eth'] = HOTFIX_MAX_WITHDRAWAL
+        apply_withdrawal_hotfix(evaluations)
 
         # Always print the full pod table
         display_eigenpods_table(evaluations)
@@ -978,6 +1380,26 @@ Examples:
             selections, total_withdrawal = select_pods_for_unrestake(evaluations, args.amount)
         else:
             selections, total_withdrawal = select_pods_for_withdrawal(evaluations, wc_groups, args.amount)
+            if args.optimize:
+                greedy_transactions = count_submarine_transactions(selections, args.batch_size)
+                # Compare on beacon balances, as the optimizer plans with them
+                greedy_withdrawal = beacon_withdrawal_eth(selections)
+                greedy_overshoot = greedy_withdrawal - args.amount if greedy_withdrawal >= args.amount else float('inf')
+                optimized, optimized_withdrawal = optimize_pods_for_withdrawal(
+                    evaluations, wc_groups, args.amount, args.batch_size
+                )
+                if optimized:
+                    optimized_transactions = count_submarine_transactions(optimized, args.batch_size)
+                    print(f"  Optimizer: {optimized_transactions} transactions, "
+                          f"{optimized_withdrawal - args.amount:,.2f} ETH overshoot "
+                          f"(greedy: {greedy_transactions} transactions, "
+                          f"{greedy_withdrawal - args.amount:,.2f} ETH overshoot at beacon balances)")
+                    if (optimized_transactions, optimized_withdrawal - args.amount) < (greedy_transactions, greedy_overshoot):
+                        selections, total_withdrawal = optimized, optimized_withdrawal
+                    else:
+                        print("  Optimizer: no fewer transactions or less overshoot, keeping greedy selection")
+                else:
+                    print("  Optimizer: beacon balances cannot cover the amount, keeping greedy selection")
 
         if not selections:
             print("  Error: Could not select any pods for withdrawal")
@@ -1060,11 +1482,23 @@ Examples:
         admin_address = os.environ.get('ADMIN_ADDRESS', ADMIN_EOA)
         rpc_url = os.environ.get('MAINNET_RPC_URL', '')
 
+        # Node addresses for queue-withdrawals.json do not depend on the other
+        # outputs; resolve them in the background while those are written
+        lookups = ThreadPoolExecutor(max_workers=1)
+        node_addresses_future = None
+        if rpc_url:
+            target_ids = [sel['target'].get('id') for sel in selections if sel['target'].get('id') is not None]
+            node_addresses_future = lookups.submit(
+                resolve_node_addresses, target_ids, rpc_url, args.rpc_concurrency
+            )
+        lookups.shutdown(wait=False)
+
         if args.unrestake_only:
             # Unrestake mode: only queue-withdrawals.json + submarine-plan.json
             write_queue_withdrawal_transactions(
                 selections, output_dir, chain_id, admin_address, rpc_url,
                 subdirectory=None,
+                node_addresses=node_addresses_future.result() if node_addresses_future else None,
             )
 
             write_unrestake_plan(
@@ -1099,7 +1533,9 @@ Examples:
             if all_ids:
                 print(f"\n  Checking on-chain linking status for {len(all_ids)} src[0] validator(s)...")
                 if rpc_url:
-                    all_ids, all_pubkeys = filter_unlinked_validators(all_ids, all_pubkeys, rpc_url)
+                    all_ids, all_pubkeys = filter_unlinked_validators(
+                        all_ids, all_pubkeys, rpc_url, max_workers=args.rpc_concurrency
+                    )
                 else:
                     print("    Warning: MAINNET_RPC_URL not set, skipping on-chain link check")
 
@@ -1128,6 +1564,7 @@ Examples:
             # 6d: queue-withdrawals.json (queueETHWithdrawal per pod)
             write_queue_withdrawal_transactions(
                 selections, output_dir, chain_id, admin_address, rpc_url,
+                node_addresses=node_addresses_future.result() if node_addresses_future else None,
             )
 
             # 6e: submarine-plan.json
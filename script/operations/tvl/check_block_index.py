@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+check_block_index.py - Check compare_tvl's block-timestamp index against a synthetic chain
+
+Serves a synthetic chain (irregular block times before a "merge" block, 12s
+after) over a local JSON-RPC endpoint and checks that
+BlockTimestampIndex.resolve():
+
+- returns the first block with timestamp >= each target (brute force),
+- maps targets after the chain head to None,
+- gives the same answer for a generator of timestamps as for a list
+  (callers pass `r["updated_at"] for r in rounds`),
+- reuses a saved index file and needs fewer header fetches on the second run,
+- keeps the points another chain saved in the same file.
+
+Usage:
+    python3 check_block_index.py
+    python3 check_block_index.py --blocks 500000 --targets 2000 --seed 7
+"""
+
+import argparse
+import bisect
+import json
+import random
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from compare_tvl import BlockTimestampIndex
+
+
+# =============================================================================
+# Synthetic Chain
+# =============================================================================
+
+def generate_chain(num_blocks: int, seed: int):
+    """Block timestamps: 10-20s apart for the first half, exactly 12s after."""
+    rng = random.Random(seed)
+    merge = num_blocks // 2
+    timestamps, ts = [], 1_438_269_973
+    for block in range(num_blocks):
+        timestamps.append(ts)
+        ts += rng.randint(10, 20) if block < merge else 12
+    return timestamps
+
+
+def make_handler(timestamps):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def header(self, tag):
+            number = len(timestamps) - 1 if tag == "latest" else int(tag, 16)
+            if not 0 <= number < len(timestamps):
+                return None
+            return {"number": hex(number), "timestamp": hex(timestamps[number])}
+
+        def call(self, request):
+            method, params = request["method"], request["params"]
+            if method == "eth_chainId":
+                result = "0x1"
+            elif method in ("eth_getHeaderByNumber", "eth_getBlockByNumber"):
+                result = self.header(params[0])
+            else:
+                return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32601, "message": "not found"}}
+            return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            response = [self.call(r) for r in body] if isinstance(body, list) else self.call(body)
+            payload = json.dumps(response).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+# =============================================================================
+# Checks
+# =============================================================================
+
+def expected(timestamps, targets):
+    """First block with timestamp >= target, by bisection over the full chain."""
+    result = {}
+    for t in targets:
+        i = bisect.bisect_left(timestamps, t)
+        result[t] = (i, timestamps[i]) if i < len(timestamps) else None
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check BlockTimestampIndex against a synthetic chain")
+    parser.add_argument("--blocks", type=int, default=200000, help="Synthetic chain length (default: 200000)")
+    parser.add_argument("--targets", type=int, default=500, help="Timestamps to resolve (default: 500)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    args = parser.parse_args()
+
+    timestamps = generate_chain(args.blocks, args.seed)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(timestamps))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    rpc_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    rng = random.Random(args.seed)
+    targets = [rng.randint(timestamps[0], timestamps[-1]) for _ in range(args.targets)]
+    targets += [timestamps[-1] + 1, timestamps[-1] + 3600]  # after the head
+    want = expected(timestamps, targets)
+    failures = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "block-timestamps.json"
+        other_chain = {"999": [[0, 1_500_000_000], [100, 1_500_001_200]]}
+        with open(path, "w") as f:
+            json.dump({"chains": other_chain}, f)
+        runs = [
+            ("list", lambda index: index.resolve(list(targets))),
+            ("generator", lambda index: index.resolve(t for t in targets)),
+            ("generator, saved index", lambda index: index.resolve(t for t in targets)),
+        ]
+        fetches = []
+        for name, run in runs:
+            index = BlockTimestampIndex(rpc_url, path if "saved" in name else None)
+            got = run(index)
+            if name == "generator":
+                # Populate the saved index for the next run
+                index.path = path
+                index.save()
+            wrong = [t for t in targets if got.get(t, "missing") != want[t]]
+            fetches.append(index.fetches)
+            status = "OK" if not wrong else f"FAIL ({len(wrong)} wrong, e.g. {wrong[0]}: {got.get(wrong[0], 'missing')})"
+            print(f"  {name:<24} {len(got):>6} resolved, {index.fetches:>6} header fetches   {status}")
+            failures += bool(wrong)
+
+        with open(path) as f:
+            saved = json.load(f)["chains"]
+        if saved.get("999") != other_chain["999"]:
+            print("  FAIL: saving the index dropped the points of another chain")
+            failures += 1
+    if fetches[2] >= fetches[1]:
+        print(f"  FAIL: the saved index did not reduce header fetches ({fetches[2]} >= {fetches[1]})")
+        failures += 1
+
+    server.shutdown()
+    print("All checks passed" if not failures else f"{failures} check(s) failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,14 +4,35 @@ compare_tvl.py - Compare Chainlink-reported TVL vs LiquidityPool.getTotalPooledE
 
 Strategy:
 1. Use getRoundData() on the Chainlink proxy to iterate through the last 30 days of rounds
-2. Use the updatedAt timestamp from each round to find the exact block via binary search
+2. Use the updatedAt timestamp from each round to find the exact block via a
+   block-timestamp index (interpolation search over cached known blocks)
 3. Call LiquidityPool.getTotalPooledEther() at each of those blocks
 4. Compare the two values
+
+Reads are batched: the round range is found by binary search on the round
+id, round data comes from Multicall3 at latest, and the historical
+getTotalPooledEther() calls go out as concurrent JSON-RPC batches.
+
+Compared rounds are kept in a local SQLite history. Each run only fetches
+rounds newer than the last stored one (and any older rounds the requested
+window needs), then reports the window from the store.
+
+Usage:
+    python3 compare_tvl.py
+    python3 compare_tvl.py --days 365
+    python3 compare_tvl.py --since 2025-01-01 --until 2025-03-31 --offline
+    python3 compare_tvl.py --follow --interval 600
+    python3 compare_tvl.py --block-index /tmp/block-timestamps.json
 """
 
+import argparse
+import bisect
 import os
+import sqlite3
 import sys
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
@@ -31,6 +52,8 @@ except ImportError:
     pass
 
 try:
+    import requests
+    from eth_abi import decode, encode
     from web3 import Web3
 except ImportError:
     print("Error: web3 not installed. Run: pip install web3")
@@ -83,183 +106,621 @@ CHAINLINK_PROXY_ABI = json.loads("""[
     }
 ]""")
 
-LIQUIDITY_POOL_ABI = json.loads("""[
-    {
-        "inputs": [],
-        "name": "getTotalPooledEther",
-        "outputs": [{"name": "", "type": "uint256"}],
-        "stateMutability": "view",
-        "type": "function"
-    }
-]""")
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+SEL_GET_ROUND_DATA = Web3.keccak(text="getRoundData(uint80)")[:4]
+SEL_GET_TOTAL_POOLED_ETHER = Web3.keccak(text="getTotalPooledEther()")[:4]
+SEL_AGGREGATE3 = Web3.keccak(text="aggregate3((address,bool,bytes)[])")[:4]
+
+DEFAULT_DAYS = 30
+DEFAULT_MULTICALL_SIZE = 500    # getRoundData calls per aggregate3
+DEFAULT_RPC_BATCH_SIZE = 50     # calls per JSON-RPC batch array
+DEFAULT_RPC_CONCURRENCY = 4     # JSON-RPC batches in flight
+
+DEFAULT_BLOCK_INDEX = Path.home() / ".cache" / "etherfi-tvl" / "block-timestamps.json"
+DEFAULT_HISTORY_DB = Path.home() / ".cache" / "etherfi-tvl" / "tvl-history.sqlite"
+DEFAULT_FOLLOW_INTERVAL = 300   # seconds between syncs in --follow mode
+REORG_DEPTH = 64  # blocks this close to head are not persisted
+MAX_POOL_TVL_ATTEMPTS = 3  # getTotalPooledEther() reads per round before it stays ERROR
+MAX_ROUND_ATTEMPTS = 3     # getRoundData() reads per round before a failed round is given up
+
+
+# =============================================================================
+# Batched Reads
+# =============================================================================
+
+def rpc_batch(rpc_url, calls, batch_size=DEFAULT_RPC_BATCH_SIZE, concurrency=DEFAULT_RPC_CONCURRENCY):
+    """
+    Send (method, params) calls as JSON-RPC batch arrays, up to `concurrency` in flight.
+
+    Returns one response per call, in order: {"result": ...} or {"error": ...}.
+    """
+    chunks = [calls[i:i + batch_size] for i in range(0, len(calls), batch_size)]
+
+    def send(chunk):
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(chunk)
+        ]
+        response = requests.post(rpc_url, json=payload, timeout=120)
+        response.raise_for_status()
+        body = response.json()
+        if not isinstance(body, list):
+            raise RuntimeError(f"RPC rejected the batch: {body.get('error', body)}")
+        by_id = {item.get("id"): item for item in body}
+        return [by_id.get(i, {"error": {"message": "missing from batch response"}}) for i in range(len(chunk))]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(chunks)))) as executor:
+        return [item for chunk in executor.map(send, chunks) for item in chunk]
+
+
+def multicall(w3, calls):
+    """calls: list of (target, calldata). Returns list of (success, returndata), failures allowed."""
+    payload = SEL_AGGREGATE3 + encode(
+        ["(address,bool,bytes)[]"],
+        [[(target, True, data) for target, data in calls]],
+    )
+    raw = w3.eth.call({"to": MULTICALL3, "data": payload})
+    return decode(["(bool,bytes)[]"], raw)[0]
 
 
-def find_block_by_timestamp(w3, target_ts, lo_hint=None, hi_hint=None):
-    """Binary search to find the first block with timestamp >= target_ts."""
-    lo = lo_hint if lo_hint else 18_000_000
-    hi = hi_hint if hi_hint else w3.eth.block_number
+def get_round_data(chainlink, round_id):
+    """getRoundData(round_id), or None if the round does not exist."""
+    try:
+        return chainlink.functions.getRoundData(round_id).call()
+    except Exception:
+        return None
 
-    # Ensure lo block is before target
-    lo_block = w3.eth.get_block(lo)
-    if lo_block["timestamp"] >= target_ts:
-        return lo
 
+def find_first_round(chainlink, phase_id, latest_agg_round, cutoff_ts):
+    """Binary search for the first aggregator round of the phase updated at or after cutoff_ts."""
+    lo, hi = 1, latest_agg_round
     while lo < hi:
         mid = (lo + hi) // 2
-        block = w3.eth.get_block(mid)
-        if block["timestamp"] < target_ts:
+        data = get_round_data(chainlink, (phase_id << 64) | mid)
+        if data is None or data[3] < cutoff_ts:
             lo = mid + 1
         else:
             hi = mid
-
     return lo
 
 
-def main():
-    rpc_url = os.environ.get("MAINNET_RPC_URL")
-    if not rpc_url:
-        print("Error: MAINNET_RPC_URL environment variable not set")
-        sys.exit(1)
-
-    w3 = Web3(Web3.HTTPProvider(rpc_url))
-    if not w3.is_connected():
-        print("Error: Cannot connect to RPC")
-        sys.exit(1)
-
-    chainlink = w3.eth.contract(
-        address=Web3.to_checksum_address(CHAINLINK_TVL_PROXY),
-        abi=CHAINLINK_PROXY_ABI,
-    )
-    liquidity_pool = w3.eth.contract(
-        address=Web3.to_checksum_address(LIQUIDITY_POOL),
-        abi=LIQUIDITY_POOL_ABI,
-    )
+def fetch_rounds(w3, phase_id, agg_rounds, cutoff_ts, chunk_size=DEFAULT_MULTICALL_SIZE):
+    """
+    getRoundData for the given aggregator rounds (ascending) through Multicall3.
 
-    # Get decimals
-    decimals = chainlink.functions.decimals().call()
-    aggregator_addr = chainlink.functions.aggregator().call()
-    print(f"Chainlink feed decimals: {decimals}")
-    print(f"Underlying aggregator: {aggregator_addr}")
-
-    # Get latest round info
-    latest_round = chainlink.functions.latestRoundData().call()
-    latest_round_id = latest_round[0]
-    phase_id = latest_round_id >> 64
-    latest_agg_round = latest_round_id & 0xFFFFFFFFFFFFFFFF
-    print(f"Latest round: phase={phase_id}, aggRound={latest_agg_round}")
-    print(f"Latest answer: {latest_round[1] / 10**decimals:,.4f} ETH")
-    print(f"Latest updatedAt: {datetime.fromtimestamp(latest_round[3], tz=timezone.utc)}")
-    print()
-
-    # Determine cutoff: 30 days ago
-    cutoff_ts = int((datetime.now(timezone.utc) - timedelta(days=30)).timestamp())
-    print(f"Cutoff: {datetime.fromtimestamp(cutoff_ts, tz=timezone.utc)}")
-
-    # Collect rounds from latest going back 30 days
+    Returns (rounds, failed): the rounds updated at or after cutoff_ts,
+    chronological, and the aggregator rounds whose call failed.
+    """
+    proxy = Web3.to_checksum_address(CHAINLINK_TVL_PROXY)
     rounds = []
-    agg_round = latest_agg_round
-    while agg_round > 0:
-        round_id = (phase_id << 64) | agg_round
+    failed = []
+    agg_rounds = list(agg_rounds)
+    for start in range(0, len(agg_rounds), chunk_size):
+        chunk = agg_rounds[start:start + chunk_size]
+        calls = [(proxy, SEL_GET_ROUND_DATA + encode(["uint80"], [(phase_id << 64) | r])) for r in chunk]
+        for agg_round, (ok, raw) in zip(chunk, multicall(w3, calls)):
+            if not ok:
+                failed.append(agg_round)
+                continue
+            round_id, answer, _, updated_at, _ = decode(["uint80", "int256", "uint256", "uint256", "uint80"], raw)
+            if updated_at < cutoff_ts:
+                continue
+            rounds.append({
+                "round_id": round_id,
+                "agg_round": agg_round,
+                "answer": answer,
+                "updated_at": updated_at,
+            })
+    return rounds, failed
+
+
+def fetch_pool_tvl(rpc_url, blocks, batch_size=DEFAULT_RPC_BATCH_SIZE, concurrency=DEFAULT_RPC_CONCURRENCY):
+    """getTotalPooledEther() at each block via batched eth_call. {block: wei or None on error}."""
+    data = Web3.to_hex(SEL_GET_TOTAL_POOLED_ETHER)
+    calls = [("eth_call", [{"to": LIQUIDITY_POOL, "data": data}, hex(block)]) for block in blocks]
+    tvl = {}
+    for block, response in zip(blocks, rpc_batch(rpc_url, calls, batch_size, concurrency)):
+        result = response.get("result")
+        tvl[block] = int(result, 16) if result and result != "0x" else None
+    return tvl
+
+
+# =============================================================================
+# Block-Timestamp Index
+# =============================================================================
+
+class BlockTimestampIndex:
+    """
+    Timestamp -> block lookups backed by a persistent set of known (block, timestamp) points.
+
+    Each lookup brackets the target between the nearest known points and
+    interpolates inside the bracket (falling back to bisection when an
+    interpolated probe does not halve it). Post-merge blocks are 12 seconds
+    apart, so most lookups need one or two probes. All pending lookups are
+    probed together, one JSON-RPC batch per round of probes, and every
+    fetched header is added to the index, so later lookups (and later runs)
+    start from tighter brackets. Headers come from eth_getHeaderByNumber
+    where the node supports it, otherwise from eth_getBlockByNumber without
+    transactions.
+    """
+
+    def __init__(self, rpc_url: str, path: Path = None,
+                 batch_size: int = DEFAULT_RPC_BATCH_SIZE, concurrency: int = DEFAULT_RPC_CONCURRENCY):
+        self.rpc_url = rpc_url
+        self.path = path
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.blocks = []       # sorted block numbers
+        self.timestamps = []   # timestamps, same order (strictly increasing)
+        self.fetches = 0
+        self.header_method = "eth_getHeaderByNumber"
+        self.head = None
+        self.chain_id = int(rpc_batch(rpc_url, [("eth_chainId", [])])[0]["result"], 16)
+        self.loaded = 0
+        if path and path.exists():
+            self.load()
+
+    def load(self):
+        for block, timestamp in self.read_chains().get(str(self.chain_id), []):
+            self.add(block, timestamp)
+        self.loaded = len(self.blocks)
+
+    def read_chains(self) -> dict:
+        """Saved points of every chain in the index file, keyed by chain id (as a string)."""
         try:
-            data = chainlink.functions.getRoundData(round_id).call()
-        except Exception:
-            break
-        updated_at = data[3]
-        if updated_at < cutoff_ts:
-            break
-        rounds.append({
-            "round_id": round_id,
-            "agg_round": agg_round,
-            "answer": data[1],
-            "updated_at": updated_at,
-        })
-        agg_round -= 1
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable block index {self.path}: {e}")
+            return {}
+        if "chains" in data:
+            return data["chains"]
+        # Files written before the index was keyed by chain hold a single chain
+        return {str(data["chain_id"]): data.get("points", [])} if "chain_id" in data else {}
+
+    def save(self):
+        """Write this chain's points, keeping the points saved for other chains."""
+        if not self.path:
+            return
+        safe_head = (self.head or 0) - REORG_DEPTH
+        chains = self.read_chains()
+        chains[str(self.chain_id)] = [[b, t] for b, t in zip(self.blocks, self.timestamps) if b <= safe_head]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"chains": chains}, f)
+        os.replace(tmp_path, self.path)
+
+    def add(self, block: int, timestamp: int):
+        i = bisect.bisect_left(self.blocks, block)
+        if i < len(self.blocks) and self.blocks[i] == block:
+            return
+        self.blocks.insert(i, block)
+        self.timestamps.insert(i, timestamp)
+
+    def fetch_headers(self, tags):
+        """Fetch headers (block tags or hex numbers) in batches, add them to the index, return [(block, timestamp)]."""
+        while True:
+            if self.header_method == "eth_getHeaderByNumber":
+                calls = [("eth_getHeaderByNumber", [tag]) for tag in tags]
+            else:
+                calls = [("eth_getBlockByNumber", [tag, False]) for tag in tags]
+            responses = rpc_batch(self.rpc_url, calls, self.batch_size, self.concurrency)
+            self.fetches += len(tags)
+            if self.header_method == "eth_getHeaderByNumber" and any("error" in r for r in responses):
+                # Not every provider exposes headers; blocks without transactions are the next best
+                self.header_method = "eth_getBlockByNumber"
+                continue
+            points = []
+            for tag, response in zip(tags, responses):
+                header = response.get("result")
+                if not header:
+                    raise RuntimeError(f"Failed to fetch block {tag}: {response.get('error')}")
+                number, timestamp = int(header["number"], 16), int(header["timestamp"], 16)
+                self.add(number, timestamp)
+                points.append((number, timestamp))
+            return points
+
+    def ensure_bounds(self):
+        """Make sure the known points span block 0 to the chain head."""
+        if self.head is None:
+            tags = ["latest"] + ([hex(0)] if not self.blocks or self.blocks[0] != 0 else [])
+            self.head = self.fetch_headers(tags)[0][0]
+
+    def bracket(self, target_ts: int):
+        """(block, timestamp) if target_ts is resolved, else the known (lo, hi) blocks around it."""
+        i = bisect.bisect_left(self.timestamps, target_ts)
+        if self.timestamps[i] == target_ts or i == 0:
+            return (self.blocks[i], self.timestamps[i]), None
+        if self.blocks[i] - self.blocks[i - 1] == 1:
+            return (self.blocks[i], self.timestamps[i]), None
+        return None, (i - 1, i)
+
+    def resolve(self, timestamps):
+        """
+        First block with timestamp >= each target: {timestamp: (block, block_timestamp)}.
+
+        Targets after the chain head map to None.
+        """
+        timestamps = list(timestamps)
+        self.ensure_bounds()
+        pending = sorted(t for t in set(timestamps) if t <= self.timestamps[-1])
+        resolved = {t: None for t in timestamps if t > self.timestamps[-1]}
+        bisect_next = set()
+
+        while pending:
+            probes = {}
+            for target_ts in pending:
+                answer, bounds = self.bracket(target_ts)
+                if answer:
+                    resolved[target_ts] = answer
+                    continue
+                lo_block, lo_ts = self.blocks[bounds[0]], self.timestamps[bounds[0]]
+                hi_block, hi_ts = self.blocks[bounds[1]], self.timestamps[bounds[1]]
+                if target_ts in bisect_next:
+                    probe = (lo_block + hi_block) // 2
+                else:
+                    probe = lo_block + round((target_ts - lo_ts) * (hi_block - lo_block) / (hi_ts - lo_ts))
+                probes[target_ts] = (min(max(probe, lo_block + 1), hi_block - 1), lo_block, hi_block)
+
+            pending = list(probes)
+            if not pending:
+                break
+            fetched = dict(self.fetch_headers([hex(b) for b in sorted({p for p, _, _ in probes.values()})]))
+            for target_ts, (probe, lo_block, hi_block) in probes.items():
+                # Interpolate again only if the probe at least halved the bracket
+                kept = (hi_block - probe) if fetched[probe] < target_ts else (probe - lo_block)
+                if target_ts not in bisect_next and kept * 2 > hi_block - lo_block:
+                    bisect_next.add(target_ts)
+                else:
+                    bisect_next.discard(target_ts)
+        return resolved
+
+
+# =============================================================================
+# History Store
+# =============================================================================
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rounds (
+    phase_id INTEGER NOT NULL,
+    agg_round INTEGER NOT NULL,
+    round_id TEXT NOT NULL,
+    updated_at INTEGER NOT NULL,
+    block_number INTEGER NOT NULL,
+    block_timestamp INTEGER NOT NULL,
+    answer TEXT NOT NULL,
+    chainlink_tvl_eth REAL NOT NULL,
+    pool_tvl_wei TEXT,
+    pool_tvl_eth REAL,
+    diff_eth REAL,
+    diff_pct REAL,
+    pool_tvl_attempts INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (phase_id, agg_round)
+);
+CREATE INDEX IF NOT EXISTS rounds_updated_at ON rounds (updated_at);
+CREATE TABLE IF NOT EXISTS pending_rounds (
+    phase_id INTEGER NOT NULL,
+    agg_round INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    PRIMARY KEY (phase_id, agg_round)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
 
-    rounds.reverse()  # chronological order
-    print(f"Found {len(rounds)} rounds in the past 30 days")
-    print()
 
-    # Find block numbers for each round using binary search on timestamps
-    print("Finding block numbers for each round via timestamp binary search...")
-    current_block = w3.eth.block_number
+def open_history(path: Path) -> sqlite3.Connection:
+    """Open (and create) the TVL history store."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(HISTORY_SCHEMA)
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(rounds)")}
+    if "pool_tvl_attempts" not in columns:
+        with conn:
+            conn.execute("ALTER TABLE rounds ADD COLUMN pool_tvl_attempts INTEGER NOT NULL DEFAULT 1")
+    return conn
 
-    # Use a reasonable lower bound for the search
-    first_ts = rounds[0]["updated_at"] if rounds else cutoff_ts
-    # Estimate: ~12 sec/block, go back from current block
-    seconds_back = current_block * 12 - (first_ts - 1600000000)
-    lo_hint = max(1, current_block - (current_block - int(first_ts / 12)) // 1)
-    # Simpler: just estimate ~7200 blocks/day, 31 days back from current
-    lo_hint = max(1, current_block - 7200 * 35)
 
-    prev_block = lo_hint
-    for r in rounds:
-        block_num = find_block_by_timestamp(w3, r["updated_at"], lo_hint=prev_block, hi_hint=current_block)
-        r["block_number"] = block_num
-        prev_block = block_num  # next search starts from here
-        # Verify: check if this block or the one before has the exact timestamp
-        block_data = w3.eth.get_block(block_num)
-        r["block_timestamp"] = block_data["timestamp"]
+def get_meta(conn, key, default=None):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row["value"] if row else default
 
-    print("Done.\n")
 
-    # Print comparison table
-    header = f"{'Date (UTC)':<22} {'Block':<12} {'Chainlink TVL (ETH)':>22}   {'Pool TVL (ETH)':>22}   {'Diff (ETH)':>14}   {'Diff %':>10}"
-    print(header)
-    print("-" * len(header))
+def set_meta(conn, key, value):
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
 
-    results = []
+def store_rounds(conn, rounds, decimals):
+    """Insert (or refresh) compared rounds. uint/int256 values are kept as decimal text."""
+    rows = []
     for r in rounds:
-        block_number = r["block_number"]
         chainlink_tvl = r["answer"] / 10**decimals
-        date_str = datetime.fromtimestamp(r["updated_at"], tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+        pool_tvl = r["pool_tvl_wei"] / 10**18 if r.get("pool_tvl_wei") is not None else None
+        diff = pool_tvl - chainlink_tvl if pool_tvl is not None else None
+        diff_pct = diff / chainlink_tvl * 100 if diff is not None and chainlink_tvl != 0 else None
+        rows.append((
+            r["round_id"] >> 64, r["agg_round"], str(r["round_id"]), r["updated_at"],
+            r["block_number"], r["block_timestamp"], str(r["answer"]), chainlink_tvl,
+            str(r["pool_tvl_wei"]) if r.get("pool_tvl_wei") is not None else None, pool_tvl, diff, diff_pct,
+            r.get("pool_tvl_attempts", 0) + 1,
+        ))
+    with conn:
+        conn.executemany("""
+            INSERT OR REPLACE INTO rounds (
+                phase_id, agg_round, round_id, updated_at, block_number, block_timestamp, answer,
+                chainlink_tvl_eth, pool_tvl_wei, pool_tvl_eth, diff_eth, diff_pct, pool_tvl_attempts
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+
+def sync_history(conn, w3, rpc_url, chainlink, decimals, cutoff_ts, args) -> int:
+    """
+    Fetch rounds missing from the store and compare them. Returns the number of new rounds.
+
+    Only rounds after the last stored one are read, plus older rounds when
+    the window starts before the stored history. Stored rounds whose pool
+    TVL read failed are retried, up to MAX_POOL_TVL_ATTEMPTS reads per round.
+    Rounds whose getRoundData call failed are kept in pending_rounds and read
+    again on later syncs, up to MAX_ROUND_ATTEMPTS reads per round, as the
+    range reads move past them.
+    Rounds newer than the chain head the node serves are left for the next sync.
+    """
+    latest_round = chainlink.functions.latestRoundData().call()
+    phase_id = latest_round[0] >> 64
+    latest_agg_round = latest_round[0] & 0xFFFFFFFFFFFFFFFF
+    print(f"Latest round: phase={phase_id}, aggRound={latest_agg_round}, "
+          f"answer={latest_round[1] / 10**decimals:,.4f} ETH, "
+          f"updatedAt={datetime.fromtimestamp(latest_round[3], tz=timezone.utc)}")
+
+    stored = conn.execute(
+        "SELECT MIN(agg_round) AS first, MAX(agg_round) AS last FROM rounds WHERE phase_id = ?", (phase_id,)
+    ).fetchone()
+    backfill_key = f"backfilled_to:{phase_id}"
+    backfilled_to = int(get_meta(conn, backfill_key, 2**62))
+
+    # (first, last, cutoff) round ranges to read
+    ranges = []
+    if stored["last"] is None:
+        ranges.append((find_first_round(chainlink, phase_id, latest_agg_round, cutoff_ts), latest_agg_round, cutoff_ts))
+    else:
+        if latest_agg_round > stored["last"]:
+            ranges.append((stored["last"] + 1, latest_agg_round, 0))
+        # Older rounds only when the window starts before anything synced so far
+        if cutoff_ts < backfilled_to and stored["first"] > 1:
+            first = find_first_round(chainlink, phase_id, stored["first"] - 1, cutoff_ts)
+            ranges.append((first, stored["first"] - 1, cutoff_ts))
 
-        # Get LiquidityPool TVL at the same block
-        try:
-            pool_tvl_raw = liquidity_pool.functions.getTotalPooledEther().call(
-                block_identifier=block_number
-            )
-            pool_tvl = pool_tvl_raw / 10**18
-        except Exception as e:
-            pool_tvl = None
-
-        diff = None
-        diff_pct = None
-        if pool_tvl is not None:
-            diff = pool_tvl - chainlink_tvl
-            if chainlink_tvl != 0:
-                diff_pct = (diff / chainlink_tvl) * 100
-
-        results.append({
-            "date": date_str,
-            "block": block_number,
-            "chainlink_tvl_eth": chainlink_tvl,
-            "pool_tvl_eth": pool_tvl,
-            "diff_eth": diff,
-            "diff_pct": diff_pct,
+    rounds = []
+    failed = []
+    for first, last, min_updated_at in ranges:
+        fetched, missed = fetch_rounds(w3, phase_id, range(first, last + 1), min_updated_at, args.multicall_size)
+        rounds.extend(fetched)
+        failed.extend((phase_id, agg_round) for agg_round in missed)
+    pending = {(row["phase_id"], row["agg_round"]): row["attempts"] for row in conn.execute(
+        "SELECT * FROM pending_rounds WHERE attempts < ? ORDER BY phase_id, agg_round", (MAX_ROUND_ATTEMPTS,)
+    )}
+    for pending_phase in sorted({p for p, _ in pending}):
+        fetched, missed = fetch_rounds(
+            w3, pending_phase, [a for p, a in pending if p == pending_phase], 0, args.multicall_size
+        )
+        rounds.extend(fetched)
+        failed.extend((pending_phase, agg_round) for agg_round in missed)
+    if pending:
+        print(f"Retried {len(pending)} round(s) whose getRoundData read failed earlier")
+    if failed:
+        print(f"Warning: getRoundData failed for {len(failed)} round(s), retrying on the next sync")
+    retry = [dict(row) for row in conn.execute(
+        "SELECT * FROM rounds WHERE pool_tvl_wei IS NULL AND pool_tvl_attempts < ?", (MAX_POOL_TVL_ATTEMPTS,)
+    )]
+
+    if rounds:
+        index = BlockTimestampIndex(
+            rpc_url, None if args.no_block_index else Path(args.block_index),
+            batch_size=args.rpc_batch_size, concurrency=args.rpc_concurrency,
+        )
+        resolved = index.resolve(r["updated_at"] for r in rounds)
+        index.save()
+        rounds = [r for r in rounds if resolved.get(r["updated_at"]) is not None]
+        for r in rounds:
+            r["block_number"], r["block_timestamp"] = resolved[r["updated_at"]]
+        print(f"Resolved {len(rounds)} new round(s) to blocks with {index.fetches} header fetches")
+
+    for row in retry:
+        rounds.append({
+            "round_id": int(row["round_id"]), "agg_round": row["agg_round"], "answer": int(row["answer"]),
+            "updated_at": row["updated_at"], "block_number": row["block_number"],
+            "block_timestamp": row["block_timestamp"], "pool_tvl_attempts": row["pool_tvl_attempts"],
         })
+    if rounds:
+        pool_tvl_wei = fetch_pool_tvl(
+            rpc_url, sorted({r["block_number"] for r in rounds}), args.rpc_batch_size, args.rpc_concurrency
+        )
+        for r in rounds:
+            r["pool_tvl_wei"] = pool_tvl_wei.get(r["block_number"])
+        store_rounds(conn, rounds, decimals)
+
+    with conn:
+        conn.executemany(
+            "DELETE FROM pending_rounds WHERE phase_id = ? AND agg_round = ?",
+            [(r["round_id"] >> 64, r["agg_round"]) for r in rounds],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO pending_rounds (phase_id, agg_round, attempts) VALUES (?, ?, ?)",
+            [(p, a, pending.get((p, a), 0) + 1) for p, a in failed],
+        )
+        set_meta(conn, backfill_key, min(cutoff_ts, backfilled_to))
+    return len(rounds) - len(retry)
+
+
+def query_window(conn, start_ts, end_ts):
+    """Stored rounds updated in [start_ts, end_ts], chronological."""
+    return [dict(row) for row in conn.execute(
+        "SELECT * FROM rounds WHERE updated_at BETWEEN ? AND ? ORDER BY updated_at", (start_ts, end_ts)
+    )]
+
+
+def window_stats(conn, start_ts, end_ts):
+    """
+    Summary statistics of the diffs in [start_ts, end_ts], aggregated by SQLite.
+
+    The variance is taken around the window mean (two passes) rather than as
+    AVG(x*x) - AVG(x)^2, which cancels catastrophically for diffs that are
+    small next to their mean and can come out negative.
+    """
+    return dict(conn.execute("""
+        WITH windowed AS (SELECT diff_pct, diff_eth FROM rounds WHERE updated_at BETWEEN ? AND ?),
+             mean AS (SELECT AVG(diff_pct) AS pct FROM windowed)
+        SELECT COUNT(*) AS rounds,
+               COUNT(diff_pct) AS compared,
+               AVG(diff_pct) AS avg_pct, MIN(diff_pct) AS min_pct, MAX(diff_pct) AS max_pct,
+               AVG(diff_eth) AS avg_eth, MIN(diff_eth) AS min_eth, MAX(diff_eth) AS max_eth,
+               AVG((diff_pct - mean.pct) * (diff_pct - mean.pct)) AS var_pct,
+               AVG(ABS(diff_pct)) AS mean_abs_pct
+        FROM windowed CROSS JOIN mean
+    """, (start_ts, end_ts)).fetchone())
+
+
+def format_row(row):
+    date_str = datetime.fromtimestamp(row["updated_at"], tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+    pool_str = f"{row['pool_tvl_eth']:,.4f}" if row["pool_tvl_eth"] is not None else "ERROR"
+    diff_str = f"{row['diff_eth']:,.4f}" if row["diff_eth"] is not None else "N/A"
+    pct_str = f"{row['diff_pct']:+.4f}%" if row["diff_pct"] is not None else "N/A"
+    return (f"{date_str:<22} {row['block_number']:<12} {row['chainlink_tvl_eth']:>22,.4f}   "
+            f"{pool_str:>22}   {diff_str:>14}   {pct_str:>10}")
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def parse_date(value):
+    return int(datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
 
-        pool_str = f"{pool_tvl:,.4f}" if pool_tvl is not None else "ERROR"
-        diff_str = f"{diff:,.4f}" if diff is not None else "N/A"
-        pct_str = f"{diff_pct:+.4f}%" if diff_pct is not None else "N/A"
 
-        print(f"{date_str:<22} {block_number:<12} {chainlink_tvl:>22,.4f}   {pool_str:>22}   {diff_str:>14}   {pct_str:>10}")
+def main():
+    parser = argparse.ArgumentParser(description="Compare Chainlink-reported TVL vs LiquidityPool.getTotalPooledEther()")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS,
+                        help=f"Compare rounds from the last N days (default: {DEFAULT_DAYS})")
+    parser.add_argument("--since", help="Window start date (YYYY-MM-DD, UTC); overrides --days")
+    parser.add_argument("--until", help="Window end date (YYYY-MM-DD, UTC, inclusive). Default: now")
+    parser.add_argument("--offline", action="store_true",
+                        help="Report from the history store only, without RPC calls")
+    parser.add_argument("--follow", action="store_true",
+                        help="After the report, keep syncing and print new rounds as they appear")
+    parser.add_argument("--interval", type=int, default=DEFAULT_FOLLOW_INTERVAL,
+                        help=f"Seconds between syncs in --follow mode (default: {DEFAULT_FOLLOW_INTERVAL})")
+    parser.add_argument("--history-db", default=str(DEFAULT_HISTORY_DB),
+                        help=f"TVL history store (default: {DEFAULT_HISTORY_DB})")
+    parser.add_argument("--multicall-size", type=int, default=DEFAULT_MULTICALL_SIZE,
+                        help=f"getRoundData calls per Multicall3 aggregate3 (default: {DEFAULT_MULTICALL_SIZE})")
+    parser.add_argument("--rpc-batch-size", type=int, default=DEFAULT_RPC_BATCH_SIZE,
+                        help=f"Calls per JSON-RPC batch (default: {DEFAULT_RPC_BATCH_SIZE})")
+    parser.add_argument("--rpc-concurrency", type=int, default=DEFAULT_RPC_CONCURRENCY,
+                        help=f"JSON-RPC batches in flight (default: {DEFAULT_RPC_CONCURRENCY})")
+    parser.add_argument("--block-index", default=str(DEFAULT_BLOCK_INDEX),
+                        help=f"Block-timestamp index file, reused across runs (default: {DEFAULT_BLOCK_INDEX})")
+    parser.add_argument("--no-block-index", action="store_true",
+                        help="Do not read or write the block-timestamp index file")
+    args = parser.parse_args()
+
+    if args.offline and args.follow:
+        parser.error("--follow needs RPC access; drop --offline")
+
+    # Determine the window
+    if args.since:
+        start_ts = parse_date(args.since)
+    else:
+        start_ts = int((datetime.now(timezone.utc) - timedelta(days=args.days)).timestamp())
+    end_ts = parse_date(args.until) + 86399 if args.until else 2**62
+    print(f"Window: {datetime.fromtimestamp(start_ts, tz=timezone.utc)} -> "
+          f"{datetime.fromtimestamp(end_ts, tz=timezone.utc) if args.until else 'now'}")
+
+    conn = open_history(Path(args.history_db))
+
+    if not args.offline:
+        rpc_url = os.environ.get("MAINNET_RPC_URL")
+        if not rpc_url:
+            print("Error: MAINNET_RPC_URL environment variable not set")
+            sys.exit(1)
+
+        w3 = Web3(Web3.HTTPProvider(rpc_url))
+        if not w3.is_connected():
+            print("Error: Cannot connect to RPC")
+            sys.exit(1)
+
+        chainlink = w3.eth.contract(
+            address=Web3.to_checksum_address(CHAINLINK_TVL_PROXY),
+            abi=CHAINLINK_PROXY_ABI,
+        )
+
+        # Feed decimals never change; keep them with the history
+        decimals = get_meta(conn, "decimals")
+        if decimals is None:
+            decimals = chainlink.functions.decimals().call()
+            with conn:
+                set_meta(conn, "decimals", decimals)
+            print(f"Chainlink feed decimals: {decimals}")
+            print(f"Underlying aggregator: {chainlink.functions.aggregator().call()}")
+        decimals = int(decimals)
+
+        added = sync_history(conn, w3, rpc_url, chainlink, decimals, start_ts, args)
+        print(f"Stored {added} new round(s) in {args.history_db}")
+    print()
+
+    # Print comparison table
+    header = f"{'Date (UTC)':<22} {'Block':<12} {'Chainlink TVL (ETH)':>22}   {'Pool TVL (ETH)':>22}   {'Diff (ETH)':>14}   {'Diff %':>10}"
+    print(header)
+    print("-" * len(header))
+
+    rows = query_window(conn, start_ts, end_ts)
+    for row in rows:
+        print(format_row(row))
 
     # Summary stats
+    stats = window_stats(conn, start_ts, end_ts)
     print()
     print("=" * len(header))
-    diffs = [r["diff_pct"] for r in results if r["diff_pct"] is not None]
-    abs_diffs = [r["diff_eth"] for r in results if r["diff_eth"] is not None]
-    if diffs:
-        print(f"Average diff:  {sum(diffs)/len(diffs):+.4f}%  ({sum(abs_diffs)/len(abs_diffs):+,.4f} ETH)")
-        print(f"Max diff:      {max(diffs):+.4f}%  ({max(abs_diffs):+,.4f} ETH)")
-        print(f"Min diff:      {min(diffs):+.4f}%  ({min(abs_diffs):+,.4f} ETH)")
-
-    # Save to JSON
+    print(f"Rounds:        {stats['rounds']} ({stats['compared']} compared)")
+    if stats["compared"]:
+        print(f"Average diff:  {stats['avg_pct']:+.4f}%  ({stats['avg_eth']:+,.4f} ETH)")
+        print(f"Max diff:      {stats['max_pct']:+.4f}%  ({stats['max_eth']:+,.4f} ETH)")
+        print(f"Min diff:      {stats['min_pct']:+.4f}%  ({stats['min_eth']:+,.4f} ETH)")
+        print(f"Std dev:       {max(stats['var_pct'], 0) ** 0.5:.4f}%   Mean |diff|: {stats['mean_abs_pct']:.4f}%")
+
+    # Save the window to JSON
+    results = [{
+        "date": datetime.fromtimestamp(row["updated_at"], tz=timezone.utc).strftime("%Y-%m-%d %H:%M"),
+        "block": row["block_number"],
+        "chainlink_tvl_eth": row["chainlink_tvl_eth"],
+        "pool_tvl_eth": row["pool_tvl_eth"],
+        "diff_eth": row["diff_eth"],
+        "diff_pct": row["diff_pct"],
+    } for row in rows]
     output_path = Path(__file__).resolve().parent / "tvl_comparison.json"
     with open(output_path, "w") as f:
         json.dump(results, f, indent=2, default=str)
     print(f"\nResults saved to {output_path}")
 
+    if args.follow:
+        print(f"\nFollowing new rounds every {args.interval}s (Ctrl-C to stop)...")
+        last_ts = rows[-1]["updated_at"] if rows else start_ts
+        try:
+            while True:
+                time.sleep(args.interval)
+                sync_history(conn, w3, rpc_url, chainlink, decimals, start_ts, args)
+                for row in query_window(conn, last_ts + 1, end_ts):
+                    print(format_row(row))
+                    last_ts = row["updated_at"]
+        except KeyboardInterrupt:
+            print()
+
 
 if __name__ == "__main__":
     main()
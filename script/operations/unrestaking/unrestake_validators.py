@@ -42,6 +42,11 @@ from utils.validator_utils import (
     list_operators,
 )
 
+try:
+    import requests
+except ImportError:
+    requests = None
+
 from consolidations.generate_gnosis_txns import (
     encode_address,
     encode_uint256,
@@ -57,6 +62,8 @@ from consolidations.generate_gnosis_txns import (
 
 DELEGATION_MANAGER = "0x39053D51B77DC0d36036Fc1fCc8Cb819df8Ef37A"
 QUEUE_ETH_WITHDRAWAL_SELECTOR = "03f49be8"
+GET_QUEUED_WITHDRAWALS_SELECTOR = "5dd68579"  # getQueuedWithdrawals(address)
+RPC_BATCH_SIZE = 100  # eth_calls per JSON-RPC batch request
 MIN_WITHDRAWAL_AMOUNT = 32  # ETH
 
 
@@ -156,6 +163,67 @@ def get_pending_withdrawal_eth(
         return 0.0
 
 
+def get_pending_withdrawals_batch(
+    node_addresses: List[str],
+    rpc_url: str,
+    batch_size: int = RPC_BATCH_SIZE,
+) -> Dict[str, float]:
+    """Query pending withdrawal ETH for many nodes with JSON-RPC batches.
+
+    Sends getQueuedWithdrawals(address) as eth_call, batch_size calls per
+    HTTP request, and decodes each result like get_pending_withdrawal_eth.
+    Nodes whose batch fails (or all nodes, if requests is not installed)
+    fall back to one cast call each.
+
+    Returns dict of node_address -> pending ETH.
+    """
+    pending = {}
+    unresolved = []
+
+    if not requests:
+        unresolved = list(node_addresses)
+        node_addresses = []
+
+    for start in range(0, len(node_addresses), batch_size):
+        batch = node_addresses[start:start + batch_size]
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "method": "eth_call",
+                "params": [{
+                    "to": DELEGATION_MANAGER,
+                    "data": "0x" + GET_QUEUED_WITHDRAWALS_SELECTOR + encode_address(node).hex(),
+                }, "latest"],
+                "id": i,
+            }
+            for i, node in enumerate(batch)
+        ]
+        try:
+            response = requests.post(rpc_url, json=payload, timeout=60)
+            response.raise_for_status()
+            results = response.json()
+            if not isinstance(results, list):
+                raise ValueError(f"unexpected batch response: {results}")
+        except Exception as e:
+            print(f"    Warning: Batched getQueuedWithdrawals failed ({e}), falling back to cast")
+            unresolved.extend(batch)
+            continue
+
+        by_id = {r.get('id'): r for r in results}
+        for i, node in enumerate(batch):
+            r = by_id.get(i, {})
+            if 'result' not in r:
+                unresolved.append(node)
+                continue
+            raw_hex = r['result']
+            pending[node] = _decode_shares_from_raw(raw_hex) if raw_hex and raw_hex != '0x' else 0.0
+
+    for node in unresolved:
+        pending[node] = get_pending_withdrawal_eth(node, rpc_url)
+
+    return pending
+
+
 def _decode_shares_from_raw(raw_hex: str) -> float:
     """Decode uint256[][] shares from getQueuedWithdrawals ABI output.
 
@@ -224,12 +292,13 @@ def evaluate_pods(
     rpc_url: str,
 ) -> List[Dict]:
     """Enrich pods with pending withdrawal data and available ETH."""
+    pending_by_node = {}
+    if rpc_url:
+        nodes = list(dict.fromkeys(p['node_address'] for p in pods if p['node_address']))
+        pending_by_node = get_pending_withdrawals_batch(nodes, rpc_url)
+
     for pod in pods:
-        node = pod['node_address']
-        if rpc_url and node:
-            pending = get_pending_withdrawal_eth(node, rpc_url)
-        else:
-            pending = 0.0
+        pending = pending_by_node.get(pod['node_address'], 0.0)
 
         pod['pending_withdrawal_eth'] = pending
         pod['available_eth'] = max(
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+check_vnet_pool.py - Check simulate.py's VNet pool against tenderly_standin.py
+
+Starts the Tenderly stand-in on a free local port (with anvil-style
+snapshots that are consumed by a revert), points TENDERLY_API_URL at it and
+checks that:
+
+- --pool-fill creates the requested VNets, each with a base snapshot,
+- leases hand out different VNets and run out when none is idle,
+- a release reverts the VNet to its fork block, stores a fresh snapshot
+  and marks it idle, and a second lease/release cycle still resets it,
+- eviction deletes idle VNets older than the maximum age and leases held
+  by processes that no longer exist, and keeps live leases,
+- releasing an expired lease deletes the VNet instead of pooling it.
+
+Usage:
+    python3 check_vnet_pool.py
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from tenderly_standin import serve
+
+FORK_BLOCK = 21_000_000
+MAX_AGE = 3600
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+class Checks:
+    def __init__(self):
+        self.failures = 0
+
+    def expect(self, condition: bool, description: str):
+        print(f"  {'OK  ' if condition else 'FAIL'} {description}")
+        self.failures += not condition
+
+
+def registry_entry(simulate, registry_path: Path, vnet_id: str):
+    with simulate.locked_pool_registry(registry_path) as registry:
+        return next((dict(e) for e in registry['vnets'] if e['id'] == vnet_id), None)
+
+
+def update_entry(simulate, registry_path: Path, vnet_id: str, **fields):
+    with simulate.locked_pool_registry(registry_path) as registry:
+        next(e for e in registry['vnets'] if e['id'] == vnet_id).update(fields)
+
+
+def dead_pid() -> int:
+    """pid of a process that has already exited."""
+    process = subprocess.Popen([sys.executable, '-c', ''])
+    process.wait()
+    return process.pid
+
+
+# =============================================================================
+# Checks
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the VNet pool against the local Tenderly stand-in")
+    parser.parse_args()
+
+    server = serve(port=0, fork_block=FORK_BLOCK, consume_snapshots=True)
+    host, port = server.server_address[:2]
+    os.environ['TENDERLY_API_URL'] = f"http://{host}:{port}/api/v1/account/local/project/check/"
+    os.environ['TENDERLY_API_ACCESS_TOKEN'] = 'local'
+    os.environ.pop('TENDERLY_ACCOUNT_SLUG', None)
+    os.environ.pop('TENDERLY_PROJECT_SLUG', None)
+    os.environ.pop('MAINNET_RPC_URL', None)
+    import simulate
+
+    checks = Checks()
+    with tempfile.TemporaryDirectory() as tmp:
+        registry_path = Path(tmp) / 'vnet-pool.json'
+        block = lambda entry: int(simulate.rpc_request(entry['admin_rpc'], "eth_blockNumber"), 16)
+
+        print("\nFill")
+        created = simulate.fill_vnet_pool(registry_path, 2, MAX_AGE, fork_block=FORK_BLOCK)
+        checks.expect(created == 2, f"created 2 VNets (got {created})")
+        checks.expect(simulate.fill_vnet_pool(registry_path, 2, MAX_AGE) == 0, "a full pool is not topped up")
+
+        print("\nLease")
+        first = simulate.lease_pooled_vnet(registry_path, MAX_AGE)
+        second = simulate.lease_pooled_vnet(registry_path, MAX_AGE)
+        checks.expect(first is not None and second is not None and first['id'] != second['id'],
+                      "two leases get different VNets")
+        checks.expect(simulate.lease_pooled_vnet(registry_path, MAX_AGE) is None, "no lease when none is idle")
+        checks.expect(registry_entry(simulate, registry_path, first['id'])['leased_by'] == os.getpid(),
+                      "the lease records this process")
+
+        print("\nRelease")
+        for cycle in (1, 2):
+            entry = first if cycle == 1 else simulate.lease_pooled_vnet(registry_path, MAX_AGE)
+            for _ in range(3):
+                simulate.rpc_request(entry['admin_rpc'], "eth_sendTransaction", [{'to': '0x' + '11' * 20, 'data': '0x'}])
+            checks.expect(block(entry) == FORK_BLOCK + 3, f"cycle {cycle}: the run advanced the VNet")
+            simulate.release_pooled_vnet(registry_path, entry, MAX_AGE)
+            pooled = registry_entry(simulate, registry_path, entry['id'])
+            checks.expect(pooled is not None and pooled['state'] == 'idle', f"cycle {cycle}: VNet is idle again")
+            checks.expect(block(entry) == FORK_BLOCK, f"cycle {cycle}: VNet reverted to the fork block")
+            checks.expect(pooled is not None and pooled['snapshot'] != entry['snapshot'],
+                          f"cycle {cycle}: a fresh snapshot replaced the consumed one")
+
+        print("\nEviction")
+        update_entry(simulate, registry_path, first['id'], created_at=time.time() - 2 * MAX_AGE)
+        third = simulate.fill_vnet_pool(registry_path, 3, MAX_AGE, fork_block=FORK_BLOCK)
+        checks.expect(third == 2, f"refill after evicting the aged VNet created 2 (got {third})")
+        checks.expect(registry_entry(simulate, registry_path, first['id']) is None, "aged idle VNet left the registry")
+        checks.expect(simulate.get_vnet_by_id(first['id']) is None, "aged idle VNet was deleted")
+
+        update_entry(simulate, registry_path, second['id'], leased_by=dead_pid())
+        live = simulate.lease_pooled_vnet(registry_path, MAX_AGE)
+        checks.expect(registry_entry(simulate, registry_path, second['id']) is None,
+                      "lease of an exited process was evicted")
+        checks.expect(simulate.get_vnet_by_id(second['id']) is None, "abandoned VNet was deleted")
+        checks.expect(simulate.evict_vnet_pool(registry_path, MAX_AGE) == 0, "a live lease is kept")
+
+        print("\nExpired lease")
+        update_entry(simulate, registry_path, live['id'], created_at=time.time() - 2 * MAX_AGE)
+        live['created_at'] = time.time() - 2 * MAX_AGE
+        simulate.release_pooled_vnet(registry_path, live, MAX_AGE)
+        checks.expect(registry_entry(simulate, registry_path, live['id']) is None, "expired VNet left the registry")
+        checks.expect(simulate.get_vnet_by_id(live['id']) is None, "expired VNet was deleted")
+
+    server.shutdown()
+    print("\nAll checks passed" if not checks.failures else f"\n{checks.failures} check(s) failed")
+    return 1 if checks.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
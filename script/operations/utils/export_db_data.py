@@ -1,15 +1,20 @@
 #!/usr/bin/env python3
 """
-export_db_data.py - Export operator and node data from database to JSON
+export_db_data.py - Export operator, node and validator data from the database
 
-This script exports data from the EtherFi validator database
-to JSON files that can be consumed by Solidity scripts.
+This script exports data from the EtherFi validator database to files that
+can be consumed by Solidity scripts and offline tooling. Every table is
+streamed through COPY ... TO STDOUT, so large exports never build Python
+rows.
 
 Usage:
     python export_db_data.py
     python export_db_data.py --operators-only
     python export_db_data.py --nodes-only
+    python export_db_data.py --validators                          # also export the validators snapshot
+    python export_db_data.py --validators-only --format arrow      # needs pyarrow
     python export_db_data.py --output-dir ./data
+    python export_db_data.py --force                               # rewrite even if the source is unchanged
 
 Environment Variables:
     VALIDATOR_DB: PostgreSQL connection string for validator database
@@ -17,9 +22,19 @@ Environment Variables:
 Output:
     - operators.json: Operator name to address mapping
     - etherfi-nodes.json: EtherFi node contract addresses
+    - etherfi-validators.csv.gz / .ndjson.gz / .arrow: latest etherfi_validators snapshot
+    - .export-manifest.json: checksum / snapshot timestamp of each export
+
+Unchanged outputs are not rewritten: operators and nodes are compared by the
+checksum recorded in the manifest, and an unchanged validators snapshot
+timestamp skips the export without reading the table.
 """
 
 import argparse
+import csv
+import gzip
+import hashlib
+import io
 import json
 import os
 import sys
@@ -48,6 +63,35 @@ except ImportError:
     print("Error: psycopg2 not installed. Run: pip install psycopg2-binary")
     sys.exit(1)
 
+MANIFEST_NAME = '.export-manifest.json'
+GZIP_LEVEL = 3  # fast enough to keep up with the disk; level 9 makes gzip the bottleneck
+
+OPERATORS_QUERY = '''
+    SELECT "operatorAdress", "operatorName"
+    FROM "OperatorMetadata"
+    ORDER BY "operatorName"
+'''
+
+NODES_QUERY = '''
+    SELECT DISTINCT etherfi_node_contract
+    FROM "MainnetValidators"
+    WHERE etherfi_node_contract IS NOT NULL
+    ORDER BY etherfi_node_contract
+'''
+
+VALIDATORS_QUERY = '''
+    SELECT *
+    FROM "etherfi_validators"
+    WHERE timestamp = %s
+    ORDER BY id
+'''
+
+VALIDATOR_FILES = {
+    'csv': 'etherfi-validators.csv',
+    'ndjson': 'etherfi-validators.ndjson',
+    'arrow': 'etherfi-validators.arrow',
+}
+
 
 def get_db_connection():
     """Get database connection from environment variable."""
@@ -57,47 +101,195 @@ def get_db_connection():
     return psycopg2.connect(db_url)
 
 
-def export_operators(conn, output_dir: Path):
-    """Export operator data to JSON."""
-    operators = {}
-    
+# =============================================================================
+# COPY streaming
+# =============================================================================
+
+def copy_csv(conn, query, params, out):
+    """Stream a query as CSV with a header row into the file object `out`."""
     with conn.cursor() as cur:
-        cur.execute('SELECT "operatorAdress", "operatorName" FROM "OperatorMetadata"')
-        for addr, name in cur.fetchall():
-            operators[name] = addr.lower()
-    
+        sql = cur.mogrify(query, params).decode() if params else query
+        cur.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", out)
+
+
+def copy_ndjson(conn, query, params, out):
+    """Stream a query as one JSON object per line into `out`."""
+    with conn.cursor() as cur:
+        sql = cur.mogrify(query, params).decode() if params else query
+        # csv format with quote/delimiter bytes that never occur in JSON passes row_to_json output
+        # through verbatim (text format would escape every backslash)
+        cur.copy_expert(
+            f"COPY (SELECT row_to_json(t) FROM ({sql}) t) TO STDOUT "
+            f"WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')",
+            out,
+        )
+
+
+class HashingWriter:
+    """Binary file wrapper that hashes and counts everything written through it."""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+
+def load_manifest(output_dir: Path):
+    try:
+        with open(output_dir / MANIFEST_NAME) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_dir: Path, manifest):
+    tmp = output_dir / (MANIFEST_NAME + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, output_dir / MANIFEST_NAME)
+
+
+def write_if_changed(output_file: Path, payload: bytes, manifest, force: bool):
+    """Write payload unless the manifest says this file already holds exactly these bytes."""
+    checksum = hashlib.sha256(payload).hexdigest()
+    if not force and output_file.exists() and manifest.get(output_file.name, {}).get('sha256') == checksum:
+        return False
+    tmp = output_file.with_name(output_file.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp, output_file)
+    manifest[output_file.name] = {'sha256': checksum}
+    return True
+
+
+def copy_rows(conn, query):
+    """Rows of a small table as dicts, read through COPY."""
+    buf = io.StringIO()
+    copy_csv(conn, query, None, buf)
+    buf.seek(0)
+    return list(csv.DictReader(buf))
+
+
+def dump_json(data, pretty: bool) -> bytes:
+    if pretty:
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+# =============================================================================
+# Exports
+# =============================================================================
+
+def export_operators(conn, output_dir: Path, layout='operations', pretty=False, manifest=None, force=False):
+    """Export operator data to JSON."""
+    rows = copy_rows(conn, OPERATORS_QUERY)
+    if layout == 'dataloader':
+        data = {"operators": [{"name": r["operatorName"], "address": r["operatorAdress"].lower()} for r in rows]}
+    else:
+        data = {r["operatorName"]: r["operatorAdress"].lower() for r in rows}
+
     output_file = output_dir / 'operators.json'
-    with open(output_file, 'w') as f:
-        json.dump(operators, f, indent=2)
-    
-    print(f"Exported {len(operators)} operators to {output_file}")
+    if write_if_changed(output_file, dump_json(data, pretty), manifest if manifest is not None else {}, force):
+        print(f"Exported {len(rows)} operators to {output_file}")
+    else:
+        print(f"Unchanged: {len(rows)} operators already in {output_file}")
 
 
-def export_etherfi_nodes(conn, output_dir: Path):
+def export_etherfi_nodes(conn, output_dir: Path, layout='operations', pretty=False, manifest=None, force=False):
     """Export EtherFi node addresses to JSON."""
-    nodes = []
-    
-    with conn.cursor() as cur:
-        cur.execute('''
-            SELECT DISTINCT etherfi_node_contract 
-            FROM "MainnetValidators" 
-            WHERE etherfi_node_contract IS NOT NULL
-            ORDER BY etherfi_node_contract
-        ''')
-        for (node,) in cur.fetchall():
-            if node:
-                nodes.append(node.lower())
-    
+    rows = copy_rows(conn, NODES_QUERY)
+    if layout == 'dataloader':
+        # Preserve original checksum format from DB
+        addresses = [r["etherfi_node_contract"] for r in rows if r["etherfi_node_contract"]]
+        data = {
+            "description": "EtherFi node addresses exported from database",
+            "count": len(addresses),
+            "addresses": addresses,
+        }
+    else:
+        addresses = [r["etherfi_node_contract"].lower() for r in rows if r["etherfi_node_contract"]]
+        data = addresses
+
     output_file = output_dir / 'etherfi-nodes.json'
-    with open(output_file, 'w') as f:
-        json.dump(nodes, f, indent=2)
-    
-    print(f"Exported {len(nodes)} EtherFi nodes to {output_file}")
+    if write_if_changed(output_file, dump_json(data, pretty), manifest if manifest is not None else {}, force):
+        print(f"Exported {len(addresses)} EtherFi nodes to {output_file}")
+    else:
+        print(f"Unchanged: {len(addresses)} EtherFi nodes already in {output_file}")
+
+
+def export_validators(conn, output_dir: Path, fmt='csv', compress=True, manifest=None, force=False):
+    """Export the latest etherfi_validators snapshot as CSV, NDJSON or Arrow IPC."""
+    manifest = manifest if manifest is not None else {}
+    with conn.cursor() as cur:
+        cur.execute('SELECT MAX(timestamp) FROM "etherfi_validators"')
+        snapshot = cur.fetchone()[0]
+    if snapshot is None:
+        print("No etherfi_validators snapshot found, skipping validators export")
+        return
+
+    name = VALIDATOR_FILES[fmt] + ('.gz' if compress and fmt != 'arrow' else '')
+    output_file = output_dir / name
+    source = str(snapshot)
+    if not force and output_file.exists() and manifest.get(name, {}).get('snapshot') == source:
+        print(f"Unchanged: validators snapshot {source} already in {output_file}")
+        return
 
+    tmp = output_file.with_name(output_file.name + '.tmp')
+    if fmt == 'arrow':
+        export_validators_arrow(conn, snapshot, tmp)
+        size = tmp.stat().st_size
+    else:
+        copy = copy_csv if fmt == 'csv' else copy_ndjson
+        opener = (lambda p: gzip.open(p, 'wb', compresslevel=GZIP_LEVEL)) if compress else (lambda p: open(p, 'wb'))
+        with opener(tmp) as f:
+            writer = HashingWriter(f)
+            copy(conn, VALIDATORS_QUERY, (snapshot,), writer)
+        size = writer.size
+        checksum = writer.sha256.hexdigest()
+    os.replace(tmp, output_file)
+    manifest[name] = {'snapshot': source}
+    if fmt != 'arrow':
+        manifest[name]['sha256'] = checksum
+    print(f"Exported validators snapshot {source} ({size / 1e6:.1f} MB of {fmt}) to {output_file}")
 
-def main():
+
+def export_validators_arrow(conn, snapshot, output_file: Path):
+    """CSV from COPY into a scratch file, then converted to Arrow IPC batch by batch."""
+    try:
+        import pyarrow.csv as pa_csv
+        import pyarrow.ipc as pa_ipc
+    except ImportError:
+        print("Error: --format arrow needs pyarrow. Run: pip install pyarrow")
+        sys.exit(1)
+
+    scratch = output_file.with_name(output_file.name + '.csv')
+    try:
+        with open(scratch, 'wb') as f:
+            copy_csv(conn, VALIDATORS_QUERY, (snapshot,), f)
+        reader = pa_csv.open_csv(str(scratch))
+        with pa_ipc.new_file(str(output_file), reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+    finally:
+        scratch.unlink(missing_ok=True)
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main(default_layout='operations', default_output_dir=Path(__file__).parent.parent / 'data'):
     parser = argparse.ArgumentParser(
-        description='Export operator and EtherFi node data from database to JSON files.'
+        description='Export operator, EtherFi node and validator data from database.',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
     )
     parser.add_argument(
         '--operators-only',
@@ -109,19 +301,63 @@ def main():
         action='store_true',
         help='Export only EtherFi node data'
     )
+    parser.add_argument(
+        '--validators',
+        action='store_true',
+        help='Also export the latest etherfi_validators snapshot'
+    )
+    parser.add_argument(
+        '--validators-only',
+        action='store_true',
+        help='Export only the validators snapshot'
+    )
+    parser.add_argument(
+        '--format',
+        choices=sorted(VALIDATOR_FILES),
+        default='csv',
+        help='Validators snapshot format (default: csv; arrow needs pyarrow)'
+    )
+    parser.add_argument(
+        '--no-compress',
+        action='store_true',
+        help='Write the validators CSV/NDJSON uncompressed instead of gzip'
+    )
+    parser.add_argument(
+        '--layout',
+        choices=['operations', 'dataloader'],
+        default=default_layout,
+        help='JSON layout of operators/nodes: name->address map and address list (operations), '
+             'or {"operators": [...]} and {"addresses": [...]} with DB checksums (dataloader)'
+    )
+    parser.add_argument(
+        '--pretty',
+        action='store_true',
+        help='Indent the JSON files instead of writing them compact'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Rewrite outputs even when the source is unchanged'
+    )
     parser.add_argument(
         '--output-dir',
         type=Path,
-        default=Path(__file__).parent.parent / 'data',
-        help='Output directory for JSON files (default: script/operations/data)'
+        default=default_output_dir,
+        help=f'Output directory (default: {default_output_dir})'
+    )
+    parser.add_argument(
+        '--db-url',
+        help='Override VALIDATOR_DB environment variable'
     )
-    
+
     args = parser.parse_args()
-    
+
     # Create output directory if it doesn't exist
     args.output_dir.mkdir(parents=True, exist_ok=True)
-    
+
     try:
+        if args.db_url:
+            os.environ['VALIDATOR_DB'] = args.db_url
         conn = get_db_connection()
     except ValueError as e:
         print(f"Error: {e}")
@@ -130,21 +366,23 @@ def main():
     except Exception as e:
         print(f"Database connection error: {e}")
         sys.exit(1)
-    
+
+    only = args.operators_only or args.nodes_only or args.validators_only
+    manifest = load_manifest(args.output_dir)
+    options = dict(manifest=manifest, force=args.force)
     try:
-        if args.operators_only:
-            export_operators(conn, args.output_dir)
-        elif args.nodes_only:
-            export_etherfi_nodes(conn, args.output_dir)
-        else:
-            export_operators(conn, args.output_dir)
-            export_etherfi_nodes(conn, args.output_dir)
-        
-        print("\nDone! JSON files are ready for Solidity scripts.")
+        if args.operators_only or not only:
+            export_operators(conn, args.output_dir, args.layout, args.pretty, **options)
+        if args.nodes_only or not only:
+            export_etherfi_nodes(conn, args.output_dir, args.layout, args.pretty, **options)
+        if args.validators_only or (args.validators and not only):
+            export_validators(conn, args.output_dir, args.format, not args.no_compress, **options)
+        save_manifest(args.output_dir, manifest)
+
+        print("\nDone! Files are ready for Solidity scripts.")
     finally:
         conn.close()
 
 
 if __name__ == '__main__':
     main()
-
@@ -7,9 +7,10 @@ This script simulates timelock-gated transactions by:
 2. Warping time to simulate timelock delay
 3. Running execute transactions
 
-Supports two modes:
+Supports three modes:
 - Forge simulation (local fork with vm.warp)
 - Tenderly Virtual Testnet (persistent simulation environment)
+- Local anvil node over JSON-RPC (impersonation, snapshot/revert, no external service)
 
 Usage:
     # Simple simulation (no timelock)
@@ -40,23 +41,35 @@ Usage:
     # List existing Tenderly VNets
     python simulate.py --tenderly --list-vnets
 
+    # Tenderly simulation on a warm pooled VNet (see tenderly_standin.py for local testing)
+    python simulate.py --tenderly --pool-fill 3
+    python simulate.py --tenderly --pool --txns consolidation.json
+
+    # Local anvil (started for the run, or --anvil-rpc for a running node)
+    python simulate.py --anvil --schedule schedule.json --execute execute.json --delay 8h
+
 Environment Variables:
     MAINNET_RPC_URL: RPC URL for mainnet fork
     TENDERLY_API_ACCESS_TOKEN: Tenderly API access token
-    TENDERLY_API_URL: Tenderly API URL (contains account/project slugs)
+    TENDERLY_API_URL: Tenderly API URL (contains account/project slugs; its base is used for API calls)
     SAFE_ADDRESS: Gnosis Safe address (default: EtherFi Operating Admin)
 """
 
 import argparse
+import csv
+import fcntl
+import hashlib
 import json
 import os
 import re
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 # Load .env file if python-dotenv is available
 try:
@@ -83,6 +96,40 @@ except ImportError:
 # Default addresses
 DEFAULT_SAFE_ADDRESS = "0x2aCA71020De61bb532008049e1Bd41E451aE8AdC"  # EtherFi Operating Admin
 
+TENDERLY_API_BASE = "https://api.tenderly.co/api/v1"
+
+# Simulation limits
+TX_GAS_LIMIT = "0x7a1200"      # 8M gas per submitted transaction
+GAS_LIMIT_MAX = 10_000_000     # gas used above this is treated as a failure
+DEFAULT_BUNDLE_SIZE = 50       # transactions per JSON-RPC batch in bundle mode
+
+# Anvil
+DEFAULT_ANVIL_PORT = 8545
+ANVIL_STARTUP_TIMEOUT = 60         # seconds to wait for a spawned anvil to answer
+SENDER_FUNDING_WEI = 1000 * 10**18  # same as vm.deal in SimulateTransactions.s.sol
+
+# Sharded simulation
+REQUEST_CONSOLIDATION_SELECTOR = "6691954e"        # requestConsolidation((bytes,bytes)[])
+ETHERFI_NODE_FROM_PUBKEY_HASH_SELECTOR = "9055e951"  # etherFiNodeFromPubkeyHash(bytes32)
+LINK_LEGACY_VALIDATOR_IDS_SELECTOR = "83294396"      # linkLegacyValidatorIds(uint256[],bytes[])
+BATCH_APPROVE_REGISTRATION_SELECTOR = "08388426"     # batchApproveRegistration(uint256[],bytes[],bytes[])
+ZERO_ADDRESS = "0x" + "0" * 40
+
+# Result cache
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'etherfi-simulations'
+CACHE_VERSION = 2
+TRANSIENT_RESULT_ERRORS = (        # failed results not stored in the cache
+    "Timeout waiting for transaction receipt",
+    "Transaction submission failed",
+    "No simulation result returned",
+    "Executed out of submission order",
+)
+
+# Warm VNet pool
+DEFAULT_POOL_REGISTRY = DEFAULT_CACHE_DIR / 'vnet-pool.json'
+DEFAULT_POOL_MAX_AGE = "6h"        # pooled VNets older than this are deleted
+POOL_CREATE_CONCURRENCY = 4        # VNets created in parallel by --pool-fill
+
 
 def get_project_root() -> Path:
     """Find the project root (where foundry.toml is)."""
@@ -202,6 +249,17 @@ def get_tenderly_credentials() -> Tuple[str, str, str]:
     return access_token, account_slug, project_slug
 
 
+def get_tenderly_api_base() -> str:
+    """Tenderly API base URL.
+
+    Taken from TENDERLY_API_URL when set (everything before /account/), so
+    pointing that variable at tenderly_standin.py redirects all API calls.
+    """
+    api_url = os.environ.get('TENDERLY_API_URL', '')
+    match = re.match(r'(.+?)/account/', api_url)
+    return match.group(1) if match else TENDERLY_API_BASE
+
+
 def list_virtual_testnets(verbose: bool = True) -> List[Dict]:
     """List all Virtual Testnets in the project."""
     if not requests:
@@ -209,7 +267,7 @@ def list_virtual_testnets(verbose: bool = True) -> List[Dict]:
     
     access_token, account_slug, project_slug = get_tenderly_credentials()
     
-    url = f"https://api.tenderly.co/api/v1/account/{account_slug}/project/{project_slug}/vnets"
+    url = f"{get_tenderly_api_base()}/account/{account_slug}/project/{project_slug}/vnets"
     headers = {
         "X-Access-Key": access_token,
         "Content-Type": "application/json"
@@ -259,14 +317,19 @@ def list_virtual_testnets(verbose: bool = True) -> List[Dict]:
     return vnets
 
 
-def create_virtual_testnet(name: str, chain_id: int = 1, verbose: bool = True) -> Dict:
-    """Create a new Virtual Testnet."""
+def create_virtual_testnet(
+    name: str,
+    chain_id: int = 1,
+    verbose: bool = True,
+    block_number: Optional[int] = None
+) -> Dict:
+    """Create a new Virtual Testnet (forked at block_number, default latest)."""
     if not requests:
         raise ImportError("requests library required for Tenderly. Run: pip install requests")
     
     access_token, account_slug, project_slug = get_tenderly_credentials()
     
-    url = f"https://api.tenderly.co/api/v1/account/{account_slug}/project/{project_slug}/vnets"
+    url = f"{get_tenderly_api_base()}/account/{account_slug}/project/{project_slug}/vnets"
     headers = {
         "X-Access-Key": access_token,
         "Content-Type": "application/json"
@@ -277,9 +340,8 @@ def create_virtual_testnet(name: str, chain_id: int = 1, verbose: bool = True) -
     slug = f"{name.lower().replace(' ', '-')}-{timestamp}"
     
     # Get latest block from mainnet
-    block_number = None
     rpc_url = os.environ.get('MAINNET_RPC_URL')
-    if rpc_url:
+    if block_number is None and rpc_url:
         try:
             resp = requests.post(rpc_url, json={
                 "jsonrpc": "2.0",
@@ -343,7 +405,7 @@ def get_vnet_by_id(vnet_id: str) -> Optional[Dict]:
     
     access_token, account_slug, project_slug = get_tenderly_credentials()
     
-    url = f"https://api.tenderly.co/api/v1/account/{account_slug}/project/{project_slug}/vnets/{vnet_id}"
+    url = f"{get_tenderly_api_base()}/account/{account_slug}/project/{project_slug}/vnets/{vnet_id}"
     headers = {
         "X-Access-Key": access_token,
         "Content-Type": "application/json"
@@ -357,6 +419,27 @@ def get_vnet_by_id(vnet_id: str) -> Optional[Dict]:
         return None
 
 
+def delete_virtual_testnet(vnet_id: str) -> bool:
+    """Delete a virtual testnet. Returns False if the API refused."""
+    if not requests:
+        raise ImportError("requests library required for Tenderly. Run: pip install requests")
+    
+    access_token, account_slug, project_slug = get_tenderly_credentials()
+    
+    url = f"{get_tenderly_api_base()}/account/{account_slug}/project/{project_slug}/vnets/{vnet_id}"
+    headers = {
+        "X-Access-Key": access_token,
+        "Content-Type": "application/json"
+    }
+    
+    try:
+        response = requests.delete(url, headers=headers)
+        response.raise_for_status()
+        return True
+    except requests.exceptions.HTTPError:
+        return False
+
+
 def get_admin_rpc_url(vnet_data: Dict) -> str:
     """Extract Admin RPC URL from VNet data."""
     rpcs = vnet_data.get('rpcs', [])
@@ -387,6 +470,31 @@ def rpc_request(rpc_url: str, method: str, params: List = None) -> Any:
     return result.get('result')
 
 
+def rpc_batch_request(rpc_url: str, calls: List[Tuple[str, List]], timeout: int = 120) -> List[Dict]:
+    """Send several JSON-RPC calls in one HTTP request.
+
+    Returns the raw response objects ({'result': ...} or {'error': ...}) in call order.
+    """
+    if not requests:
+        raise ImportError("requests library required for Tenderly")
+
+    payload = [
+        {"jsonrpc": "2.0", "method": method, "params": params, "id": i}
+        for i, (method, params) in enumerate(calls)
+    ]
+
+    response = requests.post(rpc_url, json=payload, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+
+    # Endpoints that reject a batch answer with a single error object
+    if not isinstance(data, list):
+        raise RuntimeError(f"RPC batch error: {data.get('error', data) if isinstance(data, dict) else data}")
+
+    by_id = {item.get('id'): item for item in data if isinstance(item, dict)}
+    return [by_id.get(i, {"error": "No response for batch entry"}) for i in range(len(calls))]
+
+
 def warp_time_on_vnet(rpc_url: str, delay_seconds: int, verbose: bool = True) -> int:
     """Warp time on a Tenderly VNet using evm_setNextBlockTimestamp and mine a block."""
     # Get current block timestamp
@@ -435,13 +543,7 @@ def submit_tx_via_rpc(
     payload = {
         "jsonrpc": "2.0",
         "method": "eth_sendTransaction",
-        "params": [{
-            "from": from_addr,
-            "to": to_addr,
-            "value": value,
-            "data": data,
-            "gas": "0x7a1200"  # 8M gas
-        }],
+        "params": [build_tx_params(from_addr, to_addr, data, value)],
         "id": 1
     }
 
@@ -461,38 +563,7 @@ def submit_tx_via_rpc(
     # Wait for transaction to be mined and check receipt
     if tx_hash:
         receipt = wait_for_tx_receipt(rpc_url, tx_hash, verbose=verbose)
-
-        # Check if receipt is empty (timeout)
-        if not receipt:
-            if verbose:
-                print(f"    ❌ Tx failed - Timeout waiting for receipt")
-            return {"status": "failed", "error": "Timeout waiting for transaction receipt", "tx_hash": tx_hash, "receipt": receipt}
-
-        # Extract gas usage from receipt
-        gas_used_hex = receipt.get('gasUsed', '0x0')
-        gas_used = int(gas_used_hex, 16)
-
-        # Check for excessive gas usage
-        GAS_LIMIT_MAX = 10_000_000  # 10 million gas limit
-        if gas_used > GAS_LIMIT_MAX:
-            if verbose:
-                print(f"    ❌ Tx failed - Gas used: {gas_used:,} (exceeds limit of {GAS_LIMIT_MAX:,})")
-            return {"status": "failed", "error": f"Gas usage {gas_used:,} exceeds limit of {GAS_LIMIT_MAX:,}", "tx_hash": tx_hash, "receipt": receipt, "gas_used": gas_used}
-
-        if receipt.get('status') == '0x1':
-            if verbose:
-                print(f"    ✅ Tx successful - Gas used: {gas_used:,}")
-            return {"status": "success", "tx_hash": tx_hash, "receipt": receipt, "gas_used": gas_used}
-        elif receipt.get('status') == '0x0':
-            # Transaction reverted
-            if verbose:
-                print(f"    ❌ Tx reverted - Gas used: {gas_used:,}")
-            return {"status": "failed", "error": "Transaction reverted", "tx_hash": tx_hash, "receipt": receipt, "gas_used": gas_used}
-        else:
-            # Unknown status
-            if verbose:
-                print(f"    ❌ Tx failed - Unknown status: {receipt.get('status')}")
-            return {"status": "failed", "error": f"Unknown transaction status: {receipt.get('status')}", "tx_hash": tx_hash, "receipt": receipt, "gas_used": gas_used}
+        return classify_receipt(tx_hash, receipt, verbose=verbose)
 
     # If no transaction hash was returned, submission failed
     if verbose:
@@ -500,6 +571,58 @@ def submit_tx_via_rpc(
     return {"status": "failed", "error": "Transaction submission failed - no hash returned", "tx_hash": None}
 
 
+def build_tx_params(from_addr: str, to_addr: str, data: str, value: str = "0x0") -> Dict:
+    """Build eth_sendTransaction parameters for a Safe-file transaction."""
+    return {
+        "from": from_addr,
+        "to": to_addr,
+        "value": value,
+        "data": data,
+        "gas": TX_GAS_LIMIT
+    }
+
+
+def normalize_value(value: Any) -> str:
+    """Convert a Safe-file value (decimal string, int or hex) to a hex quantity."""
+    if not str(value).startswith('0x'):
+        return hex(int(value))
+    return value
+
+
+def classify_receipt(tx_hash: str, receipt: Dict, verbose: bool = True) -> Dict:
+    """Turn a transaction receipt into a simulation result (status, error, gas_used)."""
+    # Check if receipt is empty (timeout)
+    if not receipt:
+        if verbose:
+            print(f"    ❌ Tx failed - Timeout waiting for receipt")
+        return {"status": "failed", "error": "Timeout waiting for transaction receipt", "tx_hash": tx_hash, "receipt": receipt}
+
+    # Extract gas usage from receipt
+    gas_used_hex = receipt.get('gasUsed', '0x0')
+    gas_used = int(gas_used_hex, 16)
+
+    # Check for excessive gas usage
+    if gas_used > GAS_LIMIT_MAX:
+        if verbose:
+            print(f"    ❌ Tx failed - Gas used: {gas_used:,} (exceeds limit of {GAS_LIMIT_MAX:,})")
+        return {"status": "failed", "error": f"Gas usage {gas_used:,} exceeds limit of {GAS_LIMIT_MAX:,}", "tx_hash": tx_hash, "receipt": receipt, "gas_used": gas_used}
+
+    if receipt.get('status') == '0x1':
+        if verbose:
+            print(f"    ✅ Tx successful - Gas used: {gas_used:,}")
+        return {"status": "success", "tx_hash": tx_hash, "receipt": receipt, "gas_used": gas_used}
+    elif receipt.get('status') == '0x0':
+        # Transaction reverted
+        if verbose:
+            print(f"    ❌ Tx reverted - Gas used: {gas_used:,}")
+        return {"status": "failed", "error": "Transaction reverted", "tx_hash": tx_hash, "receipt": receipt, "gas_used": gas_used}
+    else:
+        # Unknown status
+        if verbose:
+            print(f"    ❌ Tx failed - Unknown status: {receipt.get('status')}")
+        return {"status": "failed", "error": f"Unknown transaction status: {receipt.get('status')}", "tx_hash": tx_hash, "receipt": receipt, "gas_used": gas_used}
+
+
 def wait_for_tx_receipt(rpc_url: str, tx_hash: str, timeout: int = 30, verbose: bool = True) -> Dict:
     """Wait for transaction receipt and return it."""
     start_time = time.time()
@@ -518,10 +641,1250 @@ def wait_for_tx_receipt(rpc_url: str, tx_hash: str, timeout: int = 30, verbose:
     return {}
 
 
+def wait_for_tx_receipts(rpc_url: str, tx_hashes: List[str], timeout: int = 60, verbose: bool = True) -> Dict[str, Dict]:
+    """Wait for several receipts, polling all outstanding hashes in one batch request.
+
+    Returns tx_hash -> receipt; hashes still missing at the timeout map to {}.
+    """
+    receipts = {}
+    pending = list(dict.fromkeys(tx_hashes))
+    start_time = time.time()
+
+    while pending:
+        try:
+            responses = rpc_batch_request(
+                rpc_url, [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in pending]
+            )
+            for tx_hash, response in zip(pending, responses):
+                if response.get('result'):
+                    receipts[tx_hash] = response['result']
+        except Exception:
+            pass
+        pending = [tx_hash for tx_hash in pending if tx_hash not in receipts]
+        if not pending or time.time() - start_time >= timeout:
+            break
+        time.sleep(1)
+
+    if pending and verbose:
+        print(f"    ⚠️  Timeout waiting for {len(pending)} receipt(s)")
+    for tx_hash in pending:
+        receipts[tx_hash] = {}
+    return receipts
+
+
+def submit_bundle_via_rpc(
+    rpc_url: str,
+    from_addr: str,
+    transactions: List[Dict],
+    bundle_size: int = DEFAULT_BUNDLE_SIZE,
+    verbose: bool = True
+) -> List[Dict]:
+    """Submit transactions as JSON-RPC batches of eth_sendTransaction.
+
+    Each batch of bundle_size transactions is sent in one request and its receipts
+    are collected with batched polling before the next batch is sent, so the VNet
+    state advances exactly as with one-by-one submission.
+
+    A JSON-RPC batch does not fix execution order on every node, and later
+    transactions may depend on earlier ones (link, then consolidate). Each
+    transaction therefore carries an explicit nonce following the sender's
+    pending nonce, and receipts are checked to have executed in submission
+    order. If a send is rejected, the rest of the phase is not sent: its
+    nonces would sit behind the gap and could execute out of order later.
+
+    Returns one result per transaction, in order (same shape as submit_tx_via_rpc).
+    """
+    results = []
+
+    for start in range(0, len(transactions), bundle_size):
+        chunk = transactions[start:start + bundle_size]
+        if verbose:
+            print(f"  Sending transactions {start + 1}-{start + len(chunk)} of {len(transactions)} in one batch...")
+
+        nonce = int(rpc_request(rpc_url, "eth_getTransactionCount", [from_addr, "pending"]), 16)
+        calls = []
+        for i, tx in enumerate(chunk):
+            params = build_tx_params(from_addr, tx['to'], tx['data'], normalize_value(tx.get('value', '0')))
+            params['nonce'] = hex(nonce + i)
+            calls.append(("eth_sendTransaction", [params]))
+        responses = rpc_batch_request(rpc_url, calls)
+        tx_hashes = [response.get('result') for response in responses]
+        rejected = next((i for i, h in enumerate(tx_hashes) if not h), None)
+        receipts = wait_for_tx_receipts(rpc_url, [h for h in tx_hashes[:rejected] if h], verbose=verbose)
+
+        previous_position = None
+        for i, (response, tx_hash) in enumerate(zip(responses, tx_hashes)):
+            if rejected is not None and i > rejected:
+                results.append({"status": "failed", "error": f"Not executed - transaction {start + rejected + 1} "
+                                f"of the phase was rejected (nonce gap)", "tx_hash": tx_hash})
+            elif 'error' in response:
+                results.append({"status": "failed", "error": response['error'], "tx_hash": None})
+            elif not tx_hash:
+                results.append({"status": "failed", "error": "Transaction submission failed - no hash returned", "tx_hash": None})
+            else:
+                receipt = receipts.get(tx_hash, {})
+                result = classify_receipt(tx_hash, receipt, verbose=False)
+                if receipt:
+                    position = (int(receipt.get('blockNumber', '0x0'), 16), int(receipt.get('transactionIndex', '0x0'), 16))
+                    if previous_position is not None and position <= previous_position:
+                        result = {**result, "status": "failed",
+                                  "error": f"Executed out of submission order (block {position[0]}, index {position[1]})"}
+                    previous_position = position
+                results.append(result)
+
+        if rejected is not None:
+            for tx in transactions[start + len(chunk):]:
+                results.append({"status": "failed", "error": "Not sent - an earlier transaction of the phase was rejected",
+                                "tx_hash": None})
+            break
+
+    return results
+
+
+def simulate_bundle_via_tenderly(
+    rpc_url: str,
+    from_addr: str,
+    transactions: List[Dict],
+    verbose: bool = True
+) -> List[Dict]:
+    """Simulate transactions in one tenderly_simulateBundle call.
+
+    The bundle runs sequentially on top of the latest VNet block, but nothing is
+    committed to the VNet, so this only suits a single phase whose resulting
+    state is not needed afterwards.
+
+    Returns one result per transaction, in order (same shape as submit_tx_via_rpc,
+    with tx_hash None).
+    """
+    if verbose:
+        print(f"  Simulating {len(transactions)} transactions with tenderly_simulateBundle...")
+
+    bundle = [
+        build_tx_params(from_addr, tx['to'], tx['data'], normalize_value(tx.get('value', '0')))
+        for tx in transactions
+    ]
+    simulations = rpc_request(rpc_url, "tenderly_simulateBundle", [bundle, "latest"]) or []
+
+    results = []
+    for i in range(len(transactions)):
+        if i >= len(simulations):
+            results.append({"status": "failed", "error": "No simulation result returned", "tx_hash": None})
+            continue
+        simulation = simulations[i]
+        status = simulation.get('status')
+        gas_used = simulation.get('gasUsed', 0)
+        gas_used = int(gas_used, 16) if isinstance(gas_used, str) else int(gas_used or 0)
+        # Reuse the receipt checks (gas cap, success/revert) on a receipt-shaped view
+        receipt = {
+            'status': '0x1' if status in (True, '0x1', 1) else '0x0' if status in (False, '0x0', 0) else status,
+            'gasUsed': hex(gas_used),
+        }
+        result = classify_receipt(None, receipt, verbose=False)
+        if result['status'] != 'success' and simulation.get('error'):
+            result['error'] = simulation['error']
+        results.append(result)
+
+    return results
+
+
+def run_phase(
+    rpc_url: str,
+    from_addr: str,
+    transactions: List[Dict],
+    label: str,
+    bundle_method: Optional[str] = None,
+    bundle_size: int = DEFAULT_BUNDLE_SIZE,
+    tx_link: Optional[str] = None
+) -> Tuple[List[Dict], int]:
+    """Run one phase of transactions on a VNet and print per-transaction results.
+
+    Args:
+        rpc_url: VNet Admin RPC URL
+        from_addr: Sender (Safe or EOA) for every transaction
+        transactions: Safe-file transactions ({'to', 'data', 'value'})
+        label: Prefix for per-transaction headings (e.g. "Schedule Transaction")
+        bundle_method: None for one-by-one submission, 'batch' for JSON-RPC batches,
+                       'simulate' for a single tenderly_simulateBundle call
+        bundle_size: Transactions per JSON-RPC batch ('batch' method)
+        tx_link: Dashboard URL prefix for failed transaction links
+
+    Returns:
+        (results, gas_used) - one result dict per transaction, and the phase gas total
+    """
+    if bundle_method == 'batch':
+        results = submit_bundle_via_rpc(rpc_url, from_addr, transactions, bundle_size=bundle_size)
+    elif bundle_method == 'simulate':
+        results = simulate_bundle_via_tenderly(rpc_url, from_addr, transactions)
+    else:
+        results = []
+        for i, tx in enumerate(transactions):
+            print(f"\n--- {label} {i+1}/{len(transactions)} ---")
+            result = submit_tx_via_rpc(
+                rpc_url,
+                from_addr,
+                tx['to'],
+                tx['data'],
+                normalize_value(tx.get('value', '0'))
+            )
+            if result.get('status') != 'success' and result.get('tx_hash') and tx_link:
+                print(f"    🔗 Tx Link: {tx_link}/{result['tx_hash']}")
+            results.append(result)
+
+    if bundle_method != 'simulate':
+        attach_revert_data(rpc_url, from_addr, transactions, results)
+
+    if bundle_method:
+        print_phase_results(label, results, tx_link=tx_link)
+
+    gas_used = sum(result.get('gas_used', 0) for result in results)
+    return results, gas_used
+
+
+def attach_revert_data(rpc_url: str, from_addr: str, transactions: List[Dict], results: List[Dict]):
+    """Replay reverted transactions with eth_call on their parent block and store the revert data.
+
+    Each simulated transaction is mined in its own block, so the parent block
+    is exactly the state the transaction ran against.
+    """
+    failed = [
+        i for i, result in enumerate(results)
+        if result.get('status') != 'success' and result.get('receipt', {}).get('blockNumber')
+    ]
+    if not failed:
+        return
+    calls = []
+    for i in failed:
+        tx = transactions[i]
+        parent_block = hex(int(results[i]['receipt']['blockNumber'], 16) - 1)
+        calls.append(("eth_call", [
+            build_tx_params(from_addr, tx['to'], tx['data'], normalize_value(tx.get('value', '0'))),
+            parent_block
+        ]))
+    try:
+        responses = rpc_batch_request(rpc_url, calls)
+    except Exception:
+        return
+    for i, response in zip(failed, responses):
+        error = response.get('error')
+        if isinstance(error, dict):
+            results[i]['revert_data'] = error.get('data')
+            results[i]['revert_reason'] = error.get('message')
+
+
+def print_phase_results(label: str, results: List[Dict], tx_link: Optional[str] = None):
+    """Print one line per transaction result (bundle and sharded modes)."""
+    for i, result in enumerate(results):
+        gas = f"{result['gas_used']:,} gas" if 'gas_used' in result else "no gas data"
+        shard = f" [shard {result['shard']}]" if 'shard' in result else ""
+        if result.get('status') == 'success':
+            print(f"    ✅ {label} {i+1}/{len(results)}{shard} - {gas}")
+        else:
+            print(f"    ❌ {label} {i+1}/{len(results)}{shard} - {result.get('error')} ({gas})")
+            if result.get('revert_data') or result.get('revert_reason'):
+                print(f"       Revert: {result.get('revert_reason') or ''} {result.get('revert_data') or ''}".rstrip())
+            if result.get('tx_hash') and tx_link:
+                print(f"    🔗 Tx Link: {tx_link}/{result['tx_hash']}")
+
+
+def simulate_quietly(
+    rpc_url: str,
+    from_addr: str,
+    transactions: List[Dict],
+    bundle_method: Optional[str] = None,
+    bundle_size: int = DEFAULT_BUNDLE_SIZE
+) -> List[Dict]:
+    """Run transactions without per-transaction output (for worker threads)."""
+    if bundle_method == 'batch':
+        results = submit_bundle_via_rpc(rpc_url, from_addr, transactions, bundle_size=bundle_size, verbose=False)
+    else:
+        results = [
+            submit_tx_via_rpc(rpc_url, from_addr, tx['to'], tx['data'], normalize_value(tx.get('value', '0')), verbose=False)
+            for tx in transactions
+        ]
+    attach_revert_data(rpc_url, from_addr, transactions, results)
+    return results
+
+
+# ==============================================================================
+# Sharded Simulation
+# ==============================================================================
+
+def decode_consolidation_pubkeys(data: str) -> Optional[Tuple[str, List[str]]]:
+    """Decode requestConsolidation calldata into (target_pubkey, source_pubkeys).
+
+    Returns None for any other calldata.
+    """
+    if not data or not data.lower().startswith('0x' + REQUEST_CONSOLIDATION_SELECTOR):
+        return None
+    try:
+        params = bytes.fromhex(data[10:])
+
+        def word(offset: int) -> int:
+            return int.from_bytes(params[offset:offset + 32], 'big')
+
+        def read_bytes(offset: int) -> str:
+            length = word(offset)
+            return '0x' + params[offset + 32:offset + 32 + length].hex()
+
+        array_start = word(0)
+        count = word(array_start)
+        elements_start = array_start + 32
+        target = None
+        sources = []
+        for i in range(count):
+            tuple_start = elements_start + word(elements_start + 32 * i)
+            sources.append(read_bytes(tuple_start + word(tuple_start)))
+            target = read_bytes(tuple_start + word(tuple_start + 32))
+        if target is None:
+            return None
+        return target, sources
+    except (ValueError, IndexError):
+        return None
+
+
+def resolve_etherfi_nodes(rpc_url: str, nodes_manager: str, pubkeys: List[str]) -> Dict[str, str]:
+    """Map validator pubkeys to their EtherFi node (one batch of eth_call).
+
+    Unlinked pubkeys are left out of the result.
+    """
+    if not pubkeys:
+        return {}
+    calls = []
+    for pubkey in pubkeys:
+        pubkey_hash = hashlib.sha256(bytes.fromhex(pubkey[2:]) + b'\x00' * 16).hexdigest()
+        calls.append(("eth_call", [{
+            "to": nodes_manager,
+            "data": "0x" + ETHERFI_NODE_FROM_PUBKEY_HASH_SELECTOR + pubkey_hash
+        }, "latest"]))
+
+    nodes = {}
+    for pubkey, response in zip(pubkeys, rpc_batch_request(rpc_url, calls)):
+        result = response.get('result')
+        if result and len(result) >= 42:
+            node = "0x" + result[-40:]
+            if node != ZERO_ADDRESS:
+                nodes[pubkey] = node
+    return nodes
+
+
+def plan_shards(
+    transactions: List[Dict],
+    shard_by: str = 'pod',
+    rpc_url: Optional[str] = None
+) -> Tuple[int, List[List[int]]]:
+    """Split a phase into a sequential prefix and independent shards.
+
+    Only requestConsolidation transactions are sharded. Everything up to and
+    including the last other transaction (e.g. linking) stays in the prefix,
+    so the original order of dependent transactions is kept.
+    Consolidations that share a pubkey always land in the same shard;
+    with shard_by='pod' those whose targets resolve to the same EtherFi node
+    (via rpc_url) do too.
+
+    Returns:
+        (prefix_length, shards) - shards are lists of transaction indices, each in order
+    """
+    decoded = [decode_consolidation_pubkeys(tx.get('data', '')) for tx in transactions]
+    prefix_length = max((i + 1 for i, d in enumerate(decoded) if d is None), default=0)
+
+    # Union-find over transaction indices, joined through shared keys
+    parent = list(range(len(transactions)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner_of_key = {}
+
+    def join(i: int, key: str):
+        if key in owner_of_key:
+            parent[find(i)] = find(owner_of_key[key])
+        else:
+            owner_of_key[key] = i
+
+    sharded = range(prefix_length, len(transactions))
+    nodes = {}
+    if shard_by == 'pod' and rpc_url:
+        targets_by_manager = {}
+        for i in sharded:
+            targets_by_manager.setdefault(transactions[i]['to'], set()).add(decoded[i][0].lower())
+        for nodes_manager, targets in targets_by_manager.items():
+            nodes.update(resolve_etherfi_nodes(rpc_url, nodes_manager, sorted(targets)))
+
+    for i in sharded:
+        target, sources = decoded[i]
+        for pubkey in [target] + sources:
+            join(i, pubkey.lower())
+        if target.lower() in nodes:
+            join(i, f"node:{nodes[target.lower()]}")
+
+    shards = {}
+    for i in sharded:
+        shards.setdefault(find(i), []).append(i)
+    return prefix_length, list(shards.values())
+
+
+def assign_shards(shards: List[List[int]], workers: int) -> List[List[List[int]]]:
+    """Spread shards over workers, largest first onto the least loaded worker."""
+    loads = [[] for _ in range(min(workers, len(shards)))]
+    totals = [0] * len(loads)
+    for shard in sorted(shards, key=len, reverse=True):
+        worker = totals.index(min(totals))
+        loads[worker].append(shard)
+        totals[worker] += len(shard)
+    return loads
+
+
+def run_sharded_phase(
+    rpc_url: str,
+    from_addr: str,
+    transactions: List[Dict],
+    label: str,
+    workers: int,
+    first_port: int,
+    shard_by: str = 'pod',
+    final_pass: bool = False,
+    bundle_method: Optional[str] = None,
+    bundle_size: int = DEFAULT_BUNDLE_SIZE
+) -> Tuple[List[Dict], int]:
+    """Run a phase as independent shards on parallel anvil forks of rpc_url.
+
+    The prefix (see plan_shards) runs on rpc_url first. Each worker then
+    forks rpc_url with its own anvil and runs its shards, reverting to a
+    snapshot between shards so every shard starts from the same state.
+    Results are merged back into transaction order. With final_pass the
+    whole remainder is also run sequentially on rpc_url, which catches
+    ordering effects such as the shared consolidation fee queue; its results
+    are the ones returned.
+
+    Returns:
+        (results, gas_used) like run_phase
+    """
+    prefix_length, shards = plan_shards(transactions, shard_by=shard_by, rpc_url=rpc_url)
+    print(f"  Sharding: {prefix_length} sequential prefix transaction(s), "
+          f"{len(transactions) - prefix_length} in {len(shards)} shard(s) by {shard_by}")
+
+    results = [None] * len(transactions)
+    if prefix_length:
+        results[:prefix_length] = simulate_quietly(
+            rpc_url, from_addr, transactions[:prefix_length], bundle_method, bundle_size
+        )
+
+    loads = assign_shards(shards, workers)
+    if loads:
+        fork_block = int(rpc_request(rpc_url, "eth_blockNumber"), 16)
+        print(f"  Running on {len(loads)} anvil fork(s) of block {fork_block} "
+              f"(ports {first_port}-{first_port + len(loads) - 1})...")
+
+    def run_worker(worker: int) -> List[Tuple[int, List[int], List[Dict]]]:
+        process, worker_rpc = start_anvil(rpc_url, port=first_port + worker, fork_block=fork_block, verbose=False)
+        try:
+            impersonate_on_anvil(worker_rpc, from_addr, verbose=False)
+            done = []
+            for shard in loads[worker]:
+                snapshot_id = rpc_request(worker_rpc, "evm_snapshot")
+                shard_results = simulate_quietly(
+                    worker_rpc, from_addr, [transactions[i] for i in shard], bundle_method, bundle_size
+                )
+                rpc_request(worker_rpc, "evm_revert", [snapshot_id])
+                done.append((shard, shard_results))
+            return done
+        finally:
+            stop_anvil(process)
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, len(loads))) as executor:
+        for done in executor.map(run_worker, range(len(loads))):
+            for shard, shard_results in done:
+                shard_id = shards.index(shard) + 1
+                for i, result in zip(shard, shard_results):
+                    results[i] = {**result, 'shard': shard_id}
+    if loads:
+        print(f"  Shards finished in {time.time() - start_time:.1f}s")
+
+    print_phase_results(label, results)
+
+    if final_pass:
+        print(f"\n  Final sequential pass over {len(transactions) - prefix_length} transaction(s)...")
+        sequential = simulate_quietly(
+            rpc_url, from_addr, transactions[prefix_length:], bundle_method, bundle_size
+        )
+        differing = [
+            prefix_length + j for j, result in enumerate(sequential)
+            if result.get('status') != results[prefix_length + j].get('status')
+        ]
+        if differing:
+            print(f"  ⚠️  {len(differing)} transaction(s) behave differently in sequence (ordering effects):")
+            for i in differing:
+                print(f"    {label} {i+1}: shard {results[i].get('status')}, sequential {sequential[i - prefix_length].get('status')}"
+                      f" ({sequential[i - prefix_length].get('error', 'ok')})")
+        else:
+            print(f"  ✅ Sequential pass matches the sharded results")
+        results[prefix_length:] = sequential
+
+    gas_used = sum(result.get('gas_used', 0) for result in results)
+    return results, gas_used
+
+
+# ==============================================================================
+# Result Cache
+# ==============================================================================
+
+def simulation_mode(args) -> Dict:
+    """Submission settings that change a run's outcome (bundling, sharding)."""
+    bundle_method = args.bundle_method if args.bundle else None
+    sharded = args.shard_workers is not None
+    return {
+        'bundle': bundle_method,
+        'bundle_size': args.bundle_size if bundle_method == 'batch' else None,
+        'shard_by': args.shard_by if sharded else None,
+        'final_pass': bool(args.final_pass) if sharded else None,
+    }
+
+
+def simulation_cache_key(
+    backend: str,
+    fork_id: str,
+    phases: List[Dict],
+    delay_seconds: Optional[int],
+    mode: Optional[Dict] = None
+) -> str:
+    """Content hash of everything that determines a simulation's outcome.
+
+    Covers the backend, the fork state (fork_id), the submission mode
+    (bundle method, sharding), every phase's sender and transactions in
+    order, and the timelock delay (timelock mode only).
+    """
+    material = {
+        'version': CACHE_VERSION,
+        'backend': backend,
+        'fork': fork_id,
+        'mode': mode,
+        'delay': delay_seconds if any(phase['warp_after'] for phase in phases) else None,
+        'phases': [
+            {
+                'name': phase['name'],
+                'sender': (phase['sender'] or '').lower(),
+                'transactions': [
+                    [tx['to'].lower(), tx['data'].lower(), normalize_value(tx.get('value', '0'))]
+                    for tx in phase['transactions']
+                ],
+            }
+            for phase in phases
+        ],
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+
+def load_cached_simulation(cache_dir: Path, key: str) -> Optional[Dict]:
+    """Return the cached outcome for key, or None."""
+    path = cache_dir / f"{key}.json"
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def transient_failure(result: Dict) -> bool:
+    """Whether a failed result may come from the node or network rather than the transactions."""
+    if result.get('status') == 'success' or result.get('revert_data') or result.get('revert_reason'):
+        return False
+    error = result.get('error')
+    if isinstance(error, dict):
+        # JSON-RPC error: a revert carries its data or says so in the message
+        return not error.get('data') and 'revert' not in str(error.get('message', '')).lower()
+    return str(error).startswith(TRANSIENT_RESULT_ERRORS)
+
+
+def store_cached_simulation(cache_dir: Path, key: str, outcome: Dict, fork_id: str):
+    """Store per-transaction status, gas used and revert data for key.
+
+    Reverts are deterministic for a given fork and are stored like successes.
+    A run with a transient failure (receipt timeout, missing hash or result,
+    a node error without revert data) is not stored, as the cached failure
+    would be replayed on every later --cache run.
+    """
+    if any(transient_failure(result) for phase in outcome['phases'] for result in phase['results']):
+        return
+    keep = ('status', 'gas_used', 'error', 'revert_data', 'revert_reason', 'shard')
+    entry = {
+        'key': key,
+        'fork': fork_id,
+        'created_at': datetime.now().isoformat(),
+        'success': outcome['success'],
+        'total_gas_used': outcome['total_gas_used'],
+        'phases': [
+            {
+                'name': phase['name'],
+                'gas_used': phase['gas_used'],
+                'results': [{k: result[k] for k in keep if k in result} for result in phase['results']],
+            }
+            for phase in outcome['phases']
+        ],
+    }
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_dir / f"{key}.json.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(entry, f, indent=2, default=str)
+    os.replace(tmp_path, cache_dir / f"{key}.json")
+
+
+def probe_cached_simulation(rpc_url: str, block_tag: str, phases: List[Dict], cached: Dict) -> bool:
+    """Re-check the cheapest first-phase transaction against the fork state.
+
+    The transaction is replayed with eth_call at block_tag and its outcome
+    compared with the cached one. This is a freshness check, not a full
+    re-simulation: it catches forks whose state no longer matches the cache
+    (e.g. a changed contract) at the cost of one call.
+
+    Returns:
+        True if the probe agrees with the cache
+    """
+    first_phase = phases[0]
+    cached_results = cached['phases'][0]['results']
+    candidates = [i for i, result in enumerate(cached_results) if 'gas_used' in result]
+    if not candidates:
+        return True
+    i = min(candidates, key=lambda j: cached_results[j]['gas_used'])
+    tx = first_phase['transactions'][i]
+
+    response = rpc_batch_request(rpc_url, [("eth_call", [
+        build_tx_params(first_phase['sender'], tx['to'], tx['data'], normalize_value(tx.get('value', '0'))),
+        block_tag
+    ])])[0]
+    probe_success = 'error' not in response
+    cached_success = cached_results[i].get('status') == 'success'
+    print(f"  Probe: {first_phase['label']} {i+1} ({cached_results[i]['gas_used']:,} gas cached) - "
+          f"{'succeeds' if probe_success else 'reverts'} now, "
+          f"{'succeeded' if cached_success else 'failed'} in cache")
+    return probe_success == cached_success
+
+
+def report_cached_simulation(phases: List[Dict], cached: Dict):
+    """Print a cached outcome the way a live run reports it."""
+    for phase, phase_outcome in zip(phases, cached['phases']):
+        print(f"\n{'='*40}")
+        print(f"{phase['title']} (cached)")
+        print(f"{'='*40}")
+        print_phase_results(phase['label'], phase_outcome['results'])
+        print(f"\n📊 {phase['summary']}: {len(phase_outcome['results'])} transactions, "
+              f"{phase_outcome['gas_used']:,} gas used")
+
+
+def check_simulation_cache(
+    args,
+    backend: str,
+    fork_id: Optional[str],
+    phases: List[Dict],
+    probe_rpc: Optional[str] = None,
+    probe_block: str = "latest"
+) -> Tuple[Optional[str], Optional[Dict]]:
+    """Look up a run in the result cache (--cache).
+
+    Returns:
+        (key, cached_outcome) - key is None when caching is off or the fork
+        state cannot be identified; cached_outcome is None on a miss or a
+        failed --cache-probe
+    """
+    if not args.cache:
+        return None, None
+    if not fork_id:
+        print("Cache: disabled for this run (fork state cannot be identified)")
+        return None, None
+
+    delay_seconds = parse_delay(args.delay) if args.delay else 28800
+    key = simulation_cache_key(backend, fork_id, phases, delay_seconds, simulation_mode(args))
+    cached = load_cached_simulation(Path(args.cache_dir), key)
+    print(f"Cache: {key[:16]}... ({fork_id})")
+    if cached is None:
+        print("  Miss - simulating")
+        return key, None
+
+    print(f"  Hit - stored {cached.get('created_at')}")
+    if args.cache_probe:
+        if not probe_rpc:
+            print("  Probe skipped (no RPC for the fork state)")
+        elif not probe_cached_simulation(probe_rpc, probe_block, phases, cached):
+            print("  Probe disagrees with the cache - simulating again")
+            return key, None
+    return key, cached
+
+
+# ==============================================================================
+# Gas Profiling
+# ==============================================================================
+
+# Batched calls whose gas is profiled against their item count
+PROFILED_FUNCTIONS = {
+    REQUEST_CONSOLIDATION_SELECTOR: 'requestConsolidation',
+    LINK_LEGACY_VALIDATOR_IDS_SELECTOR: 'linkLegacyValidatorIds',
+    BATCH_APPROVE_REGISTRATION_SELECTOR: 'batchApproveRegistration',
+}
+
+
+def decode_batch_size(data: str) -> Tuple[str, Optional[int]]:
+    """Return (function, item count) for a transaction's calldata.
+
+    requestConsolidation counts consolidation requests; linkLegacyValidatorIds
+    and batchApproveRegistration count validator ids. Other calldata returns
+    its selector and None.
+    """
+    selector = (data or '0x')[2:10].lower()
+    function = PROFILED_FUNCTIONS.get(selector)
+    if function is None:
+        return (f"0x{selector}" if selector else 'transfer'), None
+    if selector == REQUEST_CONSOLIDATION_SELECTOR:
+        decoded = decode_consolidation_pubkeys(data)
+        return function, (len(decoded[1]) if decoded else None)
+    try:
+        # Both calls take the validator ids as their first dynamic array
+        params = bytes.fromhex(data[10:])
+        offset = int.from_bytes(params[0:32], 'big')
+        length_word = params[offset:offset + 32]
+        if len(length_word) < 32:
+            return function, None
+        return function, int.from_bytes(length_word, 'big')
+    except ValueError:
+        return function, None
+
+
+def build_gas_profile(phases: List[Dict], outcome: Dict) -> List[Dict]:
+    """One row per simulated transaction: phase, index, function, items, gas, status."""
+    rows = []
+    for phase, phase_outcome in zip(phases, outcome['phases']):
+        for index, (tx, result) in enumerate(zip(phase['transactions'], phase_outcome['results']), 1):
+            function, items = decode_batch_size(tx.get('data', '0x'))
+            gas_used = result.get('gas_used')
+            rows.append({
+                'phase': phase['name'],
+                'index': index,
+                'function': function,
+                'items': items,
+                'gas_used': gas_used,
+                'gas_per_item': round(gas_used / items) if gas_used and items else None,
+                'calldata_bytes': max(0, (len(tx.get('data') or '0x') - 2) // 2),
+                'status': result.get('status'),
+                'shard': result.get('shard'),
+            })
+    return rows
+
+
+def fit_marginal_gas(rows: List[Dict]) -> Dict[str, Dict]:
+    """Least-squares fit of gas_used = base + per_item * items for each function.
+
+    Only successful transactions with a decoded item count are used. With a
+    single distinct batch size the split between base and per-item cost is
+    unknown, so only the average per item is reported.
+    """
+    samples = {}
+    for row in rows:
+        if row['status'] == 'success' and row['items'] and row['gas_used']:
+            samples.setdefault(row['function'], []).append((row['items'], row['gas_used']))
+
+    fits = {}
+    for function, points in samples.items():
+        n = len(points)
+        mean_x = sum(x for x, _ in points) / n
+        mean_y = sum(y for _, y in points) / n
+        sxx = sum((x - mean_x) ** 2 for x, _ in points)
+        fit = {
+            'samples': n,
+            'min_items': min(x for x, _ in points),
+            'max_items': max(x for x, _ in points),
+            'avg_gas_per_item': round(sum(y / x for x, y in points) / n),
+        }
+        if sxx > 0:
+            per_item = sum((x - mean_x) * (y - mean_y) for x, y in points) / sxx
+            base = mean_y - per_item * mean_x
+            ss_res = sum((y - (base + per_item * x)) ** 2 for x, y in points)
+            ss_tot = sum((y - mean_y) ** 2 for _, y in points)
+            fit.update({
+                'base_gas': round(base),
+                'gas_per_item': round(per_item),
+                'r_squared': round(1 - ss_res / ss_tot, 4) if ss_tot else 1.0,
+                'max_residual': round(max(abs(y - (base + per_item * x)) for x, y in points)),
+            })
+            # Largest batch that stays within the per-transaction gas limit
+            if per_item > 0:
+                fit['max_items_within_tx_gas_limit'] = int((int(TX_GAS_LIMIT, 16) - base) // per_item)
+        fits[function] = fit
+    return fits
+
+
+def write_gas_profile(output_prefix: str, phases: List[Dict], outcome: Dict, metadata: Dict):
+    """Write <prefix>.csv (one row per transaction) and <prefix>.json (rows + fit) and print a summary."""
+    rows = build_gas_profile(phases, outcome)
+    fits = fit_marginal_gas(rows)
+
+    output = Path(output_prefix)
+    if output.suffix in ('.csv', '.json'):
+        output = output.with_suffix('')
+    output.parent.mkdir(parents=True, exist_ok=True)
+    csv_path = output.with_name(output.name + '.csv')
+    json_path = output.with_name(output.name + '.json')
+
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else ['phase'])
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(json_path, 'w') as f:
+        json.dump({
+            **metadata,
+            'generated_at': datetime.now().isoformat(),
+            'tx_gas_limit': int(TX_GAS_LIMIT, 16),
+            'fits': fits,
+            'transactions': rows,
+        }, f, indent=2)
+
+    print(f"\n{'='*40}")
+    print("GAS PROFILE")
+    print(f"{'='*40}")
+    for function, fit in sorted(fits.items()):
+        print(f"{function}: {fit['samples']} txs, {fit['min_items']}-{fit['max_items']} items")
+        if 'gas_per_item' in fit:
+            print(f"  gas ≈ {fit['base_gas']:,} + {fit['gas_per_item']:,} × items "
+                  f"(R² {fit['r_squared']}, max residual {fit['max_residual']:,})")
+            if 'max_items_within_tx_gas_limit' in fit:
+                print(f"  Max items within {int(TX_GAS_LIMIT, 16):,} gas: {fit['max_items_within_tx_gas_limit']:,}")
+        else:
+            print(f"  {fit['avg_gas_per_item']:,} gas per item (one batch size, no marginal fit)")
+    if not fits:
+        print("No successful batched calls to fit")
+    print(f"Rows: {len(rows)}")
+    print(f"CSV:  {csv_path}")
+    print(f"JSON: {json_path}")
+
+
+# ==============================================================================
+# VNet Pool
+# ==============================================================================
+#
+# Pre-created VNets are recorded in a local registry file:
+#   {"version": 1, "vnets": [{"id", "project", "admin_rpc", "fork_block",
+#    "snapshot", "created_at", "state": "idle" | "leased", "leased_by"}]}
+# Each VNet carries an evm_snapshot taken right after creation. A lease
+# marks it leased; the release reverts it to that snapshot and marks it idle
+# again. VNets older than the maximum age are deleted, as are leases whose
+# process no longer exists.
+
+@contextmanager
+def locked_pool_registry(registry_path: Path) -> Iterator[Dict]:
+    """Load the pool registry under an exclusive lock; saved when the block exits cleanly."""
+    registry_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(registry_path.with_suffix('.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        registry = {'version': 1, 'vnets': []}
+        if registry_path.exists():
+            try:
+                with open(registry_path, 'r') as f:
+                    registry = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Ignoring unreadable pool registry {registry_path}: {e}")
+        yield registry
+        tmp_path = registry_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(registry, f, indent=2)
+        os.replace(tmp_path, registry_path)
+
+
+def pool_project() -> str:
+    """account/project the pooled VNets belong to."""
+    _, account_slug, project_slug = get_tenderly_credentials()
+    return f"{account_slug}/{project_slug}"
+
+
+def pooled_vnet_data(entry: Dict) -> Dict:
+    """VNet data (as returned by the API) for a pool entry."""
+    return {'id': entry['id'], 'rpcs': [{'name': 'Admin RPC', 'url': entry['admin_rpc']}]}
+
+
+def process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def evict_vnet_pool(registry_path: Path, max_age_seconds: int, drain: bool = False) -> int:
+    """Delete expired VNets and abandoned leases (all idle VNets with drain). Returns the count."""
+    project = pool_project()
+    now = time.time()
+    evicted = []
+    with locked_pool_registry(registry_path) as registry:
+        kept = []
+        for entry in registry['vnets']:
+            if entry['project'] != project:
+                kept.append(entry)
+                continue
+            if entry['state'] == 'leased':
+                expired = not process_alive(entry.get('leased_by'))
+            else:
+                expired = drain or now - entry['created_at'] > max_age_seconds
+            (evicted if expired else kept).append(entry)
+        registry['vnets'] = kept
+
+    for entry in evicted:
+        if not delete_virtual_testnet(entry['id']):
+            print(f"  Warning: Failed to delete pooled VNet {entry['id']}")
+    return len(evicted)
+
+
+def create_pool_vnet(index: int, fork_block: Optional[int]) -> Dict:
+    """Create one VNet and take its base snapshot."""
+    name = f"Pool-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{index}"
+    vnet_data = create_virtual_testnet(name, verbose=False, block_number=fork_block)
+    admin_rpc = get_admin_rpc_url(vnet_data)
+    block = vnet_data.get('fork_config', {}).get('block_number') or int(rpc_request(admin_rpc, "eth_blockNumber"), 16)
+    return {
+        'id': vnet_data['id'],
+        'admin_rpc': admin_rpc,
+        'fork_block': block,
+        'snapshot': rpc_request(admin_rpc, "evm_snapshot"),
+        'created_at': time.time(),
+        'state': 'idle',
+        'leased_by': None,
+    }
+
+
+def fill_vnet_pool(registry_path: Path, size: int, max_age_seconds: int, fork_block: Optional[int] = None) -> int:
+    """Evict expired VNets, then create VNets until the project has `size`. Returns the number created."""
+    evicted = evict_vnet_pool(registry_path, max_age_seconds)
+    if evicted:
+        print(f"Evicted {evicted} expired VNet(s)")
+
+    project = pool_project()
+    with locked_pool_registry(registry_path) as registry:
+        missing = size - sum(1 for entry in registry['vnets'] if entry['project'] == project)
+    if missing <= 0:
+        print(f"Pool already has {size} or more VNets")
+        return 0
+
+    # One fork block for the whole fill keeps results comparable (and cacheable)
+    mainnet_rpc = os.environ.get('MAINNET_RPC_URL')
+    if fork_block is None and mainnet_rpc:
+        fork_block = int(rpc_request(mainnet_rpc, "eth_blockNumber"), 16)
+    print(f"Creating {missing} VNet(s){f' at block {fork_block}' if fork_block else ''}...")
+
+    created = []
+    with ThreadPoolExecutor(max_workers=min(POOL_CREATE_CONCURRENCY, missing)) as executor:
+        futures = [executor.submit(create_pool_vnet, i, fork_block) for i in range(missing)]
+        for future in futures:
+            try:
+                entry = future.result()
+            except Exception as e:
+                print(f"  Failed to create VNet: {e}")
+                continue
+            entry['project'] = project
+            created.append(entry)
+            print(f"  ✅ {entry['id']} (block {entry['fork_block']})")
+
+    with locked_pool_registry(registry_path) as registry:
+        registry['vnets'].extend(created)
+    return len(created)
+
+
+def lease_pooled_vnet(registry_path: Path, max_age_seconds: int, fork_block: Optional[int] = None) -> Optional[Dict]:
+    """Lease the most recently forked idle VNet (at fork_block, if given). None if there is none."""
+    evict_vnet_pool(registry_path, max_age_seconds)
+    with locked_pool_registry(registry_path) as registry:
+        idle = idle_pooled_vnets(registry, fork_block)
+        if not idle:
+            return None
+        entry = max(idle, key=lambda e: (e['fork_block'], e['created_at']))
+        entry['state'] = 'leased'
+        entry['leased_by'] = os.getpid()
+        return dict(entry)
+
+
+def idle_pooled_vnets(registry: Dict, fork_block: Optional[int] = None) -> List[Dict]:
+    """Idle VNets of this project in registry (at fork_block, if given)."""
+    project = pool_project()
+    return [
+        entry for entry in registry['vnets']
+        if entry['project'] == project and entry['state'] == 'idle'
+        and (fork_block is None or entry['fork_block'] == fork_block)
+    ]
+
+
+def newest_pooled_fork_block(registry_path: Path) -> Optional[int]:
+    """Fork block lease_pooled_vnet would pick without a fork_block. None if no VNet is idle.
+
+    Lets the cache be checked before a VNet is leased: a cache hit then
+    leaves the pool alone.
+    """
+    with locked_pool_registry(registry_path) as registry:
+        idle = idle_pooled_vnets(registry)
+        return max(entry['fork_block'] for entry in idle) if idle else None
+
+
+def release_pooled_vnet(registry_path: Path, entry: Dict, max_age_seconds: int):
+    """Revert a leased VNet to its base snapshot and return it to the pool (deleted if that fails or it expired)."""
+    snapshot = None
+    try:
+        if rpc_request(entry['admin_rpc'], "evm_revert", [entry['snapshot']]):
+            # A fresh snapshot, for nodes where a revert consumes the old one
+            snapshot = rpc_request(entry['admin_rpc'], "evm_snapshot")
+    except Exception as e:
+        print(f"Warning: Failed to reset pooled VNet {entry['id']}: {e}")
+
+    expired = time.time() - entry['created_at'] > max_age_seconds
+    with locked_pool_registry(registry_path) as registry:
+        pooled = next((e for e in registry['vnets'] if e['id'] == entry['id']), None)
+        keep = pooled is not None and snapshot is not None and not expired
+        if keep:
+            pooled.update({'state': 'idle', 'leased_by': None, 'snapshot': snapshot})
+        elif pooled is not None:
+            registry['vnets'].remove(pooled)
+
+    if keep:
+        print(f"\nReturned VNet {entry['id']} to the pool (reset to block {entry['fork_block']})")
+    else:
+        delete_virtual_testnet(entry['id'])
+        print(f"\nDeleted pooled VNet {entry['id']}{' (expired)' if expired else ''}")
+
+
+def print_vnet_pool(registry_path: Path, max_age_seconds: int):
+    """Print the pool entries of the current project."""
+    project = pool_project()
+    with locked_pool_registry(registry_path) as registry:
+        entries = [entry for entry in registry['vnets'] if entry['project'] == project]
+
+    print(f"\n{'='*60}")
+    print(f"VNet Pool ({project})")
+    print(f"{'='*60}")
+    print(f"Registry: {registry_path}")
+    if not entries:
+        print("No pooled VNets.")
+    now = time.time()
+    for entry in sorted(entries, key=lambda e: e['created_at']):
+        age = now - entry['created_at']
+        status = "🟢 idle" if entry['state'] == 'idle' else f"🟡 leased by pid {entry.get('leased_by')}"
+        expiry = " (expired)" if age > max_age_seconds else ""
+        print(f"  {entry['id']}  block {entry['fork_block']}  age {age / 3600:.1f}h{expiry}  {status}")
+    idle = sum(1 for entry in entries if entry['state'] == 'idle')
+    print(f"\nIdle: {idle}  Leased: {len(entries) - idle}")
+
+
+# ==============================================================================
+# Anvil Functions
+# ==============================================================================
+
+def start_anvil(
+    fork_url: Optional[str] = None,
+    port: int = DEFAULT_ANVIL_PORT,
+    fork_block: Optional[int] = None,
+    verbose: bool = True
+) -> Tuple[subprocess.Popen, str]:
+    """Start a local anvil node (forking fork_url if given) and wait until it answers.
+
+    Returns:
+        (process, rpc_url)
+    """
+    cmd = ['anvil', '--port', str(port), '--silent']
+    if fork_url:
+        cmd += ['--fork-url', fork_url]
+        if fork_block:
+            cmd += ['--fork-block-number', str(fork_block)]
+
+    if verbose:
+        source = "fork of $MAINNET_RPC_URL" if fork_url else "empty local chain"
+        print(f"Starting anvil on port {port} ({source})")
+        if fork_block:
+            print(f"  Fork Block: {fork_block}")
+
+    try:
+        process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    except FileNotFoundError:
+        raise RuntimeError("anvil not found. Install Foundry: https://book.getfoundry.sh/getting-started/installation")
+
+    rpc_url = f"http://127.0.0.1:{port}"
+    start_time = time.time()
+    while time.time() - start_time < ANVIL_STARTUP_TIMEOUT:
+        if process.poll() is not None:
+            raise RuntimeError(f"anvil exited with code {process.returncode}: {process.stderr.read().strip()}")
+        try:
+            rpc_request(rpc_url, "eth_chainId")
+            if verbose:
+                print(f"  ✅ anvil ready at {rpc_url}")
+            return process, rpc_url
+        except Exception:
+            time.sleep(0.5)
+
+    stop_anvil(process)
+    raise RuntimeError(f"anvil did not answer within {ANVIL_STARTUP_TIMEOUT}s")
+
+
+def stop_anvil(process: subprocess.Popen):
+    """Stop an anvil node started by start_anvil."""
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def impersonate_on_anvil(rpc_url: str, address: str, verbose: bool = True):
+    """Let eth_sendTransaction use address as sender, and fund it for gas."""
+    rpc_request(rpc_url, "anvil_impersonateAccount", [address])
+    rpc_request(rpc_url, "anvil_setBalance", [address, hex(SENDER_FUNDING_WEI)])
+    if verbose:
+        print(f"  Impersonating {address} (funded with {SENDER_FUNDING_WEI // 10**18} ETH)")
+
+
 # ==============================================================================
 # Simulation Functions
 # ==============================================================================
 
+def load_transaction_phases(args, project_root: Path) -> Optional[List[Dict]]:
+    """Load the --txns or --schedule/--execute/--then files into phases.
+
+    Returns:
+        [{'name', 'title', 'label', 'summary', 'transactions', 'sender', 'warp_after'}],
+        or None if a transaction file could not be found
+    """
+    def load_files(file_names: str, description: str) -> Optional[Tuple[List[Dict], Optional[str]]]:
+        # Handle comma-separated list of files
+        files = [f.strip() for f in file_names.split(',')]
+        all_transactions = []
+        file_safe = None
+
+        for i, file_name in enumerate(files):
+            file_path = resolve_file_path(project_root, file_name)
+            print(f"Loading {description} {i+1}/{len(files)}: {file_path}")
+
+            if not file_path.exists():
+                print(f"Error: File not found: {file_path}")
+                return None
+
+            transactions, current_safe = load_transactions_from_file(file_path)
+            if file_safe is None:
+                file_safe = current_safe
+            elif file_safe != current_safe and current_safe is not None:
+                print(f"Warning: File {file_path} has different safe address ({current_safe}) than previous files ({file_safe})")
+
+            all_transactions.extend(transactions)
+
+        return all_transactions, file_safe
+
+    def phase(name, title, label, summary, loaded, sender, warp_after=False) -> Dict:
+        return {
+            'name': name, 'title': title, 'label': label, 'summary': summary,
+            'transactions': loaded[0], 'sender': sender, 'warp_after': warp_after,
+        }
+
+    # Simple mode (--txns)
+    if args.txns:
+        loaded = load_files(args.txns, "file")
+        if loaded is None:
+            return None
+        safe = args.safe_address or loaded[1]
+        return [phase('simple', "SIMPLE MODE (No Timelock)", "Transaction", "Phase Summary", loaded, safe)]
+
+    # Timelock mode (--schedule + --execute, optional --then)
+    schedule = load_files(args.schedule, "schedule file")
+    if schedule is None:
+        return None
+    safe = args.safe_address or schedule[1]
+    execute = load_files(args.execute, "execute file")
+    if execute is None:
+        return None
+    phases = [
+        phase('schedule', "PHASE 1: SCHEDULE", "Schedule Transaction", "Schedule Phase Summary",
+              schedule, safe, warp_after=True),
+        phase('execute', "PHASE 2: EXECUTE", "Execute Transaction", "Execute Phase Summary", execute, safe),
+    ]
+    if args.then:
+        then = load_files(args.then, "follow-up file")
+        if then is None:
+            return None
+        phases.append(phase('follow-up', "PHASE 3: FOLLOW-UP", "Follow-up Transaction",
+                            "Follow-up Phase Summary", then, safe))
+    return phases
+
+
+def run_transaction_phases(
+    args,
+    phases: List[Dict],
+    rpc_url: str,
+    bundle_method: Optional[str] = None,
+    tx_link: Optional[str] = None,
+    prepare_sender: Optional[Callable[[str], None]] = None,
+    final_phase_runner: Optional[Callable[[str, str, List[Dict], str], Tuple[List[Dict], int]]] = None
+) -> Dict:
+    """Run loaded phases (see load_transaction_phases) against an RPC node.
+
+    Works on any node that accepts eth_sendTransaction from the sender
+    (Tenderly Admin RPC, or anvil with the sender impersonated).
+    prepare_sender(address) is called before a phase whose sender has not
+    been seen yet. final_phase_runner(rpc_url, sender, transactions, label),
+    if given, replaces run_phase for the --txns or --then phase.
+    The timelock delay is applied after the schedule phase.
+
+    Returns:
+        {'success', 'total_gas_used', 'phases': [{'name', 'results', 'gas_used'}]}
+    """
+    all_success = True
+    total_gas_used = 0
+    phase_outcomes = []
+    prepared = set()
+
+    for phase in phases:
+        print(f"\n{'='*40}")
+        print(phase['title'])
+        print(f"{'='*40}")
+
+        transactions = phase['transactions']
+        print(f"Transactions: {len(transactions)}")
+        if prepare_sender and phase['sender'] not in prepared:
+            prepare_sender(phase['sender'])
+            prepared.add(phase['sender'])
+
+        if final_phase_runner and phase['name'] in ('simple', 'follow-up'):
+            results, phase_gas_used = final_phase_runner(rpc_url, phase['sender'], transactions, phase['label'])
+        else:
+            results, phase_gas_used = run_phase(
+                rpc_url, phase['sender'], transactions, phase['label'],
+                bundle_method=bundle_method, bundle_size=args.bundle_size, tx_link=tx_link
+            )
+        if any(result.get('status') != 'success' for result in results):
+            all_success = False
+        total_gas_used += phase_gas_used
+        phase_outcomes.append({'name': phase['name'], 'results': results, 'gas_used': phase_gas_used})
+
+        print(f"\n📊 {phase['summary']}: {len(transactions)} transactions, {phase_gas_used:,} gas used")
+
+        if phase['warp_after']:
+            # Time Warp
+            delay_seconds = parse_delay(args.delay) if args.delay else 28800
+            print(f"\n{'='*40}")
+            print("TIME WARP")
+            print(f"{'='*40}")
+            warp_time_on_vnet(rpc_url, delay_seconds)
+
+    return {'success': all_success, 'total_gas_used': total_gas_used, 'phases': phase_outcomes}
+
+
+def print_simulation_summary(outcome: Dict, lines: List[str], cached: bool = False):
+    """Print the closing summary of a simulation run."""
+    print(f"\n{'='*60}")
+    print(f"SIMULATION COMPLETE{' (CACHED)' if cached else ''}")
+    print(f"{'='*60}")
+    for line in lines:
+        print(line)
+    print(f"Result: {'✅ SUCCESS' if outcome['success'] else '❌ FAILED'}")
+    print(f"Total Gas Used: {outcome['total_gas_used']:,}")
+
+
 def run_tenderly_simulation(args) -> int:
     """Run simulation using Tenderly Virtual Testnet."""
     project_root = get_project_root()
@@ -540,9 +1903,15 @@ def run_tenderly_simulation(args) -> int:
         print(f"Error: {e}")
         return 1
 
-    # Get or create Virtual Testnet
+    phases = load_transaction_phases(args, project_root)
+    if phases is None:
+        return 1
+
+    # Existing VNet, pooled VNet, or a new one (leased or created after the cache check)
     vnet_id = args.vnet_id
     vnet_data = None
+    fork_block = args.fork_block
+    pool_registry = Path(args.pool_registry) if args.pool else None
 
     if vnet_id:
         print(f"\nUsing existing VNet: {vnet_id}")
@@ -550,16 +1919,103 @@ def run_tenderly_simulation(args) -> int:
         if not vnet_data:
             print(f"Error: VNet not found: {vnet_id}")
             return 1
-    else:
+    elif pool_registry and fork_block is None:
+        # Check the cache against the block the lease will fork from
+        fork_block = newest_pooled_fork_block(pool_registry)
+
+    return simulate_on_tenderly(
+        args, phases, vnet_id, vnet_data, account_slug, project_slug,
+        fork_block=fork_block, pool_registry=pool_registry
+    )
+
+
+def simulate_on_tenderly(
+    args,
+    phases: List[Dict],
+    vnet_id: Optional[str],
+    vnet_data: Optional[Dict],
+    account_slug: str,
+    project_slug: str,
+    fork_block: Optional[int] = None,
+    pool_registry: Optional[Path] = None
+) -> int:
+    """Check the cache, then lease a pooled VNet (with pool_registry) or create
+    one if none was given, and run the phases on it.
+
+    A pooled VNet (reset to its base snapshot) starts from the same state as
+    a new fork at fork_block, so it shares cache entries with one. The lease
+    is taken after the cache check, so a cache hit leaves the pool alone.
+    """
+    fork_id = None
+    probe_rpc = None
+    probe_block = "latest"
+
+    if args.vnet_id and args.cache:
+        # An existing VNet is identified by its current head block
+        probe_rpc = get_admin_rpc_url(vnet_data)
+        head = rpc_request(probe_rpc, "eth_getBlockByNumber", ["latest", False])
+        fork_id = f"vnet:{vnet_id}:{head.get('hash') or head.get('number')}"
+    elif args.cache:
+        mainnet_rpc = os.environ.get('MAINNET_RPC_URL')
+        if fork_block is None and mainnet_rpc:
+            fork_block = int(rpc_request(mainnet_rpc, "eth_blockNumber"), 16)
+            print(f"\nCache: forking latest block {fork_block} (pin --fork-block to reuse results across runs)")
+        if fork_block is not None:
+            fork_id = f"fork:1:{fork_block}"
+            probe_rpc = mainnet_rpc
+            probe_block = hex(fork_block)
+
+    cache_key, cached = check_simulation_cache(args, 'tenderly', fork_id, phases, probe_rpc, probe_block)
+    if cached:
+        report_cached_simulation(phases, cached)
+        if args.gas_profile:
+            write_gas_profile(args.gas_profile, phases, cached, {'backend': 'tenderly', 'fork': fork_id, 'cached': True})
+        print_simulation_summary(cached, [f"Cache entry: {Path(args.cache_dir) / (cache_key + '.json')}"], cached=True)
+        return 0 if cached['success'] else 1
+
+    pool_entry = None
+    pool_max_age = parse_delay(args.pool_max_age)
+    if pool_registry and not vnet_id:
+        pool_entry = lease_pooled_vnet(pool_registry, pool_max_age, fork_block=fork_block)
+        if pool_entry:
+            vnet_id = pool_entry['id']
+            vnet_data = pooled_vnet_data(pool_entry)
+            print(f"\nLeased pooled VNet: {vnet_id} (fork block {pool_entry['fork_block']})")
+        else:
+            print("\nNo idle pooled VNet - creating a new one")
+
+    try:
+        return run_on_tenderly_vnet(
+            args, phases, vnet_id, vnet_data, account_slug, project_slug,
+            fork_block, fork_id, cache_key, pooled=pool_entry is not None
+        )
+    finally:
+        if pool_entry:
+            release_pooled_vnet(pool_registry, pool_entry, pool_max_age)
+
+
+def run_on_tenderly_vnet(
+    args,
+    phases: List[Dict],
+    vnet_id: Optional[str],
+    vnet_data: Optional[Dict],
+    account_slug: str,
+    project_slug: str,
+    fork_block: Optional[int],
+    fork_id: Optional[str],
+    cache_key: Optional[str],
+    pooled: bool = False
+) -> int:
+    """Create a VNet at fork_block if none was given, run the phases on it and cache the outcome."""
+    if not vnet_id:
         vnet_name = args.vnet_name or f"Simulation-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
         print("")
         try:
-            vnet_data = create_virtual_testnet(vnet_name)
+            vnet_data = create_virtual_testnet(vnet_name, block_number=fork_block)
             vnet_id = vnet_data.get('id')
         except Exception as e:
             print(f"Failed to create Virtual Testnet: {e}")
             return 1
-
     # Get Admin RPC URL
     try:
         admin_rpc = get_admin_rpc_url(vnet_data)
@@ -574,214 +2030,145 @@ def run_tenderly_simulation(args) -> int:
     safe_address = args.safe_address or os.environ.get('SAFE_ADDRESS', DEFAULT_SAFE_ADDRESS)
     print(f"Safe Address: {safe_address}")
 
-    all_success = True
-    total_gas_used = 0
-    
-    # Simple mode (--txns)
-    if args.txns:
-        print(f"\n{'='*40}")
-        print("SIMPLE MODE (No Timelock)")
-        print(f"{'='*40}")
+    bundle_method = args.bundle_method if args.bundle else None
+    if bundle_method == 'batch':
+        print(f"Bundle mode: JSON-RPC batches of {args.bundle_size} transactions")
+    elif bundle_method == 'simulate':
+        print(f"Bundle mode: tenderly_simulateBundle (state is not committed to the VNet)")
+    tx_link = f"https://dashboard.tenderly.co/{account_slug}/{project_slug}/testnet/{vnet_id}/tx"
 
-        # Handle comma-separated list of files
-        txn_files = [f.strip() for f in args.txns.split(',')]
-        all_transactions = []
-        file_safe = None
+    outcome = run_transaction_phases(
+        args, phases, admin_rpc, bundle_method=bundle_method, tx_link=tx_link
+    )
+    if cache_key:
+        store_cached_simulation(Path(args.cache_dir), cache_key, outcome, fork_id)
+    if args.gas_profile:
+        write_gas_profile(args.gas_profile, phases, outcome, {'backend': 'tenderly', 'fork': fork_id, 'vnet_id': vnet_id})
 
-        for i, txn_file in enumerate(txn_files):
-            file_path = resolve_file_path(project_root, txn_file)
-            print(f"Loading file {i+1}/{len(txn_files)}: {file_path}")
+    print_simulation_summary(outcome, [
+        f"VNet ID: {vnet_id}{' (pooled)' if pooled else ''}",
+        f"View in Tenderly: https://dashboard.tenderly.co/{account_slug}/{project_slug}/testnet/{vnet_id}",
+    ])
 
-            if not file_path.exists():
-                print(f"Error: File not found: {file_path}")
-                return 1
+    return 0 if outcome['success'] else 1
 
-            transactions, current_safe = load_transactions_from_file(file_path)
-            if file_safe is None:
-                file_safe = current_safe
-            elif file_safe != current_safe and current_safe is not None:
-                print(f"Warning: File {file_path} has different safe address ({current_safe}) than previous files ({file_safe})")
 
-            all_transactions.extend(transactions)
+def run_anvil_simulation(args) -> int:
+    """Run simulation on a local anvil node.
 
-        safe = args.safe_address or file_safe
-        transactions = all_transactions
-        print(f"Transactions: {len(transactions)}")
-        
-        phase_gas_used = 0
-        for i, tx in enumerate(transactions):
-            print(f"\n--- Transaction {i+1}/{len(transactions)} ---")
-            value = tx.get('value', '0')
-            if not str(value).startswith('0x'):
-                value = hex(int(value))
+    Connects to a running node with --anvil-rpc (e.g. one with the protocol
+    deployed from the repo's deploy scripts), or starts one forking
+    --rpc-url/$MAINNET_RPC_URL. The run is wrapped in evm_snapshot/evm_revert,
+    so a running node keeps the same warm state for the next plan variant.
+    """
+    project_root = get_project_root()
 
-            result = submit_tx_via_rpc(
-                admin_rpc,
-                safe,
-                tx['to'],
-                tx['data'],
-                value
-            )
-            if result.get('status') != 'success':
-                all_success = False
-                if result.get('tx_hash'):
-                    print(f"    🔗 Tx Link: https://dashboard.tenderly.co/{account_slug}/{project_slug}/testnet/{vnet_id}/tx/{result['tx_hash']}")
-            # Accumulate gas usage
-            if 'gas_used' in result:
-                phase_gas_used += result['gas_used']
-                total_gas_used += result['gas_used']
-
-        print(f"\n📊 Phase Summary: {len(transactions)} transactions, {phase_gas_used:,} gas used")
-    
-    # Timelock mode (--schedule + --execute)
-    elif args.schedule and args.execute:
-        # Phase 1: Schedule
-        print(f"\n{'='*40}")
-        print("PHASE 1: SCHEDULE")
-        print(f"{'='*40}")
-        
-        schedule_path = resolve_file_path(project_root, args.schedule)
-        print(f"Loading: {schedule_path}")
-        
-        if not schedule_path.exists():
-            print(f"Error: File not found: {schedule_path}")
-            return 1
-        
-        transactions, file_safe = load_transactions_from_file(schedule_path)
-        safe = args.safe_address or file_safe
-        print(f"Transactions: {len(transactions)}")
-        
-        phase_gas_used = 0
-        for i, tx in enumerate(transactions):
-            print(f"\n--- Schedule Transaction {i+1}/{len(transactions)} ---")
-            value = tx.get('value', '0')
-            if not str(value).startswith('0x'):
-                value = hex(int(value))
+    print("=" * 60)
+    print("ANVIL SIMULATION")
+    print("=" * 60)
+    print(f"Timestamp: {datetime.now().isoformat()}")
+    print("")
 
-            result = submit_tx_via_rpc(
-                admin_rpc,
-                safe,
-                tx['to'],
-                tx['data'],
-                value
-            )
-            if result.get('status') != 'success':
-                all_success = False
-                if result.get('tx_hash'):
-                    print(f"    🔗 Tx Link: https://dashboard.tenderly.co/{account_slug}/{project_slug}/testnet/{vnet_id}/tx/{result['tx_hash']}")
-            # Accumulate gas usage
-            if 'gas_used' in result:
-                phase_gas_used += result['gas_used']
-                total_gas_used += result['gas_used']
-
-        print(f"\n📊 Schedule Phase Summary: {len(transactions)} transactions, {phase_gas_used:,} gas used")
-
-        # Time Warp
-        delay_seconds = parse_delay(args.delay) if args.delay else 28800
-        print(f"\n{'='*40}")
-        print("TIME WARP")
-        print(f"{'='*40}")
-        warp_time_on_vnet(admin_rpc, delay_seconds)
-        
-        # Phase 2: Execute
-        print(f"\n{'='*40}")
-        print("PHASE 2: EXECUTE")
-        print(f"{'='*40}")
-        
-        execute_path = resolve_file_path(project_root, args.execute)
-        print(f"Loading: {execute_path}")
-        
-        if not execute_path.exists():
-            print(f"Error: File not found: {execute_path}")
+    phases = load_transaction_phases(args, project_root)
+    if phases is None:
+        return 1
+
+    # Identify the state the run starts from (also pins the fork block)
+    fork_url = None
+    fork_block = args.fork_block
+    fork_id = None
+    probe_rpc = None
+    probe_block = "latest"
+    if args.anvil_rpc:
+        print(f"Using running anvil: {args.anvil_rpc}")
+        if args.cache:
+            chain_id = int(rpc_request(args.anvil_rpc, "eth_chainId"), 16)
+            head = rpc_request(args.anvil_rpc, "eth_getBlockByNumber", ["latest", False])
+            fork_id = f"node:{chain_id}:{head.get('hash') or head.get('number')}"
+            probe_rpc = args.anvil_rpc
+    elif args.no_fork:
+        fork_id = "empty"
+    else:
+        fork_url = args.rpc_url or os.environ.get('MAINNET_RPC_URL')
+        if not fork_url:
+            print("Error: MAINNET_RPC_URL not set (use --no-fork for an empty local chain)")
+            return 1
+        if args.cache:
+            chain_id = int(rpc_request(fork_url, "eth_chainId"), 16)
+            if fork_block is None:
+                fork_block = int(rpc_request(fork_url, "eth_blockNumber"), 16)
+                print(f"Cache: forking latest block {fork_block} (pin --fork-block to reuse results across runs)")
+            fork_id = f"fork:{chain_id}:{fork_block}"
+            probe_rpc = fork_url
+            probe_block = hex(fork_block)
+
+    cache_key, cached = check_simulation_cache(args, 'anvil', fork_id, phases, probe_rpc, probe_block)
+    if cached:
+        report_cached_simulation(phases, cached)
+        if args.gas_profile:
+            write_gas_profile(args.gas_profile, phases, cached, {'backend': 'anvil', 'fork': fork_id, 'cached': True})
+        print_simulation_summary(cached, [f"Cache entry: {Path(args.cache_dir) / (cache_key + '.json')}"], cached=True)
+        return 0 if cached['success'] else 1
+
+    process = None
+    if args.anvil_rpc:
+        rpc_url = args.anvil_rpc
+    else:
+        try:
+            process, rpc_url = start_anvil(fork_url, port=args.anvil_port, fork_block=fork_block)
+        except RuntimeError as e:
+            print(f"Error: {e}")
             return 1
-        
-        transactions, _ = load_transactions_from_file(execute_path)
-        print(f"Transactions: {len(transactions)}")
-        
-        phase_gas_used = 0
-        for i, tx in enumerate(transactions):
-            print(f"\n--- Execute Transaction {i+1}/{len(transactions)} ---")
-            value = tx.get('value', '0')
-            if not str(value).startswith('0x'):
-                value = hex(int(value))
 
-            result = submit_tx_via_rpc(
-                admin_rpc,
-                safe,
-                tx['to'],
-                tx['data'],
-                value
-            )
-            if result.get('status') != 'success':
-                all_success = False
-                if result.get('tx_hash'):
-                    print(f"    🔗 Tx Link: https://dashboard.tenderly.co/{account_slug}/{project_slug}/testnet/{vnet_id}/tx/{result['tx_hash']}")
-            # Accumulate gas usage
-            if 'gas_used' in result:
-                phase_gas_used += result['gas_used']
-                total_gas_used += result['gas_used']
-
-        print(f"\n📊 Execute Phase Summary: {len(transactions)} transactions, {phase_gas_used:,} gas used")
-
-        # Phase 3: Follow-up (optional --then)
-        if args.then:
-            print(f"\n{'='*40}")
-            print("PHASE 3: FOLLOW-UP")
-            print(f"{'='*40}")
+    bundle_method = args.bundle_method if args.bundle else None
+    if bundle_method == 'batch':
+        print(f"Bundle mode: JSON-RPC batches of {args.bundle_size} transactions")
 
-            # Handle comma-separated list of then files
-            then_files = [f.strip() for f in args.then.split(',')]
-            all_then_transactions = []
-
-            for j, then_file in enumerate(then_files):
-                then_path = resolve_file_path(project_root, then_file)
-                print(f"Loading follow-up file {j+1}/{len(then_files)}: {then_path}")
-
-                if not then_path.exists():
-                    print(f"Error: File not found: {then_path}")
-                    return 1
-
-                then_transactions, _ = load_transactions_from_file(then_path)
-                all_then_transactions.extend(then_transactions)
-
-            transactions = all_then_transactions
-            print(f"Total follow-up transactions: {len(transactions)}")
-
-            phase_gas_used = 0
-            for i, tx in enumerate(transactions):
-                print(f"\n--- Follow-up Transaction {i+1}/{len(transactions)} ---")
-                value = tx.get('value', '0')
-                if not str(value).startswith('0x'):
-                    value = hex(int(value))
-
-                result = submit_tx_via_rpc(
-                    admin_rpc,
-                    safe,
-                    tx['to'],
-                    tx['data'],
-                    value
-                )
-                if result.get('status') != 'success':
-                    all_success = False
-                    if result.get('tx_hash'):
-                        print(f"    🔗 Tx Link: https://dashboard.tenderly.co/{account_slug}/{project_slug}/testnet/{vnet_id}/tx/{result['tx_hash']}")
-                # Accumulate gas usage
-                if 'gas_used' in result:
-                    phase_gas_used += result['gas_used']
-                    total_gas_used += result['gas_used']
-
-            print(f"\n📊 Follow-up Phase Summary: {len(transactions)} transactions, {phase_gas_used:,} gas used")
-
-    # Summary
-    print(f"\n{'='*60}")
-    print("SIMULATION COMPLETE")
-    print(f"{'='*60}")
-    print(f"VNet ID: {vnet_id}")
-    print(f"View in Tenderly: https://dashboard.tenderly.co/{account_slug}/{project_slug}/testnet/{vnet_id}")
-    print(f"Result: {'✅ SUCCESS' if all_success else '❌ FAILED'}")
-    print(f"Total Gas Used: {total_gas_used:,}")
+    snapshot_id = None
+    try:
+        # A started node is discarded after the run; only a running one needs reverting
+        if args.anvil_rpc and not args.keep_state:
+            snapshot_id = rpc_request(rpc_url, "evm_snapshot")
+            print(f"Snapshot: {snapshot_id}")
+
+        final_phase_runner = None
+        if args.shard_workers is not None:
+            workers = args.shard_workers if args.shard_workers > 0 else (os.cpu_count() or 1)
+            print(f"Sharded: up to {workers} anvil fork(s), shards by {args.shard_by}"
+                  f"{', final sequential pass' if args.final_pass else ''}")
+            final_phase_runner = lambda phase_rpc, sender, transactions, label: run_sharded_phase(
+                phase_rpc, sender, transactions, label, workers,
+                first_port=args.anvil_port + 1, shard_by=args.shard_by, final_pass=args.final_pass,
+                bundle_method=bundle_method, bundle_size=args.bundle_size
+            )
 
-    return 0 if all_success else 1
+        outcome = run_transaction_phases(
+            args, phases, rpc_url, bundle_method=bundle_method,
+            prepare_sender=lambda address: impersonate_on_anvil(rpc_url, address),
+            final_phase_runner=final_phase_runner
+        )
+    finally:
+        if snapshot_id is not None:
+            try:
+                rpc_request(rpc_url, "evm_revert", [snapshot_id])
+                print(f"\nReverted to snapshot {snapshot_id}")
+            except Exception as e:
+                print(f"\nWarning: Failed to revert to snapshot {snapshot_id}: {e}")
+        if process:
+            stop_anvil(process)
+
+    # Sharded results without a sequential pass can differ from a real ordering
+    if cache_key and (args.shard_workers is None or args.final_pass):
+        store_cached_simulation(Path(args.cache_dir), cache_key, outcome, fork_id)
+    if args.gas_profile:
+        write_gas_profile(args.gas_profile, phases, outcome, {
+            'backend': 'anvil', 'fork': fork_id,
+            'sharded': args.shard_workers is not None and not args.final_pass
+        })
+
+    print_simulation_summary(outcome, [f"Node: {rpc_url}{' (stopped)' if process else ''}"])
+
+    return 0 if outcome['success'] else 1
 
 
 def run_forge_simulation(args) -> int:
@@ -877,6 +2264,47 @@ Examples:
       --vnet-id "7113fe5d-bc69-475c-bfd5-a2a720c14d56" \\
       --schedule schedule.json \\
       --execute execute.json
+
+  # Tenderly bundle mode: each phase sent as JSON-RPC batches, receipts fetched in bulk
+  python simulate.py --tenderly --bundle \\
+      --schedule schedule.json \\
+      --execute execute.json \\
+      --then consolidation-txns-1.json,consolidation-txns-2.json
+
+  # Single-phase dry run through one tenderly_simulateBundle call (VNet state unchanged)
+  python simulate.py --tenderly --bundle --bundle-method simulate --txns consolidation.json
+
+  # Local anvil fork of $MAINNET_RPC_URL (started and stopped by the script)
+  python simulate.py --anvil --schedule schedule.json --execute execute.json --delay 8h
+
+  # Plan variants against one running anvil (state is reverted after each run)
+  anvil --fork-url $MAINNET_RPC_URL &
+  python simulate.py --anvil --anvil-rpc http://127.0.0.1:8545 --txns consolidation-a.json
+  python simulate.py --anvil --anvil-rpc http://127.0.0.1:8545 --txns consolidation-b.json
+
+  # Hundreds of consolidations on 8 parallel anvil forks, then one sequential check
+  python simulate.py --anvil --bundle --shard-workers 8 --final-pass \\
+      --schedule link-schedule.json --execute link-execute.json \\
+      --then consolidation-txns-1.json,consolidation-txns-2.json
+
+  # Review loop: unchanged plans at a pinned block return stored results instantly
+  python simulate.py --anvil --cache --fork-block 21500000 \\
+      --schedule link-schedule.json --execute link-execute.json --then consolidation.json
+  python simulate.py --anvil --cache --cache-probe --fork-block 21500000 \\
+      --schedule link-schedule.json --execute link-execute.json --then consolidation.json
+
+  # Warm VNet pool: fill once (e.g. from cron), then lease per review
+  python simulate.py --tenderly --pool-fill 3
+  python simulate.py --tenderly --pool --txns consolidation.json
+  python simulate.py --tenderly --pool-status
+
+  # Gas per consolidation request, to size batches from data
+  python simulate.py --anvil --txns consolidation.json --gas-profile reports/consolidation-gas
+
+  # No network (CI): deploy the protocol to a local anvil first, then simulate against it
+  anvil &
+  forge script <deploy script> --rpc-url http://127.0.0.1:8545 --broadcast --unlocked --sender <deployer>
+  python simulate.py --anvil --anvil-rpc http://127.0.0.1:8545 --safe-address <admin> --txns txns.json
         """
     )
     
@@ -886,6 +2314,11 @@ Examples:
         action='store_true',
         help='Use Tenderly Virtual Testnet instead of Forge fork'
     )
+    parser.add_argument(
+        '--anvil',
+        action='store_true',
+        help='Use a local anvil node (impersonation, snapshot/revert) instead of Forge or Tenderly'
+    )
     parser.add_argument(
         '--list-vnets',
         action='store_true',
@@ -902,6 +2335,129 @@ Examples:
         help='Display name for new Tenderly VNet'
     )
     
+    # Warm VNet pool
+    parser.add_argument(
+        '--pool',
+        action='store_true',
+        help='Lease a pre-created VNet from the pool (reset to its fork block afterwards); '
+             'creates one if none is idle'
+    )
+    parser.add_argument(
+        '--pool-fill',
+        type=int,
+        metavar='N',
+        help='Evict expired pooled VNets, create VNets until the pool has N, and exit'
+    )
+    parser.add_argument(
+        '--pool-status',
+        action='store_true',
+        help='List pooled VNets and exit'
+    )
+    parser.add_argument(
+        '--pool-drain',
+        action='store_true',
+        help='Delete all idle pooled VNets and exit'
+    )
+    parser.add_argument(
+        '--pool-max-age',
+        default=DEFAULT_POOL_MAX_AGE,
+        help=f'Delete pooled VNets older than this (e.g. 6h, 1d). Default: {DEFAULT_POOL_MAX_AGE}'
+    )
+    parser.add_argument(
+        '--pool-registry',
+        default=str(DEFAULT_POOL_REGISTRY),
+        help=f'Pool registry file. Default: {DEFAULT_POOL_REGISTRY}'
+    )
+    parser.add_argument(
+        '--bundle',
+        action='store_true',
+        help='Send each phase as a bundle instead of one transaction at a time (Tenderly or anvil)'
+    )
+    parser.add_argument(
+        '--bundle-method',
+        choices=['batch', 'simulate'],
+        default='batch',
+        help='batch: JSON-RPC batches of eth_sendTransaction (state persists); '
+             'simulate: one tenderly_simulateBundle call (--txns only, state not committed). Default: batch'
+    )
+    parser.add_argument(
+        '--bundle-size',
+        type=int,
+        default=DEFAULT_BUNDLE_SIZE,
+        help=f'Transactions per JSON-RPC batch with --bundle-method batch. Default: {DEFAULT_BUNDLE_SIZE}'
+    )
+    
+    # Anvil-specific options
+    parser.add_argument(
+        '--anvil-rpc',
+        help='RPC URL of a running anvil node. Default: start one on --anvil-port'
+    )
+    parser.add_argument(
+        '--anvil-port',
+        type=int,
+        default=DEFAULT_ANVIL_PORT,
+        help=f'Port for a started anvil node. Default: {DEFAULT_ANVIL_PORT}'
+    )
+    parser.add_argument(
+        '--fork-block',
+        type=int,
+        help='Fork block for a started anvil node or a new Tenderly VNet. Default: latest'
+    )
+    parser.add_argument(
+        '--no-fork',
+        action='store_true',
+        help='Start anvil as an empty local chain instead of forking'
+    )
+    parser.add_argument(
+        '--shard-workers',
+        type=int,
+        help='Simulate the --txns/--then consolidations as independent shards on this many '
+             'parallel anvil forks (0 = one per core). Requires --anvil'
+    )
+    parser.add_argument(
+        '--shard-by',
+        choices=['pod', 'pubkey'],
+        default='pod',
+        help='Keep consolidations of the same EigenPod (EtherFi node) or only of the same '
+             'pubkeys in one shard. Default: pod'
+    )
+    parser.add_argument(
+        '--final-pass',
+        action='store_true',
+        help='After sharding, run the phase sequentially once more to catch ordering effects '
+             '(consolidation fee queue)'
+    )
+    parser.add_argument(
+        '--keep-state',
+        action='store_true',
+        help='Do not revert a running anvil node (--anvil-rpc) to its pre-run snapshot'
+    )
+    
+    # Result cache
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='Reuse stored successful results for an identical run (same transactions, sender, delay, bundle/shard mode and fork state)'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        default=str(DEFAULT_CACHE_DIR),
+        help=f'Result cache directory. Default: {DEFAULT_CACHE_DIR}'
+    )
+    parser.add_argument(
+        '--cache-probe',
+        action='store_true',
+        help='On a cache hit, re-check the cheapest first-phase transaction against the fork first'
+    )
+    
+    # Gas profiling
+    parser.add_argument(
+        '--gas-profile',
+        metavar='PREFIX',
+        help='Write per-transaction gas with decoded batch sizes to PREFIX.csv and PREFIX.json, '
+             'with a base + per-item gas fit'
+    )
+    
     # Transaction files
     parser.add_argument(
         '--txns', '-t',
@@ -949,6 +2505,21 @@ Examples:
             print(f"Error listing Virtual Testnets: {e}")
             return 1
     
+    # Handle pool management
+    if args.pool_fill is not None or args.pool_status or args.pool_drain:
+        pool_registry = Path(args.pool_registry)
+        pool_max_age = parse_delay(args.pool_max_age)
+        try:
+            if args.pool_drain:
+                print(f"Deleted {evict_vnet_pool(pool_registry, pool_max_age, drain=True)} pooled VNet(s)")
+            if args.pool_fill is not None:
+                fill_vnet_pool(pool_registry, args.pool_fill, pool_max_age, fork_block=args.fork_block)
+            print_vnet_pool(pool_registry, pool_max_age)
+            return 0
+        except Exception as e:
+            print(f"Error managing VNet pool: {e}")
+            return 1
+    
     # Validate arguments
     if args.txns and (args.schedule or args.execute):
         parser.error("Cannot use --txns with --schedule/--execute")
@@ -962,10 +2533,60 @@ Examples:
     if args.txns and args.then:
         parser.error("--then cannot be used with --txns. Use --schedule/--execute for multi-phase workflows")
     
+    if args.tenderly and args.anvil:
+        parser.error("Choose one of --tenderly and --anvil")
+    
+    if args.bundle and not (args.tenderly or args.anvil):
+        parser.error("--bundle requires --tenderly or --anvil")
+    
+    if args.bundle and args.bundle_method == 'simulate' and not args.tenderly:
+        parser.error("--bundle-method simulate requires --tenderly")
+    
+    if args.bundle and args.bundle_method == 'simulate' and not args.txns:
+        parser.error("--bundle-method simulate does not commit state, so it only supports --txns")
+    
+    if args.shard_workers is not None and not args.anvil:
+        parser.error("--shard-workers requires --anvil")
+    
+    if args.shard_workers is not None and args.shard_workers < 0:
+        parser.error("--shard-workers must be 0 (one per core) or a positive integer")
+    
+    if args.final_pass and args.shard_workers is None:
+        parser.error("--final-pass requires --shard-workers")
+    
+    if args.anvil_rpc and (args.fork_block or args.no_fork):
+        parser.error("--fork-block and --no-fork apply to a started anvil, not --anvil-rpc")
+    
+    if args.vnet_id and args.fork_block:
+        parser.error("--fork-block applies to a new VNet, not --vnet-id")
+    
+    if args.pool and (not args.tenderly or args.vnet_id):
+        parser.error("--pool requires --tenderly and cannot be used with --vnet-id")
+    
+    if args.no_fork and not args.anvil:
+        parser.error("--no-fork requires --anvil")
+    
+    if args.fork_block and not (args.anvil or args.tenderly):
+        parser.error("--fork-block requires --anvil or --tenderly")
+    
+    if args.cache and not (args.anvil or args.tenderly):
+        parser.error("--cache requires --anvil or --tenderly")
+    
+    if args.gas_profile and not (args.anvil or args.tenderly):
+        parser.error("--gas-profile requires --anvil or --tenderly")
+    
+    if args.cache_probe and not args.cache:
+        parser.error("--cache-probe requires --cache")
+    
+    if args.bundle_size < 1:
+        parser.error("--bundle-size must be at least 1")
+    
     # Run simulation
     try:
         if args.tenderly:
             return run_tenderly_simulation(args)
+        elif args.anvil:
+            return run_anvil_simulation(args)
         else:
             return run_forge_simulation(args)
     except Exception as e:
@@ -12,6 +12,11 @@ Usage:
         --json validators.json \
         --vnet-id "existing-vnet-id"
 
+    # Or lease a warm VNet from the pool (see simulate.py --pool-fill)
+    python3 script/operations/utils/simulate_batch_approve.py \
+        --json validators.json \
+        --pool
+
 JSON Format:
     [
       {"validator_id": 31225, "pubkey": "0xb4d601...", "eigenpod": "0x9ad4d1..."},
@@ -73,6 +78,14 @@ ETHERFI_ADMIN = "0x0EF8fa4760Db8f5Cd4d993f3e3416f30f942D705"
 TENDERLY_API_BASE = "https://api.tenderly.co/api/v1"
 
 
+def get_tenderly_api_base() -> str:
+    """Tenderly API base URL (from TENDERLY_API_URL when set, e.g. tenderly_standin.py)."""
+    import re
+    
+    match = re.match(r'(.+?)/account/', os.environ.get('TENDERLY_API_URL', ''))
+    return match.group(1) if match else TENDERLY_API_BASE
+
+
 def get_tenderly_credentials() -> Tuple[str, str, str]:
     """Get Tenderly credentials from environment."""
     import re
@@ -104,7 +117,7 @@ def tenderly_request(method: str, endpoint: str, data: Optional[Dict] = None) ->
     """Make a request to Tenderly API."""
     access_token, _, _ = get_tenderly_credentials()
     
-    url = f"{TENDERLY_API_BASE}{endpoint}"
+    url = f"{get_tenderly_api_base()}{endpoint}"
     headers = {
         'Accept': 'application/json',
         'Content-Type': 'application/json',
@@ -293,6 +306,8 @@ def main():
     parser.add_argument('--json', '-j', required=True, help='JSON file with validator data')
     parser.add_argument('--vnet-id', help='Use existing VNet by ID')
     parser.add_argument('--vnet-name', default='BatchApprove-Sim', help='Name for new VNet')
+    parser.add_argument('--pool', action='store_true',
+                        help='Lease a warm VNet from the simulate.py pool (reset afterwards)')
     parser.add_argument('--analyze-only', action='store_true', help='Only analyze node distribution')
     
     args = parser.parse_args()
@@ -322,16 +337,39 @@ def main():
     print(f"  Last: {validator_ids[-1]}")
     print("")
     
-    # Get or create VNet
+    # Get, lease or create VNet
+    pool_entry = None
     if args.vnet_id:
         print(f"Using existing VNet: {args.vnet_id}")
         vnet_data = get_vnet_by_id(args.vnet_id)
         if not vnet_data:
             print(f"Error: VNet not found: {args.vnet_id}")
             sys.exit(1)
+    elif args.pool:
+        from simulate import (
+            DEFAULT_POOL_MAX_AGE, DEFAULT_POOL_REGISTRY,
+            lease_pooled_vnet, parse_delay, pooled_vnet_data, release_pooled_vnet,
+        )
+        pool_max_age = parse_delay(DEFAULT_POOL_MAX_AGE)
+        pool_entry = lease_pooled_vnet(DEFAULT_POOL_REGISTRY, pool_max_age)
+        if pool_entry:
+            print(f"Leased pooled VNet: {pool_entry['id']} (fork block {pool_entry['fork_block']})")
+            vnet_data = pooled_vnet_data(pool_entry)
+        else:
+            print("No idle pooled VNet - creating a new one")
+            vnet_data = create_virtual_testnet(args.vnet_name)
     else:
         vnet_data = create_virtual_testnet(args.vnet_name)
     
+    try:
+        return simulate_on_vnet(args, vnet_data, validator_ids, pubkeys)
+    finally:
+        if pool_entry:
+            release_pooled_vnet(DEFAULT_POOL_REGISTRY, pool_entry, pool_max_age)
+
+
+def simulate_on_vnet(args, vnet_data: Dict, validator_ids: List[int], pubkeys: List[bytes]) -> int:
+    """Analyze node distribution and simulate batchApproveRegistration on a VNet."""
     admin_rpc = get_admin_rpc_url(vnet_data)
     print(f"Admin RPC: {admin_rpc}")
     print("")
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+sweep_daemon.py - Long-running withdrawal sweep state with a local query API
+
+Follows head once per slot, keeps next_withdrawal_validator_index and the
+withdrawable pending partial withdrawals current, and re-simulates the sweep
+(see validator_utils.simulate_sweep) whenever either moves, so the sweep position of every validator - ours included, indexed
+from the etherfi_validators snapshot - is precomputed. Planners pointed at
+it with SWEEP_DAEMON_URL skip their own beacon fetches: fetch_beacon_state()
+and calculate_sweep_times() ask the daemon first.
+
+The registry is refreshed every --registry-refresh (bulk fetch from
+BEACON_NODE_URL, or a fixed --validator-registry snapshot) and our
+validators every --db-refresh. Without numpy-loadable registry data the
+daemon serves the linear estimate instead.
+
+Usage:
+    python3 sweep_daemon.py                                   # http://127.0.0.1:8547
+    python3 sweep_daemon.py --unix-socket /tmp/etherfi-sweep.sock
+
+    export SWEEP_DAEMON_URL=http://127.0.0.1:8547             # or unix:///tmp/etherfi-sweep.sock
+    python3 ../consolidations/query_validators_consolidation.py --operator "Validation Cloud" --count 50
+
+Endpoints:
+    GET  /health
+    GET  /state                          sweep index, slot, validator count, method, last update
+    GET  /due?hours=N[&operator=<name or 0x..>][&limit=N]
+                                         our validators swept within the next N hours, soonest first
+    POST /sweep  {"indices": [...]}      sweep info for any validator indices
+
+Environment Variables:
+    VALIDATOR_DB: PostgreSQL connection string for validator database
+    BEACON_NODE_URL: Beacon node for the registry bulk fetch and pending partial withdrawals
+    BEACON_CHAIN_URL: Beacon API for the head block (see fetch_next_withdrawal_index)
+"""
+
+import argparse
+import json
+import math
+import os
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from validator_utils import (
+    MAINNET_GENESIS_TIME,
+    SECONDS_PER_SLOT,
+    SWEEP_DAEMON_ENV,
+    VALIDATORS_PER_SLOT,
+    fetch_next_withdrawal_index,
+    fetch_validator_count,
+    get_db_connection,
+    load_operators_from_db,
+    load_validator_registry,
+    fetch_pending_partials,
+    simulate_sweep,
+    sweep_eligible,
+    np,
+)
+
+DEFAULT_PORT = 8547
+DEFAULT_REGISTRY_REFRESH = 6 * 3600
+DEFAULT_DB_REFRESH = 600
+
+OUR_VALIDATORS_QUERY = '''
+    SELECT index, pubkey, operator, node_address, status
+    FROM "etherfi_validators"
+    WHERE timestamp = (SELECT MAX(timestamp) FROM "etherfi_validators")
+      AND index IS NOT NULL
+    ORDER BY index
+'''
+
+
+# =============================================================================
+# Sweep State
+# =============================================================================
+
+class SweepState:
+    """Head sweep position plus the precomputed sweep slot of every indexed validator."""
+
+    def __init__(self, validator_registry: Optional[str], registry_refresh: int, db_refresh: int):
+        self.lock = threading.Lock()
+        self.validator_registry = validator_registry
+        self.registry_refresh = registry_refresh
+        self.db_refresh = db_refresh
+
+        self.registry = None
+        self.registry_loaded_at = 0.0
+        self.validator_count = None
+        self.ours = None
+        self.ours_loaded_at = 0.0
+        self.operator_names = {}  # lowercase name -> address, for /due?operator=<name>
+
+        self.sweep_index = None
+        self.slot = None
+        self.pending_partials = 0  # served ahead of the validator scan
+        self.as_of = None
+        self.cursors = None       # simulated sweep position after each slot (None = linear)
+        self.offsets = None       # eligible positions counted from sweep_index
+        self.n = None
+        self.due_slots = None     # our validators' slots until sweep, ascending
+        self.due_order = None     # positions into self.ours matching due_slots
+
+    # -------------------------------------------------------------------------
+    # Refresh
+    # -------------------------------------------------------------------------
+
+    def refresh_registry(self) -> bool:
+        """Reload the registry (or, in linear mode, the validator count) every registry_refresh seconds.
+
+        Returns True only when the registry or the count changed.
+        """
+        if self.registry_loaded_at and time.time() - self.registry_loaded_at < self.registry_refresh:
+            return False
+        if self.registry is not None and self.validator_registry:
+            return False  # a fixed snapshot never changes
+        registry = load_validator_registry(self.validator_registry, max_age=self.registry_refresh)
+        count = len(registry['balance']) if registry is not None else fetch_validator_count()
+        if registry is None or self.registry is None:
+            changed = registry is not self.registry
+        else:
+            changed = any(not np.array_equal(registry[k], self.registry[k]) for k in registry)
+        changed = changed or count != self.validator_count
+        with self.lock:
+            self.registry, self.validator_count = registry, count
+            self.registry_loaded_at = time.time()
+        if changed:
+            print(f"Registry: {count:,} validators ({'simulated sweep' if registry is not None else 'linear estimate'})")
+        return changed
+
+    def refresh_ours(self) -> bool:
+        if self.ours is not None and time.time() - self.ours_loaded_at < self.db_refresh:
+            return False
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(OUR_VALIDATORS_QUERY)
+                rows = cur.fetchall()
+            _, operator_names = load_operators_from_db(conn)
+        finally:
+            conn.close()
+        ours = {
+            'index': np.asarray([int(r[0]) for r in rows], dtype=np.int64),
+            'pubkey': [r[1] for r in rows],
+            'operator': [(r[2] or '').lower() for r in rows],
+            'node_address': [r[3] for r in rows],
+            'status': [r[4] for r in rows],
+        }
+        with self.lock:
+            self.ours, self.operator_names = ours, operator_names
+            self.ours_loaded_at = time.time()
+        print(f"Loaded {len(rows):,} of our validators")
+        return True
+
+    def refresh_head(self) -> bool:
+        head = fetch_next_withdrawal_index()
+        if not head:
+            return False
+        pending_partials = fetch_pending_partials() if self.registry is not None else 0
+        changed = head['currentSweepIndex'] != self.sweep_index or pending_partials != self.pending_partials
+        with self.lock:
+            self.sweep_index = head['currentSweepIndex']
+            self.slot = head.get('currentSlot')
+            self.pending_partials = pending_partials
+        return changed
+
+    def tick(self):
+        """One follow step: refresh what is due and recompute if anything moved."""
+        changed = self.refresh_registry()
+        changed = self.refresh_ours() or changed
+        changed = self.refresh_head() or changed
+        if changed and self.sweep_index is not None:
+            self.recompute()
+
+    def recompute(self):
+        started = time.time()
+        registry, ours = self.registry, self.ours
+        n = len(registry['balance']) if registry is not None else self.validator_count
+        sweep_index = self.sweep_index % n
+        cursors, offsets = (simulate_sweep(sweep_eligible(registry), sweep_index, self.pending_partials)
+                            if registry is not None else (None, None))
+        with self.lock:
+            self.n, self.cursors, self.offsets = n, cursors, offsets
+            self.as_of = time.time()
+            slots = self.slots_for(ours['index'])
+            self.due_order = np.argsort(slots, kind='stable')
+            self.due_slots = slots[self.due_order]
+        print(f"Slot {self.slot}: sweep index {self.sweep_index:,}, "
+              f"{len(ours['index']):,} validators re-indexed in {time.time() - started:.2f}s")
+
+    # -------------------------------------------------------------------------
+    # Queries (callers hold self.lock)
+    # -------------------------------------------------------------------------
+
+    def slots_for(self, indices):
+        """Slots until the sweep reaches each validator index (1 = the next slot)."""
+        targets = (np.minimum(indices, self.n - 1) - self.sweep_index) % self.n
+        if self.cursors is None:
+            return np.ceil(targets / VALIDATORS_PER_SLOT).astype(np.int64)
+        return np.searchsorted(self.cursors, targets, side='right') + 1
+
+    def positions_for(self, indices):
+        """Validators ahead in the sweep: eligible ones if simulated, all of them if linear."""
+        targets = (np.minimum(indices, self.n - 1) - self.sweep_index) % self.n
+        return targets if self.offsets is None else np.searchsorted(self.offsets, targets)
+
+    def state(self) -> Dict:
+        return {
+            'next_withdrawal_validator_index': self.sweep_index,
+            'validator_count': self.validator_count,
+            'slot': self.slot,
+            'asOf': self.as_of,
+            'method': 'simulated' if self.cursors is not None else 'linear',
+            'registrySize': self.n,
+            'pendingPartials': self.pending_partials,
+            'ourValidators': len(self.ours['index']) if self.ours is not None else 0,
+        }
+
+    def sweep(self, indices: List[int]) -> List[Dict]:
+        indices = np.asarray(indices, dtype=np.int64)
+        slots, positions = self.slots_for(indices), self.positions_for(indices)
+        return [
+            {'positionInQueue': int(p), 'slotsUntilSweep': int(s), 'secondsUntilSweep': int(s) * SECONDS_PER_SLOT}
+            for s, p in zip(slots, positions)
+        ]
+
+    def due(self, hours: float, operator: Optional[str], limit: Optional[int]) -> List[Dict]:
+        if operator:
+            operator = self.operator_names.get(operator.lower(), operator.lower())
+        cutoff = int(hours * 3600 // SECONDS_PER_SLOT)
+        end = int(np.searchsorted(self.due_slots, cutoff, side='right'))
+        result = []
+        for slot, i in zip(self.due_slots[:end], self.due_order[:end]):
+            if operator and self.ours['operator'][i] != operator:
+                continue
+            result.append({
+                'index': int(self.ours['index'][i]),
+                'pubkey': self.ours['pubkey'][i],
+                'operator': self.ours['operator'][i],
+                'node_address': self.ours['node_address'][i],
+                'status': self.ours['status'][i],
+                'slotsUntilSweep': int(slot),
+                'secondsUntilSweep': int(slot) * SECONDS_PER_SLOT,
+            })
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+
+def follow(state: SweepState, stop: threading.Event):
+    """Tick shortly after every slot boundary until stopped."""
+    while not stop.is_set():
+        try:
+            state.tick()
+        except Exception as e:
+            print(f"Warning: sweep refresh failed: {e}")
+        into_slot = (time.time() - MAINNET_GENESIS_TIME) % SECONDS_PER_SLOT
+        stop.wait(SECONDS_PER_SLOT - into_slot + 1)
+
+
+# =============================================================================
+# HTTP API
+# =============================================================================
+
+def make_handler(state: SweepState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status: int, body: Any = None):
+            payload = json.dumps(body).encode() if body is not None else b''
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def read_json(self) -> Any:
+            length = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(length) or b'null')
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            if url.path == '/health':
+                return self.send_json(200, {'ok': state.as_of is not None, 'asOf': state.as_of})
+            with state.lock:
+                if state.as_of is None:
+                    return self.send_json(503, {'error': {'message': 'sweep state not computed yet'}})
+                if url.path == '/state':
+                    return self.send_json(200, state.state())
+                if url.path == '/due':
+                    try:
+                        hours = float(query.get('hours', 24))
+                        limit = int(query['limit']) if 'limit' in query else None
+                    except ValueError:
+                        return self.send_json(400, {'error': {'message': 'hours and limit must be numbers'}})
+                    if not math.isfinite(hours) or hours < 0:
+                        return self.send_json(400, {'error': {'message': 'hours must be a finite number >= 0'}})
+                    if limit is not None and limit <= 0:
+                        return self.send_json(400, {'error': {'message': 'limit must be a positive integer'}})
+                    validators = state.due(hours, query.get('operator'), limit)
+                    return self.send_json(200, {'asOf': state.as_of, 'hours': hours, 'validators': validators})
+            self.send_json(404, {'error': {'message': 'not found'}})
+
+        def do_POST(self):
+            if urlparse(self.path).path != '/sweep':
+                return self.send_json(404, {'error': {'message': 'not found'}})
+            try:
+                indices = [int(i) for i in (self.read_json() or {}).get('indices', [])]
+            except (ValueError, TypeError, AttributeError):
+                return self.send_json(400, {'error': {'message': 'expected {"indices": [int, ...]}'}})
+            with state.lock:
+                if state.as_of is None:
+                    return self.send_json(503, {'error': {'message': 'sweep state not computed yet'}})
+                return self.send_json(200, {'asOf': state.as_of, 'sweep': state.sweep(indices)})
+
+    return Handler
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(state: SweepState, port: int = DEFAULT_PORT, host: str = '127.0.0.1',
+          unix_socket: Optional[str] = None):
+    """Start the query API on a background thread."""
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        server = ThreadingUnixHTTPServer(unix_socket, make_handler(state))
+    else:
+        server = ThreadingHTTPServer((host, port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Withdrawal sweep state daemon with a local query API',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python3 sweep_daemon.py
+  python3 sweep_daemon.py --unix-socket /tmp/etherfi-sweep.sock
+  python3 sweep_daemon.py --validator-registry registry.npz --db-refresh 300
+  curl 'http://127.0.0.1:8547/due?hours=6&operator=0xabc...'
+        """
+    )
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--unix-socket', help='Serve on this Unix socket instead of TCP')
+    parser.add_argument('--validator-registry',
+                        help='Fixed registry snapshot (.json beacon API response or .npz) instead of bulk fetches')
+    parser.add_argument('--registry-refresh', type=int, default=DEFAULT_REGISTRY_REFRESH,
+                        help=f'Seconds between registry refreshes (default: {DEFAULT_REGISTRY_REFRESH})')
+    parser.add_argument('--db-refresh', type=int, default=DEFAULT_DB_REFRESH,
+                        help=f'Seconds between reloads of our validators (default: {DEFAULT_DB_REFRESH})')
+    args = parser.parse_args()
+
+    if np is None:
+        print("Error: numpy not installed. Run: pip install numpy")
+        return 1
+    # The daemon is the source the planners' SWEEP_DAEMON_URL points at; never query itself
+    os.environ.pop(SWEEP_DAEMON_ENV, None)
+
+    state = SweepState(args.validator_registry, args.registry_refresh, args.db_refresh)
+    server = serve(state, args.port, args.host, args.unix_socket)
+    where = f"unix://{args.unix_socket}" if args.unix_socket else f"http://{args.host}:{server.server_address[1]}"
+    print(f"Sweep daemon listening on {where}")
+    print(f"  {SWEEP_DAEMON_ENV}={where}")
+
+    stop = threading.Event()
+    try:
+        follow(state, stop)
+    except KeyboardInterrupt:
+        stop.set()
+        server.shutdown()
+    finally:
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.unlink(args.unix_socket)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
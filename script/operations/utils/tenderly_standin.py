@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+tenderly_standin.py - Local stand-in for the Tenderly Virtual TestNet API
+
+Serves the part of the Tenderly REST API (list/create/get/delete VNets) and
+of the VNet Admin RPC that simulate.py and simulate_batch_approve.py use,
+backed by in-memory chains. It does not execute EVM code: every transaction
+succeeds with its intrinsic gas unless its selector is listed in
+--revert-selector. This is enough to exercise the VNet pool, bundle mode and
+the phase/receipt handling without the service.
+
+Usage:
+    python3 tenderly_standin.py --port 8799
+
+    export TENDERLY_API_URL=http://127.0.0.1:8799/api/v1/account/local/project/sim/
+    export TENDERLY_API_ACCESS_TOKEN=local
+    python3 simulate.py --tenderly --pool-fill 2
+    python3 simulate.py --tenderly --pool --txns consolidation.json
+    python3 simulate.py --tenderly --pool-status
+
+Supported RPC methods:
+    eth_chainId, eth_blockNumber, eth_getBlockByNumber, eth_getBalance,
+    eth_call, eth_estimateGas, eth_sendTransaction, eth_getTransactionReceipt,
+    evm_snapshot, evm_revert, evm_setNextBlockTimestamp, evm_increaseTime,
+    evm_mine, tenderly_setBalance, tenderly_simulateBundle
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+DEFAULT_PORT = 8799
+DEFAULT_FORK_BLOCK = 21_000_000
+BLOCK_TIME = 12
+
+VNETS_PATH = re.compile(r'^/api/v1/account/([^/]+)/project/([^/]+)/vnets/?$')
+VNET_PATH = re.compile(r'^/api/v1/account/([^/]+)/project/([^/]+)/vnets/([^/]+)/?$')
+RPC_PATH = re.compile(r'^/rpc/([^/]+)/?$')
+
+
+# =============================================================================
+# In-memory Chain
+# =============================================================================
+
+def intrinsic_gas(data: str) -> int:
+    """Intrinsic gas of a call: 21000 + 16 per non-zero and 4 per zero calldata byte."""
+    payload = bytes.fromhex((data or '0x')[2:])
+    zero = payload.count(0)
+    return 21000 + 16 * (len(payload) - zero) + 4 * zero
+
+
+class Chain:
+    """State of one VNet: head block, timestamp, receipts, balances and snapshots."""
+
+    def __init__(self, chain_id: int, fork_block: int, revert_selectors: List[str], consume_snapshots: bool = False):
+        self.chain_id = chain_id
+        self.block = fork_block
+        self.timestamp = int(time.time())
+        self.next_timestamp = None
+        self.receipts = {}
+        self.balances = {}
+        self.nonce = 0
+        self.snapshots = {}
+        self.revert_selectors = revert_selectors
+        self.consume_snapshots = consume_snapshots
+
+    def reverts(self, data: str) -> bool:
+        return (data or '0x')[2:10].lower() in self.revert_selectors
+
+    def block_hash(self, number: int) -> str:
+        return '0x' + hashlib.sha256(f"{id(self)}:{number}:{self.timestamp}".encode()).hexdigest()
+
+    def mine(self):
+        self.block += 1
+        if self.next_timestamp is not None:
+            self.timestamp = self.next_timestamp
+            self.next_timestamp = None
+        else:
+            self.timestamp += BLOCK_TIME
+
+    def send(self, tx: Dict) -> str:
+        self.nonce += 1
+        self.mine()
+        tx_hash = '0x' + hashlib.sha256(f"{id(self)}:{self.nonce}".encode()).hexdigest()
+        self.receipts[tx_hash] = {
+            'transactionHash': tx_hash,
+            'blockNumber': hex(self.block),
+            'from': tx.get('from'),
+            'to': tx.get('to'),
+            'status': '0x0' if self.reverts(tx.get('data')) else '0x1',
+            'gasUsed': hex(intrinsic_gas(tx.get('data'))),
+            'logs': [],
+        }
+        return tx_hash
+
+    def snapshot(self) -> str:
+        snapshot_id = '0x' + uuid.uuid4().hex
+        self.snapshots[snapshot_id] = copy.deepcopy(
+            (self.block, self.timestamp, self.receipts, self.balances, self.nonce)
+        )
+        return snapshot_id
+
+    def revert(self, snapshot_id: str) -> bool:
+        # Tenderly snapshots stay valid after a revert; anvil's are consumed
+        if snapshot_id not in self.snapshots:
+            return False
+        self.block, self.timestamp, self.receipts, self.balances, self.nonce = copy.deepcopy(
+            self.snapshots[snapshot_id]
+        )
+        if self.consume_snapshots:
+            del self.snapshots[snapshot_id]
+        return True
+
+    def handle(self, method: str, params: List) -> Any:
+        if method == 'eth_chainId':
+            return hex(self.chain_id)
+        if method == 'eth_blockNumber':
+            return hex(self.block)
+        if method == 'eth_getBlockByNumber':
+            return {'number': hex(self.block), 'hash': self.block_hash(self.block), 'timestamp': hex(self.timestamp)}
+        if method == 'eth_getBalance':
+            return hex(self.balances.get(params[0].lower(), 0))
+        if method in ('eth_call', 'eth_estimateGas'):
+            if self.reverts(params[0].get('data')):
+                raise RpcError(3, 'execution reverted', '0x')
+            return '0x' if method == 'eth_call' else hex(intrinsic_gas(params[0].get('data')))
+        if method == 'eth_sendTransaction':
+            return self.send(params[0])
+        if method == 'eth_getTransactionReceipt':
+            return self.receipts.get(params[0])
+        if method == 'evm_snapshot':
+            return self.snapshot()
+        if method == 'evm_revert':
+            return self.revert(params[0])
+        if method == 'evm_setNextBlockTimestamp':
+            self.next_timestamp = int(params[0], 16) if isinstance(params[0], str) else int(params[0])
+            return None
+        if method == 'evm_increaseTime':
+            seconds = int(params[0], 16) if isinstance(params[0], str) else int(params[0])
+            self.next_timestamp = self.timestamp + seconds
+            return hex(seconds)
+        if method == 'evm_mine':
+            self.mine()
+            return None
+        if method == 'tenderly_setBalance':
+            addresses = params[0] if isinstance(params[0], list) else [params[0]]
+            for address in addresses:
+                self.balances[address.lower()] = int(params[1], 16)
+            return None
+        if method == 'tenderly_simulateBundle':
+            return [
+                {'status': not self.reverts(tx.get('data')), 'gasUsed': hex(intrinsic_gas(tx.get('data')))}
+                for tx in params[0]
+            ]
+        raise RpcError(-32601, f"Method not supported by the stand-in: {method}")
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str, data: Optional[str] = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+# =============================================================================
+# HTTP Server
+# =============================================================================
+
+class StandinState:
+    """VNets by id, guarded by one lock."""
+
+    def __init__(self, base_url: str, fork_block: int, revert_selectors: List[str], consume_snapshots: bool = False):
+        self.base_url = base_url
+        self.fork_block = fork_block
+        self.revert_selectors = revert_selectors
+        self.consume_snapshots = consume_snapshots
+        self.vnets = {}
+        self.chains = {}
+        self.lock = threading.Lock()
+
+    def create(self, account: str, project: str, payload: Dict) -> Dict:
+        vnet_id = str(uuid.uuid4())
+        fork_config = payload.get('fork_config', {})
+        chain_id = payload.get('virtual_network_config', {}).get('chain_config', {}).get('chain_id', 1)
+        fork_block = fork_config.get('block_number') or self.fork_block
+        self.chains[vnet_id] = Chain(chain_id, fork_block, self.revert_selectors, self.consume_snapshots)
+        rpc_url = f"{self.base_url}/rpc/{vnet_id}"
+        vnet = {
+            'id': vnet_id,
+            'slug': payload.get('slug', vnet_id),
+            'display_name': payload.get('display_name', 'Unnamed'),
+            'status': 'running',
+            'account': account,
+            'project': project,
+            'fork_config': {'network_id': fork_config.get('network_id', 1), 'block_number': fork_block},
+            'rpcs': [{'name': 'Admin RPC', 'url': rpc_url}, {'name': 'Public RPC', 'url': rpc_url}],
+        }
+        self.vnets[vnet_id] = vnet
+        return vnet
+
+
+def make_handler(state: StandinState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status: int, body: Any = None):
+            payload = json.dumps(body).encode() if body is not None else b''
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def read_json(self) -> Any:
+            length = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(length) or b'null')
+
+        def authorized(self) -> bool:
+            if self.headers.get('X-Access-Key'):
+                return True
+            self.send_json(401, {'error': {'message': 'missing X-Access-Key'}})
+            return False
+
+        def project_vnets(self, account: str, project: str) -> List[Dict]:
+            return [v for v in state.vnets.values() if v['account'] == account and v['project'] == project]
+
+        def do_GET(self):
+            if not self.authorized():
+                return
+            with state.lock:
+                match = VNETS_PATH.match(self.path)
+                if match:
+                    return self.send_json(200, self.project_vnets(*match.groups()))
+                match = VNET_PATH.match(self.path)
+                if match and match.group(3) in state.vnets:
+                    return self.send_json(200, state.vnets[match.group(3)])
+            self.send_json(404, {'error': {'message': 'not found'}})
+
+        def do_DELETE(self):
+            if not self.authorized():
+                return
+            with state.lock:
+                match = VNET_PATH.match(self.path)
+                if match and match.group(3) in state.vnets:
+                    del state.vnets[match.group(3)]
+                    del state.chains[match.group(3)]
+                    return self.send_json(204)
+            self.send_json(404, {'error': {'message': 'not found'}})
+
+        def do_POST(self):
+            match = RPC_PATH.match(self.path)
+            if match:
+                return self.handle_rpc(match.group(1))
+            if not self.authorized():
+                return
+            match = VNETS_PATH.match(self.path)
+            if not match:
+                return self.send_json(404, {'error': {'message': 'not found'}})
+            with state.lock:
+                vnet = state.create(*match.groups(), self.read_json() or {})
+            self.send_json(200, vnet)
+
+        def handle_rpc(self, vnet_id: str):
+            request = self.read_json()
+            with state.lock:
+                chain = state.chains.get(vnet_id)
+                if chain is None:
+                    return self.send_json(404, {'error': {'message': 'unknown VNet'}})
+
+                def one(call: Dict) -> Dict:
+                    response = {'jsonrpc': '2.0', 'id': call.get('id')}
+                    try:
+                        response['result'] = chain.handle(call.get('method'), call.get('params') or [])
+                    except RpcError as e:
+                        response['error'] = {'code': e.code, 'message': e.message}
+                        if e.data is not None:
+                            response['error']['data'] = e.data
+                    return response
+
+                body = [one(call) for call in request] if isinstance(request, list) else one(request)
+            self.send_json(200, body)
+
+    return Handler
+
+
+def serve(port: int = DEFAULT_PORT, host: str = '127.0.0.1', fork_block: int = DEFAULT_FORK_BLOCK,
+          revert_selectors: Optional[List[str]] = None, consume_snapshots: bool = False) -> ThreadingHTTPServer:
+    """Start the stand-in on a background thread (port 0 picks a free port)."""
+    server = ThreadingHTTPServer((host, port), None)
+    base_url = f"http://{host}:{server.server_address[1]}"
+    selectors = [re.sub(r'^0x', '', s.lower()) for s in (revert_selectors or [])]
+    server.RequestHandlerClass = make_handler(StandinState(base_url, fork_block, selectors, consume_snapshots))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Local stand-in for the Tenderly Virtual TestNet API',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python3 tenderly_standin.py
+  python3 tenderly_standin.py --port 9000 --fork-block 21500000 --revert-selector 0x6691954e
+        """
+    )
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--fork-block', type=int, default=DEFAULT_FORK_BLOCK,
+                        help=f'Fork block for VNets created without one (default: {DEFAULT_FORK_BLOCK})')
+    parser.add_argument('--revert-selector', action='append', default=[],
+                        help='Function selector whose calls revert (repeatable)')
+    parser.add_argument('--consume-snapshots', action='store_true',
+                        help='Invalidate a snapshot once it is reverted to, as anvil does')
+    args = parser.parse_args()
+
+    server = serve(args.port, args.host, args.fork_block, args.revert_selector, args.consume_snapshots)
+    host, port = server.server_address[:2]
+    print(f"Tenderly stand-in listening on http://{host}:{port}")
+    print(f"  TENDERLY_API_URL=http://{host}:{port}/api/v1/account/local/project/sim/")
+    print(f"  TENDERLY_API_ACCESS_TOKEN=local")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,23 +5,30 @@ validator_utils.py - Reusable utilities for validator operations
 This module provides common utilities for:
 - Database connections and queries
 - Beacon chain API interactions
-- Sweep time calculations
+- Sweep time calculations (linear estimate, or an exact simulation over the registry)
 - Operator and validator lookups
 
 These utilities can be used by various scripts that need to interact
 with the validator database and beacon chain.
 """
 
+import http.client
+import json
 import math
 import os
+import socket
 import sys
+import threading
 import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 
 # Load .env file if python-dotenv is available
 try:
-    from pathlib import Path
     from dotenv import load_dotenv
     # Try loading from current directory, then from script's parent directories
     env_path = Path('.env')
@@ -50,6 +57,11 @@ try:
 except ImportError:
     requests = None
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # only needed for the registry sweep simulation
+
 
 # =============================================================================
 # Constants
@@ -61,6 +73,20 @@ SLOTS_PER_EPOCH = 32      # Slots per epoch
 SECONDS_PER_SLOT = 12     # Seconds per slot
 VALIDATORS_PER_SECOND = VALIDATORS_PER_SLOT / SECONDS_PER_SLOT
 
+# Withdrawal sweep (consensus spec, Electra)
+MAX_WITHDRAWALS_PER_PAYLOAD = 16
+MAX_VALIDATORS_PER_WITHDRAWALS_SWEEP = 16384
+MAX_PENDING_PARTIALS_PER_WITHDRAWALS_SWEEP = 8
+MIN_ACTIVATION_BALANCE_GWEI = 32 * 10**9
+MAX_EFFECTIVE_BALANCE_ELECTRA_GWEI = 2048 * 10**9
+MAINNET_GENESIS_TIME = 1606824023
+
+# Beacon API
+DEFAULT_BEACON_CONCURRENCY = 4  # concurrent batch requests in the planning entry points
+DEFAULT_REGISTRY_CACHE = Path.home() / '.cache' / 'etherfi-beacon' / 'validator-registry.npz'
+DEFAULT_REGISTRY_MAX_AGE = 6 * 3600  # seconds before the cached registry is re-fetched
+SWEEP_DAEMON_ENV = 'SWEEP_DAEMON_URL'  # http://host:port or unix:///path of a running sweep_daemon.py
+
 
 # =============================================================================
 # Database Utilities
@@ -259,11 +285,103 @@ def query_validators_by_ids(conn, validator_ids: List[int]) -> List[Dict]:
 # Beacon Chain Utilities
 # =============================================================================
 
+# One limit on beacon API requests in flight, shared by every thread of the process
+_beacon_slots = threading.BoundedSemaphore(DEFAULT_BEACON_CONCURRENCY)
+
+
+def set_beacon_concurrency(limit: int):
+    """Cap beacon API requests in flight across all threads (the entry points' --beacon-concurrency)."""
+    global _beacon_slots
+    _beacon_slots = threading.BoundedSemaphore(max(1, limit))
+
+
+def beacon_get(url: str, **kwargs):
+    """requests.get under the shared beacon concurrency limit."""
+    with _beacon_slots:
+        return requests.get(url, **kwargs)
+
+
+def run_batches(
+    batches: List[List],
+    fetch: Callable[[List], Dict],
+    max_workers: int = 1,
+    on_result: Optional[Callable[[int, Dict], None]] = None,
+) -> List[Dict]:
+    """
+    Run fetch(batch) for every batch, up to max_workers at a time.
+
+    Results are returned in batch order regardless of completion order.
+    on_result(batch_idx, result) is called as each batch completes (from the
+    calling thread), so dependent work can start on partial results.
+    """
+    results = [None] * len(batches)
+    if max_workers <= 1 or len(batches) <= 1:
+        for batch_idx, batch in enumerate(batches):
+            results[batch_idx] = fetch(batch)
+            if on_result:
+                on_result(batch_idx, results[batch_idx])
+        return results
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+        futures = {executor.submit(fetch, batch): batch_idx for batch_idx, batch in enumerate(batches)}
+        for future in as_completed(futures):
+            batch_idx = futures[future]
+            results[batch_idx] = future.result()
+            if on_result:
+                on_result(batch_idx, results[batch_idx])
+    return results
+
+
 def get_beacon_chain_url() -> str:
     """Get beacon chain API URL from environment or use default."""
     return os.environ.get('BEACON_CHAIN_URL', 'https://beaconcha.in/api/v1')
 
 
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix socket (the sweep daemon's --unix-socket)."""
+
+    def __init__(self, path: str, timeout: float):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def query_sweep_daemon(path: str, body: Optional[Dict] = None, timeout: float = 5) -> Optional[Dict]:
+    """
+    Query the sweep daemon at SWEEP_DAEMON_URL (see sweep_daemon.py).
+
+    Returns:
+        Decoded JSON response, or None if no daemon is configured or it is unavailable
+    """
+    url = os.environ.get(SWEEP_DAEMON_ENV)
+    if not url:
+        return None
+    try:
+        if url.startswith('unix://'):
+            conn = _UnixHTTPConnection(url[len('unix://'):], timeout)
+        else:
+            parsed = urlparse(url)
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=timeout)
+        try:
+            conn.request('GET' if body is None else 'POST', path,
+                         body=None if body is None else json.dumps(body),
+                         headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            data = json.loads(response.read() or b'null')
+        finally:
+            conn.close()
+        if response.status != 200:
+            raise RuntimeError((data or {}).get('error', {}).get('message', f"HTTP {response.status}"))
+        return data
+    except Exception as e:
+        print(f"Warning: Sweep daemon at {url} unavailable ({e}), falling back to beacon fetches")
+        return None
+
+
 def fetch_next_withdrawal_index() -> Optional[Dict]:
     """
     Fetch next withdrawal validator index from beacon chain API.
@@ -278,7 +396,7 @@ def fetch_next_withdrawal_index() -> Optional[Dict]:
 
     try:
         # Try beacon API endpoint for latest block
-        response = requests.get(f"{beacon_url}/eth/v2/beacon/blocks/head", timeout=30)
+        response = beacon_get(f"{beacon_url}/eth/v2/beacon/blocks/head", timeout=30)
         response.raise_for_status()
         data = response.json()
 
@@ -319,7 +437,7 @@ def fetch_validator_count() -> int:
 
     try:
         # Try to get validator count from beacon API
-        response = requests.get(f"{beacon_url}/eth/v1/beacon/states/head/validators?status=active_ongoing",
+        response = beacon_get(f"{beacon_url}/eth/v1/beacon/states/head/validators?status=active_ongoing",
                                headers={'Accept': 'application/json'}, timeout=30)
 
         if response.ok:
@@ -339,10 +457,21 @@ def fetch_validator_count() -> int:
 def fetch_beacon_state() -> Dict:
     """
     Fetch current beacon chain state including next_withdrawal_validator_index.
+    Served by the sweep daemon when SWEEP_DAEMON_URL is set.
 
     Returns:
         Dict containing beacon state data
     """
+    daemon_state = query_sweep_daemon('/state')
+    if daemon_state:
+        return {
+            'next_withdrawal_validator_index': daemon_state['next_withdrawal_validator_index'],
+            'validator_count': daemon_state['validator_count'],
+            'epoch': (daemon_state['slot'] or 0) // SLOTS_PER_EPOCH,
+            'slot': daemon_state['slot'],
+            'sweep_daemon': True
+        }
+
     if not requests:
         raise ImportError("requests library required for beacon chain API")
 
@@ -363,7 +492,7 @@ def fetch_beacon_state() -> Dict:
     beacon_url = get_beacon_chain_url()
 
     try:
-        response = requests.get(f"{beacon_url}/epoch/latest", timeout=30)
+        response = beacon_get(f"{beacon_url}/epoch/latest", timeout=30)
         response.raise_for_status()
         data = response.json()
 
@@ -381,7 +510,7 @@ def fetch_beacon_state() -> Dict:
     beacon_node_url = os.environ.get('BEACON_NODE_URL')
     if beacon_node_url:
         try:
-            response = requests.get(f"{beacon_node_url}/eth/v1/beacon/states/head", timeout=30)
+            response = beacon_get(f"{beacon_node_url}/eth/v1/beacon/states/head", timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -437,6 +566,266 @@ def calculate_sweep_time(validator_index: int, current_sweep_index: int, total_v
     }
 
 
+# =============================================================================
+# Sweep Simulation
+# =============================================================================
+
+def current_epoch() -> int:
+    """Mainnet epoch at the wall-clock time."""
+    return int((time.time() - MAINNET_GENESIS_TIME) // (SECONDS_PER_SLOT * SLOTS_PER_EPOCH))
+
+
+def parse_validator_registry(entries: List[Dict]) -> Dict:
+    """
+    Convert beacon API /eth/v1/beacon/states/{state}/validators entries into the
+    column arrays the sweep simulation reads, indexed by validator index.
+    """
+    n = max(int(e['index']) for e in entries) + 1 if entries else 0
+    balance = np.zeros(n, dtype=np.uint64)
+    effective_balance = np.zeros(n, dtype=np.uint64)
+    credential_prefix = np.zeros(n, dtype=np.uint8)
+    withdrawable_epoch = np.full(n, np.iinfo(np.uint64).max, dtype=np.uint64)
+    for e in entries:
+        i = int(e['index'])
+        v = e['validator']
+        balance[i] = int(e['balance'])
+        effective_balance[i] = int(v['effective_balance'])
+        credential_prefix[i] = int(v['withdrawal_credentials'][2:4], 16)
+        withdrawable_epoch[i] = min(int(v['withdrawable_epoch']), np.iinfo(np.uint64).max)
+    return {
+        'balance': balance,
+        'effective_balance': effective_balance,
+        'credential_prefix': credential_prefix,
+        'withdrawable_epoch': withdrawable_epoch,
+    }
+
+
+def load_validator_registry(
+    snapshot: Optional[str] = None,
+    cache_path: Path = DEFAULT_REGISTRY_CACHE,
+    max_age: int = DEFAULT_REGISTRY_MAX_AGE,
+    state_id: str = 'head'
+) -> Optional[Dict]:
+    """
+    Load the full validator registry for the sweep simulation.
+
+    Sources, in order: `snapshot` (a saved beacon API validators response as
+    .json, or a registry .npz), the cache if younger than `max_age`, or a bulk
+    fetch from BEACON_NODE_URL, which is then cached as .npz. With
+    SWEEP_DAEMON_URL set and no snapshot, the daemon holds the registry and
+    calculate_sweep_times asks it instead, so nothing is loaded here.
+
+    Returns:
+        Dict of column arrays, or None if numpy or every source is unavailable
+    """
+    if not snapshot and os.environ.get(SWEEP_DAEMON_ENV):
+        return None
+    if np is None:
+        print("Warning: numpy not installed, using the linear sweep estimate (pip install numpy)")
+        return None
+
+    if snapshot:
+        if snapshot.endswith('.npz'):
+            with np.load(snapshot) as data:
+                return {k: data[k] for k in data.files if k != 'fetched_at'}
+        with open(snapshot) as f:
+            data = json.load(f)
+        return parse_validator_registry(data.get('data', data) if isinstance(data, dict) else data)
+
+    cache_path = Path(cache_path)
+    if cache_path.exists():
+        try:
+            with np.load(cache_path) as data:
+                if time.time() - float(data['fetched_at']) < max_age:
+                    return {k: data[k] for k in data.files if k != 'fetched_at'}
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as e:
+            # A truncated or corrupt cache is re-fetched (and overwritten) below
+            print(f"Warning: Ignoring unreadable registry cache {cache_path}: {e}")
+
+    beacon_node_url = os.environ.get('BEACON_NODE_URL')
+    if not beacon_node_url or not requests:
+        return None
+    try:
+        response = beacon_get(f"{beacon_node_url}/eth/v1/beacon/states/{state_id}/validators", timeout=300)
+        response.raise_for_status()
+        registry = parse_validator_registry(response.json()['data'])
+    except Exception as e:
+        print(f"Warning: Failed to fetch validator registry: {e}")
+        return None
+
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_name(cache_path.stem + '.tmp.npz')
+    np.savez(tmp, fetched_at=time.time(), **registry)
+    os.replace(tmp, cache_path)
+    return registry
+
+
+def fetch_pending_partials(state_id: str = 'head') -> int:
+    """
+    Pending partial withdrawals the sweep serves ahead of the validator scan,
+    from BEACON_NODE_URL's /eth/v1/beacon/states/{state_id}/pending_partial_withdrawals.
+
+    Only the withdrawable head of the queue counts: the spec stops at the
+    first entry whose withdrawable_epoch is still in the future.
+
+    Returns:
+        Number of pending partials (0 if BEACON_NODE_URL is unset or the fetch fails)
+    """
+    if os.environ.get(SWEEP_DAEMON_ENV):
+        return 0
+    beacon_node_url = os.environ.get('BEACON_NODE_URL')
+    if not beacon_node_url or not requests:
+        return 0
+    try:
+        response = beacon_get(f"{beacon_node_url}/eth/v1/beacon/states/{state_id}/pending_partial_withdrawals", timeout=60)
+        response.raise_for_status()
+        entries = response.json()['data']
+    except Exception as e:
+        print(f"Warning: Failed to fetch pending partial withdrawals: {e}")
+        return 0
+
+    epoch = current_epoch()
+    count = 0
+    for entry in entries:
+        if int(entry['withdrawable_epoch']) > epoch:
+            break
+        count += 1
+    return count
+
+
+def sweep_eligible(registry: Dict, epoch: Optional[int] = None):
+    """
+    Mask of validators the sweep would pay out now: fully withdrawable, or
+    partially withdrawable (excess over max effective balance), per the
+    Electra is_fully_withdrawable_validator / is_partially_withdrawable_validator.
+    """
+    epoch = current_epoch() if epoch is None else epoch
+    prefix = registry['credential_prefix']
+    balance = registry['balance']
+    has_execution_credential = (prefix == 1) | (prefix == 2)
+    max_effective = np.where(prefix == 2, MAX_EFFECTIVE_BALANCE_ELECTRA_GWEI, MIN_ACTIVATION_BALANCE_GWEI).astype(np.uint64)
+    fully = (registry['withdrawable_epoch'] <= epoch) & (balance > 0)
+    partially = (registry['effective_balance'] == max_effective) & (balance > max_effective)
+    return has_execution_credential & (fully | partially)
+
+
+def simulate_sweep(eligible, sweep_index: int, pending_partials: int = 0):
+    """
+    Step the withdrawal sweep slot by slot over one full cycle.
+
+    Each slot the sweep pays out up to MAX_WITHDRAWALS_PER_PAYLOAD eligible
+    validators (less the pending partial withdrawals served first, at most
+    MAX_PENDING_PARTIALS_PER_WITHDRAWALS_SWEEP per slot) and looks at no more
+    than MAX_VALIDATORS_PER_WITHDRAWALS_SWEEP validators. Runs of full slots
+    are computed as whole arrays; only slots that hit the look-ahead bound
+    are stepped one at a time.
+
+    Args:
+        eligible: Boolean mask over the registry (see sweep_eligible)
+        sweep_index: Current next_withdrawal_validator_index
+        pending_partials: Pending partial withdrawals queued ahead of the sweep
+                          (see fetch_pending_partials)
+
+    Returns:
+        (cursors, offsets): cursors[s] is the sweep position, counted from
+        sweep_index, after slot s + 1; offsets are the eligible positions
+    """
+    n = len(eligible)
+    bound = min(n, MAX_VALIDATORS_PER_WITHDRAWALS_SWEEP)
+    offsets = np.sort((np.flatnonzero(eligible) - sweep_index) % n)
+    # The last slots of the cycle keep sweeping into the next one
+    positions = np.concatenate([offsets, offsets + n])
+    cursors = []
+    cursor, k = 0, 0
+    window = 8192  # slots computed per vectorized block
+
+    def step(cursor, k, cap):
+        last = k + cap - 1
+        if last < len(positions) and positions[last] - cursor < bound:
+            return int(positions[last]) + 1, k + cap
+        cursor += bound
+        return cursor, int(np.searchsorted(positions, cursor))
+
+    while pending_partials > 0 and cursor < n:
+        served = min(pending_partials, MAX_PENDING_PARTIALS_PER_WITHDRAWALS_SWEEP)
+        pending_partials -= served
+        cursor, k = step(cursor, k, MAX_WITHDRAWALS_PER_PAYLOAD - served)
+        cursors.append(cursor)
+
+    cap = MAX_WITHDRAWALS_PER_PAYLOAD
+    while cursor < n:
+        groups = min(window, (len(positions) - k) // cap)
+        if groups > 0:
+            ends = positions[k + cap - 1 : k + cap * groups : cap]
+            starts = np.concatenate([[cursor], ends[:-1] + 1])
+            full = ends - starts < bound
+            first_short = int(np.argmin(full)) if not full.all() else groups
+            if first_short > 0:
+                cursors.extend((ends[:first_short] + 1).tolist())
+                cursor = int(ends[first_short - 1]) + 1
+                k += cap * first_short
+                continue
+        cursor, k = step(cursor, k, cap)
+        cursors.append(cursor)
+
+    return np.asarray(cursors, dtype=np.int64), offsets
+
+
+def calculate_sweep_times(
+    validator_indices: List[int],
+    current_sweep_index: int,
+    total_validators: int,
+    registry: Optional[Dict] = None,
+    pending_partials: int = 0
+) -> List[Dict]:
+    """
+    Sweep times for many validators at once.
+
+    With a registry (see load_validator_registry) the sweep is simulated
+    exactly, serving pending_partials (see fetch_pending_partials) first and
+    skipping validators with nothing to withdraw; without one the
+    sweep daemon's precomputed positions are used if SWEEP_DAEMON_URL is set,
+    else calculate_sweep_time's linear estimate.
+
+    Returns:
+        One dict per validator, same keys as calculate_sweep_time
+    """
+    if registry is None:
+        daemon = query_sweep_daemon('/sweep', {'indices': [int(i) for i in validator_indices]})
+        if daemon:
+            now = time.time()
+            return [
+                {
+                    'positionInQueue': info['positionInQueue'],
+                    'slotsUntilSweep': info['slotsUntilSweep'],
+                    'secondsUntilSweep': max(0, int(daemon['asOf'] + info['secondsUntilSweep'] - now)),
+                    'estimatedSweepTime': datetime.fromtimestamp(daemon['asOf'] + info['secondsUntilSweep'])
+                }
+                for info in daemon['sweep']
+            ]
+        return [calculate_sweep_time(i, current_sweep_index, total_validators) for i in validator_indices]
+
+    eligible = sweep_eligible(registry)
+    n = len(eligible)
+    cursors, offsets = simulate_sweep(eligible, current_sweep_index % n, pending_partials)
+    # Validators newer than the registry snapshot sit right after its last entry
+    indices = np.minimum(np.asarray(validator_indices, dtype=np.int64), n - 1)
+    targets = (indices - current_sweep_index) % n
+    slots = np.searchsorted(cursors, targets, side='right') + 1
+    ahead = np.searchsorted(offsets, targets)
+
+    now = datetime.now()
+    return [
+        {
+            'positionInQueue': int(position),
+            'slotsUntilSweep': int(slot),
+            'secondsUntilSweep': int(slot) * SECONDS_PER_SLOT,
+            'estimatedSweepTime': now + timedelta(seconds=int(slot) * SECONDS_PER_SLOT)
+        }
+        for slot, position in zip(slots, ahead)
+    ]
+
+
 def format_duration(seconds: float) -> str:
     """Format duration in seconds to human readable string."""
     days = int(seconds // 86400)
@@ -460,7 +849,8 @@ def fetch_validator_details_batch(
     beacon_api: str = "https://beaconcha.in/api/v1",
     batch_size: int = 100,
     max_retries: int = 3,
-    show_progress: bool = True
+    show_progress: bool = True,
+    max_workers: int = 1
 ) -> Dict[str, Dict]:
     """
     Fetch validator details (balance, consolidation status, validator index) from beacon chain.
@@ -474,6 +864,7 @@ def fetch_validator_details_batch(
         batch_size: Number of validators per API request (max 100)
         max_retries: Maximum number of retry attempts per batch
         show_progress: Show progress messages
+        max_workers: Batch requests in flight at once
 
     Returns:
         Dictionary mapping pubkey -> {
@@ -488,17 +879,22 @@ def fetch_validator_details_batch(
         return {pk: {'balance_eth': 32.0, 'is_consolidated': None, 'beacon_withdrawal_credentials': '', 'validator_index': None} for pk in pubkeys}
 
     batch_size = min(batch_size, 100)
-    total_batches = (len(pubkeys) + batch_size - 1) // batch_size
-
-    for batch_idx in range(total_batches):
-        start = batch_idx * batch_size
-        end = min(start + batch_size, len(pubkeys))
-        batch = pubkeys[start:end]
+    batches = [pubkeys[i:i + batch_size] for i in range(0, len(pubkeys), batch_size)]
+    total_batches = len(batches)
+    completed = []
 
+    def report(batch_idx: int, batch_result: Dict):
+        completed.append(batch_idx)
         if show_progress:
-            print(f"  Fetching details batch {batch_idx + 1}/{total_batches} ({end}/{len(pubkeys)})...", end='\r', flush=True)
-
-        batch_result = _fetch_details_single_batch(batch, beacon_api, max_retries)
+            done = min(len(completed) * batch_size, len(pubkeys))
+            print(f"  Fetching details batch {len(completed)}/{total_batches} ({done}/{len(pubkeys)})...", end='\r', flush=True)
+
+    for batch_result in run_batches(
+        batches,
+        lambda batch: _fetch_details_single_batch(batch, beacon_api, max_retries),
+        max_workers=max_workers,
+        on_result=report
+    ):
         result.update(batch_result)
 
     if show_progress and total_batches > 0:
@@ -524,7 +920,7 @@ def _fetch_details_single_batch(
     for attempt in range(max_retries):
         try:
             url = f"{beacon_api}/validator/{pubkeys_str}"
-            response = requests.get(url, timeout=30)
+            response = beacon_get(url, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -618,7 +1014,7 @@ def check_validators_consolidation_status_batch(
         try:
             # Batch API endpoint: /validator/{pubkey1},{pubkey2},...
             url = f"{beacon_api}/validator/{pubkeys_str}"
-            response = requests.get(url, timeout=30)  # Longer timeout for batch
+            response = beacon_get(url, timeout=30)  # Longer timeout for batch
             response.raise_for_status()
             data = response.json()
             
@@ -674,7 +1070,9 @@ def filter_consolidated_validators(
     exclude_consolidated: bool = True,
     beacon_api: str = "https://beaconcha.in/api/v1",
     show_progress: bool = True,
-    batch_size: int = 100
+    batch_size: int = 100,
+    max_workers: int = 1,
+    on_batch: Optional[Callable[[List[Dict], List[Dict]], None]] = None
 ) -> Tuple[List[Dict], List[Dict]]:
     """
     Filter out validators that are already consolidated (0x02) using batch API requests.
@@ -685,6 +1083,8 @@ def filter_consolidated_validators(
         beacon_api: Beacon chain API base URL
         show_progress: Show progress messages
         batch_size: Number of validators to check per API request (max 100)
+        max_workers: Batch requests in flight at once
+        on_batch: Called with (filtered, consolidated) for each batch as it completes
     
     Returns:
         Tuple of (filtered_validators, consolidated_validators)
@@ -715,22 +1115,30 @@ def filter_consolidated_validators(
         validator_map[pubkey] = validator
     
     # Process in batches
-    total_batches = (len(validator_pubkeys) + batch_size - 1) // batch_size
-    
-    for batch_idx in range(total_batches):
-        start_idx = batch_idx * batch_size
-        end_idx = min(start_idx + batch_size, len(validator_pubkeys))
-        batch_pubkeys = validator_pubkeys[start_idx:end_idx]
-        
+    batches = [validator_pubkeys[i:i + batch_size] for i in range(0, len(validator_pubkeys), batch_size)]
+    total_batches = len(batches)
+    completed = []
+
+    def report(batch_idx: int, batch_results: Dict):
+        completed.append(batch_idx)
         if show_progress:
-            print(f"  Checking batch {batch_idx + 1}/{total_batches} ({end_idx}/{len(validator_pubkeys)} validators)...", end='\r', flush=True)
-        
-        # Check batch
-        batch_results = check_validators_consolidation_status_batch(
-            batch_pubkeys,
-            beacon_api=beacon_api
-        )
-        
+            done = min(len(completed) * batch_size, len(validator_pubkeys))
+            print(f"  Checking batch {len(completed)}/{total_batches} ({done}/{len(validator_pubkeys)} validators)...", end='\r', flush=True)
+        if on_batch:
+            batch_pubkeys = batches[batch_idx]
+            on_batch(
+                [validator_map[pk] for pk in batch_pubkeys if batch_results.get(pk) is not True],
+                [validator_map[pk] for pk in batch_pubkeys if batch_results.get(pk) is True]
+            )
+
+    all_results = run_batches(
+        batches,
+        lambda batch: check_validators_consolidation_status_batch(batch, beacon_api=beacon_api),
+        max_workers=max_workers,
+        on_result=report
+    )
+
+    for batch_pubkeys, batch_results in zip(batches, all_results):
         # Process results
         for pubkey in batch_pubkeys:
             validator = validator_map[pubkey]
@@ -746,7 +1154,6 @@ def filter_consolidated_validators(
                 # Unknown status - include it (assume not consolidated)
                 filtered.append(validator)
                 unknown.append(validator)
-        
     
     if show_progress:
         print(f"  Checked {len(validator_pubkeys)} validators in {total_batches} batches" + " " * 20)  # Clear progress line
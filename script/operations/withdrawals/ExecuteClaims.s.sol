@@ -3,10 +3,12 @@ pragma solidity ^0.8.13;
 
 import "forge-std/Script.sol";
 import "forge-std/console2.sol";
+import "forge-std/StdJson.sol";
 
 interface IWithdrawNFT {
     function lastFinalizedRequestId() external view returns (uint32);
     function claimWithdraw(uint256 tokenId) external;
+    function batchClaimWithdraw(uint256[] calldata tokenIds) external;
     function ethAmountLockedForWithdrawal() external view returns (uint128);
 }
 
@@ -36,7 +38,12 @@ contract ClaimFlusher {
 ///     --broadcast -vv
 ///
 /// Omit --broadcast for a dry run (full simulation with the summary logs, nothing sent).
-/// Optional env: CHUNK_SIZE (ids per flush tx, default 100),
+///
+/// When the json was written with --pack (it has a "packing" key), each packed chunk is sent
+/// unchanged as one batchClaimWithdraw transaction - the chunks were sized and simulated for
+/// exactly that call - and ids listed under "unclaimable" are not sent at all. Otherwise all
+/// ids are claimed through ClaimFlusher in CHUNK_SIZE chunks.
+/// Optional env: CHUNK_SIZE (ids per flush tx, default 100, ignored for packed chunks),
 ///               CLAIM_BATCHES (path to json, default script/operations/withdrawals/claim_batches.json).
 contract ExecuteClaims is Script {
     address constant WITHDRAW_REQUEST_NFT = 0x7d5706f6ef3F89B3951E23e557CDFBC3239D4E2c;
@@ -70,31 +77,54 @@ contract ExecuteClaims is Script {
             abi.decode(vm.parseJson(json, ".batchClaimWithdraw_chunks_eoa_owners"), (uint256[][]));
         uint256[] memory contractIds =
             abi.decode(vm.parseJson(json, ".claim_individually_contract_owners"), (uint256[]));
+        bool packed = stdJson.keyExists(json, ".packing");
+        if (stdJson.keyExists(json, ".unclaimable")) {
+            uint256[] memory unclaimable = abi.decode(vm.parseJson(json, ".unclaimable"), (uint256[]));
+            console2.log("unclaimable ids (not sent):", unclaimable.length);
+        }
 
+        // Packed chunks go out as they are; everything else is flattened for the flusher
         uint256 total = contractIds.length;
-        for (uint256 i; i < eoaChunks.length; ++i) total += eoaChunks[i].length;
+        uint256 packedTotal;
+        for (uint256 i; i < eoaChunks.length; ++i) {
+            if (packed) packedTotal += eoaChunks[i].length;
+            else total += eoaChunks[i].length;
+        }
         uint256[] memory ids = new uint256[](total);
         uint256 n;
-        for (uint256 i; i < eoaChunks.length; ++i) {
-            for (uint256 j; j < eoaChunks[i].length; ++j) ids[n++] = eoaChunks[i][j];
+        if (!packed) {
+            for (uint256 i; i < eoaChunks.length; ++i) {
+                for (uint256 j; j < eoaChunks[i].length; ++j) ids[n++] = eoaChunks[i][j];
+            }
         }
         for (uint256 i; i < contractIds.length; ++i) ids[n++] = contractIds[i];
 
-        console2.log("claimable ids:", total);
+        console2.log("claimable ids:", packedTotal + total);
+        if (packed) console2.log("packed batchClaimWithdraw txs:", eoaChunks.length);
         console2.log("escrow before (ETH):", WITHDRAW_REQUEST_NFT.balance / 1e18);
 
         uint256 chunkSize = vm.envOr("CHUNK_SIZE", uint256(100));
         uint256 claimed;
 
         vm.startBroadcast();
-        ClaimFlusher flusher = new ClaimFlusher();
-        for (uint256 start; start < total; start += chunkSize) {
-            uint256 len = total - start < chunkSize ? total - start : chunkSize;
-            uint256[] memory chunk = new uint256[](len);
-            for (uint256 i; i < len; ++i) chunk[i] = ids[start + i];
-            claimed += flusher.flush(WITHDRAW_REQUEST_NFT, chunk);
+        if (packed) {
+            // Simulated at fetch time; a revert here means state drifted and aborts the run
+            for (uint256 i; i < eoaChunks.length; ++i) {
+                IWithdrawNFT(WITHDRAW_REQUEST_NFT).batchClaimWithdraw(eoaChunks[i]);
+                claimed += eoaChunks[i].length;
+            }
+        }
+        if (total > 0) {
+            ClaimFlusher flusher = new ClaimFlusher();
+            for (uint256 start; start < total; start += chunkSize) {
+                uint256 len = total - start < chunkSize ? total - start : chunkSize;
+                uint256[] memory chunk = new uint256[](len);
+                for (uint256 i; i < len; ++i) chunk[i] = ids[start + i];
+                claimed += flusher.flush(WITHDRAW_REQUEST_NFT, chunk);
+            }
         }
         vm.stopBroadcast();
+        total += packedTotal;
 
         uint256 lpBalance = LIQUIDITY_POOL.balance;
         uint256 tvlInLp = ILP(LIQUIDITY_POOL).totalValueInLp();
@@ -12,15 +12,40 @@ Outputs:
   claim_batches.json                 claimable ids chunked for batchClaimWithdraw(uint256[])
 
 Usage:
-  MAINNET_RPC_URL=... python3 fetch_unclaimed_finalized_requests.py [--batch-size 500] [--chunk-size 50]
+  MAINNET_RPC_URL=... python3 fetch_unclaimed_finalized_requests.py [--batch-size 500] [--concurrency 8] [--chunk-size 50]
+  MAINNET_RPC_URL=... python3 fetch_unclaimed_finalized_requests.py --full   # ignore the checkpoint
+  MAINNET_RPC_URL=... python3 fetch_unclaimed_finalized_requests.py --pack [--gas-target 10000000] [--sim-rpc http://127.0.0.1:8545]
 
 Run this at execution time (right before/after the upgrade lands) — lastFinalizedRequestId
 and the claimed set move with mainnet state.
 
+Scans are incremental: a checkpoint (block, last scanned id, ids still open) is kept in
+~/.cache/etherfi-withdrawals/. Claimed NFTs stay burned, so the next run drops ids burned
+since the checkpoint block (Transfer-to-zero logs) and only re-queries ids still open plus
+ids finalized since. Everything else scanned before is known-burned.
+
+Multicall batches run concurrently; a batch the node rejects for gas or response size is
+split in half and later batches start at the smaller size. Rate-limit responses (429) are
+retried after a backoff delay and never shrink the batch.
+
+Owner EOA/contract classification goes out as JSON-RPC batch arrays and is cached by address
+in ~/.cache/etherfi-withdrawals/owner-code.json with the block it was read at. Cached
+contracts stay contracts; cached EOAs only get their code re-read when their nonce moved
+(deployment and EIP-7702 delegation both bump it).
+
 Note for the claim run: a single blacklisted or ETH-rejecting recipient reverts an entire
 batchClaimWithdraw call. Owners flagged owner_is_contract=True are the risky ones — claim
 those individually, or route per-id claimWithdraw calls through Multicall3 aggregate3 with
 allowFailure=true so one bad recipient can't block the flush.
+
+--pack replaces that owner-type heuristic with simulation: batchClaimWithdraw chunks are
+eth_estimateGas'd at the scan block (or against --sim-rpc, e.g. anvil forked at that block),
+reverting chunks are bisected down to the ids that revert on their own, and the remaining ids
+(contract owners that accept ETH included) are repacked into chunks under --gas-target. The
+packed chunks replace batchClaimWithdraw_chunks_eoa_owners (ExecuteClaims.s.sol sends each one
+unchanged as a single batchClaimWithdraw transaction), claim_individually_contract_owners is
+left empty, and the ids that revert on their own are listed under unclaimable and not executed. Chunks that run out of gas or hit the node's gas cap
+are bisected like reverting ones; other eth_estimateGas errors abort the run.
 """
 
 import argparse
@@ -28,7 +53,12 @@ import csv
 import json
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 
+import requests
 from eth_abi import decode, encode
 from web3 import Web3
 
@@ -38,23 +68,305 @@ MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
 SEL_OWNER_OF = Web3.keccak(text="ownerOf(uint256)")[:4]
 SEL_GET_REQUEST = Web3.keccak(text="getRequest(uint256)")[:4]
 SEL_AGGREGATE3 = Web3.keccak(text="aggregate3((address,bool,bytes)[])")[:4]
+TRANSFER_TOPIC = Web3.to_hex(Web3.keccak(text="Transfer(address,address,uint256)"))
+ZERO_TOPIC = "0x" + "00" * 32
+
+DEFAULT_CHECKPOINT = Path.home() / ".cache" / "etherfi-withdrawals" / "unclaimed-scan.json"
+DEFAULT_OWNER_CACHE = Path.home() / ".cache" / "etherfi-withdrawals" / "owner-code.json"
+RPC_BATCH_SIZE = 200  # calls per JSON-RPC batch array
+DEFAULT_GAS_TARGET = 10_000_000  # per packed batchClaimWithdraw tx
+DEFAULT_SIM_SENDER = "0x000000000000000000000000000000000000dEaD"
+SEL_BATCH_CLAIM = Web3.keccak(text="batchClaimWithdraw(uint256[])")[:4]
+LOG_CHUNK_BLOCKS = 10_000  # eth_getLogs block range per call (halved when the provider refuses)
+# eth_call failures that mean "batch too big" rather than a broken node
+BATCH_SIZE_ERRORS = (
+    "response size", "too large", "gas limit", "out of gas", "gas required exceeds",
+    "too many", "timeout", "timed out", "413",
+)
+# Provider throttling: the batch is fine, retry it after a delay instead of splitting
+RATE_LIMIT_ERRORS = ("429", "rate limit", "rate-limit", "too many requests", "compute units")
+RATE_LIMIT_RETRIES = 5
+RATE_LIMIT_DELAY = 1.0  # seconds, doubled on each retry
+# eth_estimateGas failures of the simulated claim itself (revert, out of gas, node gas cap):
+# the chunk is halved like a revert; any other error is a node/transport failure and aborts
+CLAIM_FAILURE_ERRORS = (
+    "revert", "out of gas", "gas required exceeds", "gas limit", "gas cap", "exceeds allowance",
+)
 
 
-def multicall(w3, calls):
+def multicall(w3, calls, block="latest"):
     """calls: list of (target, calldata). Returns list of (success, returndata)."""
     payload = SEL_AGGREGATE3 + encode(
         ["(address,bool,bytes)[]"],
         [[(target, True, data) for target, data in calls]],
     )
-    raw = w3.eth.call({"to": MULTICALL3, "data": payload})
-    return decode(["(bool,bytes)[]"], raw)[0]
+    raw = w3.eth.call({"to": MULTICALL3, "data": payload}, block)
+    return decode_aggregate3(bytes(raw))
+
+
+def decode_aggregate3(raw):
+    """Slice an aggregate3 (bool,bytes)[] return directly; the generic decoder dominates large scans."""
+    def word(offset):
+        return int.from_bytes(raw[offset : offset + 32], "big")
+
+    heads = word(0) + 32
+    results = []
+    for k in range(word(heads - 32)):
+        tuple_at = heads + word(heads + 32 * k)
+        data_at = tuple_at + word(tuple_at + 32)
+        results.append((word(tuple_at) != 0, raw[data_at + 32 : data_at + 32 + word(data_at)]))
+    return results
+
+
+def decode_request(owner_raw, req_raw):
+    """(owner, amountOfEEth, shareOfEEth, isValid) from the ownerOf and getRequest return words."""
+    # getRequest returns (uint96 amountOfEEth, uint96 shareOfEEth, bool isValid, uint32 feeGwei), one word each
+    owner = Web3.to_checksum_address("0x" + owner_raw[12:32].hex())
+    amount = int.from_bytes(req_raw[0:32], "big")
+    share = int.from_bytes(req_raw[32:64], "big")
+    return owner, amount, share, req_raw[95] != 0
+
+
+def rpc_batch(rpc, calls, concurrency, raw=False):
+    """Send (method, params) calls as JSON-RPC batch arrays. Returns results in order.
+
+    With raw=True the response items ({"result": ...} or {"error": ...}) are returned unchecked.
+    """
+    chunks = [calls[k : k + RPC_BATCH_SIZE] for k in range(0, len(calls), RPC_BATCH_SIZE)]
+
+    def send(chunk):
+        payload = [{"jsonrpc": "2.0", "id": k, "method": m, "params": p} for k, (m, p) in enumerate(chunk)]
+        response = requests.post(rpc, json=payload, timeout=120)
+        response.raise_for_status()
+        body = response.json()
+        if not isinstance(body, list):
+            raise RuntimeError(f"RPC rejected the batch: {body.get('error', body)}")
+        by_id = {item.get("id"): item for item in body}
+        results = []
+        for k, (m, p) in enumerate(chunk):
+            item = by_id.get(k, {"error": "missing from batch response"})
+            if raw:
+                results.append(item)
+                continue
+            if "error" in item:
+                raise RuntimeError(f"{m}{p}: {item['error']}")
+            results.append(item["result"])
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(chunks)))) as pool:
+        return [result for chunk in pool.map(send, chunks) for result in chunk]
+
+
+def classify_owners(rpc, owners, block, cache_path, concurrency):
+    """{owner: is_contract} at block, reusing the persistent per-address cache where the nonce says it still holds."""
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    tag = hex(block)
+
+    # A cached contract stays a contract; a cached EOA is only stale if its nonce moved
+    eoas = [o for o in owners if o in cache and not cache[o]["contract"]]
+    nonces = rpc_batch(rpc, [("eth_getTransactionCount", [o, tag]) for o in eoas], concurrency)
+    moved = {o for o, n in zip(eoas, nonces) if int(n, 16) != cache[o]["nonce"]}
+    stale = [o for o in owners if o not in cache or o in moved]
+
+    codes = rpc_batch(rpc, [("eth_getCode", [o, tag]) for o in stale], concurrency)
+    stale_nonces = rpc_batch(rpc, [("eth_getTransactionCount", [o, tag]) for o in stale], concurrency)
+    for o, code, n in zip(stale, codes, stale_nonces):
+        cache[o] = {"contract": code not in ("0x", "0x0", ""), "nonce": int(n, 16), "block": block}
+    write_json(cache_path, cache)
+    print(f"classified {len(owners)} owners: {len(owners) - len(stale)} from cache, {len(stale)} fetched "
+          f"({len(moved)} with a new nonce)")
+    return {o: cache[o]["contract"] for o in owners}
+
+
+def estimate_claims(sim_rpc, tag, sender, nft, batches, concurrency):
+    """eth_estimateGas of batchClaimWithdraw(batch) for each batch; None where it reverts or runs out of gas."""
+    calls = [
+        ("eth_estimateGas", [{"from": sender, "to": nft, "data": Web3.to_hex(SEL_BATCH_CLAIM + encode(["uint256[]"], [batch]))}, tag])
+        for batch in batches
+    ]
+    gas = []
+    for batch, item in zip(batches, rpc_batch(sim_rpc, calls, concurrency, raw=True)):
+        if "error" not in item:
+            gas.append(int(item["result"], 16))
+        elif any(m in json.dumps(item["error"]).lower() for m in CLAIM_FAILURE_ERRORS):
+            gas.append(None)
+        else:
+            raise RuntimeError(f"eth_estimateGas on {len(batch)} ids: {item['error']}")
+    return gas
+
+
+def settle_batches(sim_rpc, tag, sender, nft, batches, gas_target, concurrency):
+    """Simulate batches level by level, halving any that revert, run out of gas or exceed gas_target.
+
+    Returns ([(ids, gas)] that go through, [ids that revert even alone]).
+    """
+    safe, reverting = [], []
+    while batches:
+        split = []
+        for batch, gas in zip(batches, estimate_claims(sim_rpc, tag, sender, nft, batches, concurrency)):
+            if gas is not None and (gas <= gas_target or len(batch) == 1):
+                safe.append((batch, gas))
+            elif len(batch) == 1:
+                reverting.append(batch[0])
+            else:
+                split += [batch[: len(batch) // 2], batch[len(batch) // 2 :]]
+        batches = split
+    return safe, reverting
+
+
+def pack_claims(sim_rpc, tag, sender, nft, ids, chunk_size, gas_target, concurrency):
+    """Isolate reverting ids, then repack the rest into as few batchClaimWithdraw chunks as fit gas_target."""
+    safe, reverting = settle_batches(
+        sim_rpc, tag, sender, nft, [ids[k : k + chunk_size] for k in range(0, len(ids), chunk_size)], gas_target, concurrency
+    )
+    print(f"simulated {len(ids)} claimable ids: {len(reverting)} revert on their own")
+
+    # Average gas per id over the first pass (tx overhead included, so it errs on the safe side)
+    good = sorted(i for batch, _ in safe for i in batch)
+    if good:
+        per_id = sum(gas for _, gas in safe) / len(good)
+        size = max(1, int(gas_target // per_id))
+        repacked, newly_reverting = settle_batches(
+            sim_rpc, tag, sender, nft, [good[k : k + size] for k in range(0, len(good), size)], gas_target, concurrency
+        )
+        if len(repacked) < len(safe) and not newly_reverting:
+            safe = repacked
+    safe.sort(key=lambda chunk: chunk[0][0])
+    return safe, sorted(reverting)
+
+
+def scan_requests(w3, nft, ids, block, batch_size, concurrency):
+    """ownerOf + getRequest for ids over concurrent aggregate3 batches.
+
+    Returns unclaimed (id, owner, amountOfEEth, shareOfEEth, isValid) rows sorted by id.
+    """
+    lock = threading.Lock()
+    limit = [batch_size]  # shared across workers, only ever shrinks
+
+    def fetch(batch):
+        with lock:
+            size = limit[0]
+        if len(batch) > size:
+            rows = []
+            for k in range(0, len(batch), size):
+                rows += fetch(batch[k : k + size])
+            return rows
+        calls = []
+        for i in batch:
+            arg = i.to_bytes(32, "big")
+            calls.append((nft, SEL_OWNER_OF + arg))
+            calls.append((nft, SEL_GET_REQUEST + arg))
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            try:
+                results = multicall(w3, calls, block)
+                break
+            except Exception as e:
+                error = str(e).lower()
+                if any(m in error for m in RATE_LIMIT_ERRORS):
+                    if attempt == RATE_LIMIT_RETRIES:
+                        raise
+                    time.sleep(RATE_LIMIT_DELAY * 2 ** attempt)
+                    continue
+                if len(batch) == 1 or not any(m in error for m in BATCH_SIZE_ERRORS):
+                    raise
+                half = len(batch) // 2
+                with lock:
+                    limit[0] = min(limit[0], half)
+                return fetch(batch[:half]) + fetch(batch[half:])
+        rows = []
+        for j, i in enumerate(batch):
+            owner_ok, owner_raw = results[2 * j]
+            if not owner_ok:  # burned => already claimed (or seized+burned)
+                continue
+            _, req_raw = results[2 * j + 1]
+            rows.append((i, *decode_request(owner_raw, req_raw)))
+        return rows
+
+    unclaimed = []
+    done = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {
+            pool.submit(fetch, ids[start : start + batch_size]): len(ids[start : start + batch_size])
+            for start in range(0, len(ids), batch_size)
+        }
+        for future in as_completed(futures):
+            unclaimed += future.result()
+            done += futures[future]
+            print(f"\rscanned {done}/{len(ids)} ids, unclaimed so far: {len(unclaimed)}", end="", flush=True)
+    print()
+    if limit[0] < batch_size:
+        print(f"batch size adapted down to {limit[0]} ids")
+    return sorted(unclaimed)
+
+
+def load_checkpoint(path, nft):
+    """Previous scan {block, last_scanned_id, open_ids} for this NFT, or None."""
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if checkpoint.get("nft", "").lower() != nft.lower():
+        return None
+    return checkpoint
+
+
+def write_json(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def save_checkpoint(path, nft, block, last_scanned_id, open_ids):
+    write_json(path, {"nft": nft, "block": block, "last_scanned_id": last_scanned_id, "open_ids": sorted(open_ids)})
+
+
+def iter_logs(w3, address, topics, from_block, to_block):
+    """Yield eth_getLogs results over [from_block, to_block] in block-range chunks, oldest first."""
+    chunk = LOG_CHUNK_BLOCKS
+    start = from_block
+    while start <= to_block:
+        end = min(start + chunk - 1, to_block)
+        try:
+            logs = w3.eth.get_logs({"address": address, "fromBlock": start, "toBlock": end, "topics": topics})
+        except Exception:
+            # Providers cap the range or the result size; retry smaller
+            if chunk > 1:
+                chunk //= 2
+                continue
+            raise
+        yield logs
+        start = end + 1
+
+
+def fetch_burned_ids(w3, nft, from_block, to_block):
+    """Token ids transferred to the zero address (burned on claim) in [from_block, to_block]."""
+    burned = set()
+    for logs in iter_logs(w3, nft, [TRANSFER_TOPIC, None, ZERO_TOPIC], from_block, to_block):
+        for log in logs:
+            burned.add(int.from_bytes(bytes(log["topics"][3]), "big"))
+    return burned
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--batch-size", type=int, default=500, help="request ids per multicall")
+    parser.add_argument("--concurrency", type=int, default=8, help="multicall batches in flight")
     parser.add_argument("--chunk-size", type=int, default=50, help="ids per batchClaimWithdraw chunk")
     parser.add_argument("--out-dir", default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--checkpoint", default=str(DEFAULT_CHECKPOINT), help="incremental scan checkpoint file")
+    parser.add_argument("--full", action="store_true", help="rescan every finalized id, ignoring the checkpoint")
+    parser.add_argument("--owner-cache", default=str(DEFAULT_OWNER_CACHE), help="persistent owner EOA/contract cache")
+    parser.add_argument("--pack", action="store_true", help="pack claim chunks by simulating batchClaimWithdraw")
+    parser.add_argument("--gas-target", type=int, default=DEFAULT_GAS_TARGET, help="max estimated gas per packed chunk")
+    parser.add_argument("--sim-rpc", help="RPC to simulate on at its latest block (default: MAINNET_RPC_URL at the scan block)")
+    parser.add_argument("--sim-sender", default=DEFAULT_SIM_SENDER, help="msg.sender for the simulated claims")
     args = parser.parse_args()
 
     rpc = os.environ.get("MAINNET_RPC_URL")
@@ -66,43 +378,35 @@ def main():
     nft = WITHDRAW_REQUEST_NFT
 
     def read_uint32(sig):
-        raw = w3.eth.call({"to": nft, "data": Web3.keccak(text=sig)[:4]})
+        raw = w3.eth.call({"to": nft, "data": Web3.keccak(text=sig)[:4]}, block)
         return decode(["uint32"], raw)[0]
 
     next_request_id = read_uint32("nextRequestId()")
     last_finalized = read_uint32("lastFinalizedRequestId()")
     print(f"block={block} nextRequestId={next_request_id} lastFinalizedRequestId={last_finalized}")
 
-    unclaimed = []  # (id, owner, amountOfEEth, shareOfEEth, isValid)
-    ids = list(range(1, last_finalized + 1))
-    for start in range(0, len(ids), args.batch_size):
-        batch = ids[start : start + args.batch_size]
-        calls = []
-        for i in batch:
-            arg = encode(["uint256"], [i])
-            calls.append((nft, SEL_OWNER_OF + arg))
-            calls.append((nft, SEL_GET_REQUEST + arg))
-        results = multicall(w3, calls)
-        for j, i in enumerate(batch):
-            owner_ok, owner_raw = results[2 * j]
-            if not owner_ok:  # burned => already claimed (or seized+burned)
-                continue
-            owner = decode(["address"], owner_raw)[0]
-            _, req_raw = results[2 * j + 1]
-            amount, share, is_valid, _fee = decode(["uint96", "uint96", "bool", "uint32"], req_raw)
-            unclaimed.append((i, Web3.to_checksum_address(owner), amount, share, is_valid))
-        done = min(start + args.batch_size, len(ids))
-        print(f"\rscanned {done}/{len(ids)} ids, unclaimed so far: {len(unclaimed)}", end="", flush=True)
-    print()
+    # Only ids still open at the checkpoint (minus those burned since) and newly finalized ids
+    checkpoint_path = Path(args.checkpoint)
+    checkpoint = None if args.full else load_checkpoint(checkpoint_path, nft)
+    if checkpoint and checkpoint["block"] <= block:
+        burned = fetch_burned_ids(w3, nft, checkpoint["block"] + 1, block)
+        still_open = [i for i in checkpoint["open_ids"] if i not in burned]
+        first_new = checkpoint["last_scanned_id"] + 1
+        ids = still_open + list(range(first_new, last_finalized + 1))
+        print(f"checkpoint block={checkpoint['block']} lastScannedId={checkpoint['last_scanned_id']}: "
+              f"{len(checkpoint['open_ids']) - len(still_open)} claimed since, "
+              f"re-checking {len(still_open)} open + {max(0, last_finalized + 1 - first_new)} new ids")
+    else:
+        ids = list(range(1, last_finalized + 1))
+        print(f"full scan of {len(ids)} ids")
+
+    # (id, owner, amountOfEEth, shareOfEEth, isValid)
+    unclaimed = scan_requests(w3, nft, ids, block, args.batch_size, args.concurrency)
+    save_checkpoint(checkpoint_path, nft, block, last_finalized, [i for i, *_ in unclaimed])
 
     # Flag contract recipients: they can revert on ETH receive and brick a whole claim batch.
     owners = sorted({o for _, o, _, _, _ in unclaimed})
-    is_contract = {}
-    for start in range(0, len(owners), 200):
-        for o in owners[start : start + 200]:
-            is_contract[o] = len(w3.eth.get_code(o)) > 0
-        print(f"\rcode-checked {min(start + 200, len(owners))}/{len(owners)} owners", end="", flush=True)
-    print()
+    is_contract = classify_owners(rpc, owners, block, Path(args.owner_cache), args.concurrency)
 
     csv_path = os.path.join(args.out_dir, "unclaimed_finalized_requests.csv")
     with open(csv_path, "w", newline="") as f:
@@ -115,6 +419,21 @@ def main():
     invalid = [(i, o, a) for i, o, a, _, v in unclaimed if not v]
     eoa_ids = [i for i, o, _ in claimable if not is_contract[o]]
     contract_ids = [i for i, o, _ in claimable if is_contract[o]]
+    chunks = [eoa_ids[k : k + args.chunk_size] for k in range(0, len(eoa_ids), args.chunk_size)]
+    packing = None
+    unclaimable = []
+    if args.pack:
+        sim_rpc, tag = (args.sim_rpc, "latest") if args.sim_rpc else (rpc, hex(block))
+        heuristic_txs = len(chunks) + len(contract_ids)
+        packed, unclaimable = pack_claims(
+            sim_rpc, tag, args.sim_sender, nft, [i for i, _, _ in claimable], args.chunk_size, args.gas_target, args.concurrency
+        )
+        # Packed chunks cover every id that goes through (contract owners included)
+        contract_ids = []
+        print(f"packed {sum(len(c) for c, _ in packed)} ids into {len(packed)} batchClaimWithdraw txs, "
+              f"{len(unclaimable)} unclaimable (owner-type split: {heuristic_txs} txs)")
+        chunks = [c for c, _ in packed]
+        packing = {"gasTarget": args.gas_target, "simulatedAt": "latest" if args.sim_rpc else block, "chunkGas": [g for _, g in packed]}
 
     batches_path = os.path.join(args.out_dir, "claim_batches.json")
     with open(batches_path, "w") as f:
@@ -126,11 +445,12 @@ def main():
                 # exact wei sum over the claimable set; ExecuteClaims.s.sol requires this to
                 # equal the on-chain escrow accounting at execution time (drift detector)
                 "totalClaimableWei": str(sum(a for _, _, a in claimable)),
-                "batchClaimWithdraw_chunks_eoa_owners": [
-                    eoa_ids[k : k + args.chunk_size] for k in range(0, len(eoa_ids), args.chunk_size)
-                ],
+                "batchClaimWithdraw_chunks_eoa_owners": chunks,
                 "claim_individually_contract_owners": contract_ids,
+                # ids whose claim reverts even alone in simulation; ExecuteClaims.s.sol skips them
+                "unclaimable": unclaimable,
                 "excluded_invalid_requests": [i for i, _, _ in invalid],
+                **({"packing": packing} if packing else {}),
             },
             f,
             indent=2,
@@ -139,7 +459,10 @@ def main():
     total_eth = sum(a for _, _, a in claimable) / 1e18
     print(f"\nfinalized+unclaimed: {len(unclaimed)}  (valid/claimable: {len(claimable)}, invalid: {len(invalid)})")
     print(f"claimable ETH (sum of amountOfEEth): {total_eth:,.4f}")
-    print(f"contract-owned claimable ids (claim individually): {len(contract_ids)}")
+    if args.pack:
+        print(f"ids reverting alone in simulation (unclaimable, not executed): {len(unclaimable)}")
+    else:
+        print(f"contract-owned claimable ids (claim individually): {len(contract_ids)}")
     print(f"wrote {csv_path}")
     print(f"wrote {batches_path}")
 
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Prefix-sum index over every WithdrawRequestNFT request id: cumulative amountOfEEth and shareOfEEth.
+
+Claims delete getRequest, so the index is built from WithdrawRequestCreated logs, which keep the
+amount of every request ever made. It lives in ~/.cache/etherfi-withdrawals/queue-index.bin as one
+fixed 32-byte record per id (cumulative amount, cumulative shares, uint128 each; record 0 is zero)
+next to a small JSON with the last synced block and the ids currently invalidated by the guardian
+(WithdrawRequestInvalidated, undone by WithdrawRequestValidated). Each sync only reads logs after
+that block, so daily syncs scale with the new requests. Range sums are two record reads; budget
+queries bisect the cumulative column, O(log n). reach and forecast leave invalidated requests out,
+as finalization locks no ETH for them.
+
+Amounts are the requested amountOfEEth — an upper bound on the payout, which is capped by the
+share rate snapshotted at finalization.
+
+Usage:
+  MAINNET_RPC_URL=... python3 withdrawal_queue_index.py sync
+  MAINNET_RPC_URL=... python3 withdrawal_queue_index.py sum 1000 2000        # ids 1000..2000 inclusive
+  MAINNET_RPC_URL=... python3 withdrawal_queue_index.py reach 5000           # last id 5000 ETH finalizes
+  MAINNET_RPC_URL=... python3 withdrawal_queue_index.py forecast --budget 1000 --budget 5000
+  python3 withdrawal_queue_index.py sum 1 50000 --offline                    # answer from the index only
+"""
+
+import argparse
+import bisect
+import csv
+import json
+import os
+import sys
+from pathlib import Path
+
+from web3 import Web3
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fetch_unclaimed_finalized_requests import WITHDRAW_REQUEST_NFT, iter_logs, write_json
+
+CREATED_TOPIC = Web3.to_hex(Web3.keccak(text="WithdrawRequestCreated(uint32,uint256,uint256,address)"))
+INVALIDATED_TOPIC = Web3.to_hex(Web3.keccak(text="WithdrawRequestInvalidated(uint32)"))
+VALIDATED_TOPIC = Web3.to_hex(Web3.keccak(text="WithdrawRequestValidated(uint32)"))
+DEFAULT_INDEX = Path.home() / ".cache" / "etherfi-withdrawals" / "queue-index.bin"
+RECORD = 32  # cumulative amountOfEEth (uint128) + cumulative shareOfEEth (uint128)
+DEFAULT_CONFIRMATIONS = 12  # only index blocks this deep, so a reorg can't rewrite indexed ids
+
+
+class QueueIndex:
+    """Cumulative (amountOfEEth, shareOfEEth) by request id, backed by a flat bytearray of records."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.meta_path = self.path.with_suffix(".json")
+        try:
+            with open(self.meta_path) as f:
+                self.meta = json.load(f)
+        except (OSError, ValueError):
+            self.meta = {}
+        data = self.path.read_bytes() if self.meta and self.path.exists() else b""
+        # Records past the saved meta are from an interrupted save; drop them
+        self.data = bytearray(data[: self.meta.get("next_id", 1) * RECORD] or bytes(RECORD))
+        self.invalid = sorted(i for i in self.meta.get("invalid", []) if i < len(self))
+        self.invalid_prefix = None  # cumulative (amount, share) over self.invalid, built on first use
+
+    def clear(self):
+        """Drop every record, for a rebuild from the deploy block."""
+        self.meta, self.data, self.invalid, self.invalid_prefix = {}, bytearray(RECORD), [], None
+
+    def __len__(self):
+        """Number of records, i.e. the next request id to index."""
+        return len(self.data) // RECORD
+
+    def cumulative(self, request_id):
+        """(sum of amountOfEEth, sum of shareOfEEth) over ids 1..request_id."""
+        if not 0 <= request_id < len(self):
+            raise IndexError(f"request id {request_id} is not indexed (indexed up to {len(self) - 1})")
+        offset = request_id * RECORD
+        return (
+            int.from_bytes(self.data[offset : offset + 16], "big"),
+            int.from_bytes(self.data[offset + 16 : offset + 32], "big"),
+        )
+
+    def range_sum(self, first, last):
+        """(amountOfEEth, shareOfEEth) summed over ids first..last inclusive (ids start at 1)."""
+        if first < 1:
+            raise IndexError(f"request ids start at 1, got {first}")
+        hi, lo = self.cumulative(last), self.cumulative(first - 1)
+        return hi[0] - lo[0], hi[1] - lo[1]
+
+    def invalid_cumulative(self, request_id):
+        """(sum of amountOfEEth, sum of shareOfEEth) over the invalidated ids among 1..request_id."""
+        if self.invalid_prefix is None:
+            amount, share, self.invalid_prefix = 0, 0, [(0, 0)]
+            for invalid_id in self.invalid:
+                a, s = self.range_sum(invalid_id, invalid_id)
+                amount, share = amount + a, share + s
+                self.invalid_prefix.append((amount, share))
+        return self.invalid_prefix[bisect.bisect_right(self.invalid, request_id)]
+
+    def valid_range_sum(self, first, last):
+        """range_sum over ids first..last, leaving out invalidated requests."""
+        amount, share = self.range_sum(first, last)
+        hi, lo = self.invalid_cumulative(last), self.invalid_cumulative(first - 1)
+        return amount - (hi[0] - lo[0]), share - (hi[1] - lo[1])
+
+    def invalid_count(self, first, last):
+        """Number of invalidated ids among first..last inclusive."""
+        return bisect.bisect_right(self.invalid, last) - bisect.bisect_left(self.invalid, first)
+
+    def set_valid(self, request_id, valid):
+        """Record a WithdrawRequestInvalidated (valid=False) or WithdrawRequestValidated event."""
+        i = bisect.bisect_left(self.invalid, request_id)
+        listed = i < len(self.invalid) and self.invalid[i] == request_id
+        if valid and listed:
+            del self.invalid[i]
+        elif not valid and not listed:
+            self.invalid.insert(i, request_id)
+        self.invalid_prefix = None
+
+    def reach(self, after_id, budget_wei):
+        """Largest id X with valid amountOfEEth over ids after_id+1..X within budget_wei (after_id if none fit)."""
+        column = AmountColumn(self)
+        return bisect.bisect_right(column, column[after_id] + budget_wei, lo=after_id) - 1
+
+    def append(self, request_id, amount, share):
+        if request_id != len(self):
+            raise RuntimeError(f"expected request id {len(self)}, got {request_id}: logs missing, re-sync with --rebuild")
+        total_amount, total_share = self.cumulative(request_id - 1)
+        self.data += (total_amount + amount).to_bytes(16, "big") + (total_share + share).to_bytes(16, "big")
+
+    def save(self, nft, block):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(self.data)
+        os.replace(tmp, self.path)
+        self.meta = {"nft": nft, "block": block, "next_id": len(self), "invalid": self.invalid}
+        write_json(self.meta_path, self.meta)
+
+
+class AmountColumn:
+    """Sequence view of the cumulative valid amounts, so bisect reads only the records it probes."""
+
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, request_id):
+        return self.index.cumulative(request_id)[0] - self.index.invalid_cumulative(request_id)[0]
+
+
+def find_deploy_block(w3, address, head):
+    """First block at which address has code (binary search on eth_getCode)."""
+    lo, hi = 0, head
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if len(w3.eth.get_code(address, mid)) > 0:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def sync(w3, index, nft, confirmations):
+    """
+    Append WithdrawRequestCreated logs and apply invalidations since the last synced block.
+    Returns the number of new ids.
+    """
+    head = w3.eth.block_number - confirmations
+    if index.meta.get("nft", nft).lower() != nft.lower():
+        raise RuntimeError(f"index at {index.path} is for {index.meta['nft']}, not {nft}; use --index or --rebuild")
+    if index.meta and "invalid" not in index.meta:
+        print(f"index at {index.path} predates invalidation tracking; rebuilding")
+        index.clear()
+    start = index.meta["block"] + 1 if index.meta else find_deploy_block(w3, nft, head)
+    before = len(index)
+    topics = [[CREATED_TOPIC, INVALIDATED_TOPIC, VALIDATED_TOPIC]]
+    for logs in iter_logs(w3, nft, topics, start, head):
+        for log in sorted(logs, key=lambda l: (l["blockNumber"], l["logIndex"])):
+            topic = Web3.to_hex(bytes(log["topics"][0]))
+            request_id = int.from_bytes(bytes(log["topics"][1]), "big")
+            if topic != CREATED_TOPIC:
+                index.set_valid(request_id, topic == VALIDATED_TOPIC)
+                continue
+            data = bytes(log["data"])
+            index.append(request_id, int.from_bytes(data[0:32], "big"), int.from_bytes(data[32:64], "big"))
+        print(f"\rindexed through request id {len(index) - 1}", end="", flush=True)
+    print()
+    index.save(nft, max(head, start - 1))
+    print(f"synced to block {max(head, start - 1)}: {len(index) - before} new request ids, "
+          f"{len(index.invalid)} invalidated")
+    return len(index) - before
+
+
+def read_uint32(w3, nft, sig):
+    raw = bytes(w3.eth.call({"to": nft, "data": Web3.keccak(text=sig)[:4]}))
+    return int.from_bytes(raw[:32], "big")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Prefix-sum index over WithdrawRequestNFT request amounts",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python3 withdrawal_queue_index.py sync
+  python3 withdrawal_queue_index.py sum 1000 2000
+  python3 withdrawal_queue_index.py reach 5000 --after 120000
+  python3 withdrawal_queue_index.py forecast --budget 1000 --budget 5000 --out forecast.csv
+        """,
+    )
+    parser.add_argument("command", choices=["sync", "sum", "reach", "forecast"])
+    parser.add_argument("args", nargs="*", help="sum: FIRST_ID LAST_ID; reach: BUDGET_ETH")
+    parser.add_argument("--after", type=int, help="reach/forecast: count from this id (default: lastFinalizedRequestId)")
+    parser.add_argument("--budget", type=float, action="append", default=[], help="forecast: ETH budget milestone (repeatable)")
+    parser.add_argument("--out", help="forecast: CSV path (default: finalization_forecast.csv next to this script)")
+    parser.add_argument("--index", default=str(DEFAULT_INDEX), help="index file")
+    parser.add_argument("--confirmations", type=int, default=DEFAULT_CONFIRMATIONS)
+    parser.add_argument("--offline", action="store_true", help="query the index as is, without syncing or RPC reads")
+    parser.add_argument("--rebuild", action="store_true", help="discard the index and rebuild from the deploy block")
+    args = parser.parse_args()
+
+    index = QueueIndex(args.index)
+    nft = WITHDRAW_REQUEST_NFT
+    if args.rebuild:
+        index.clear()
+
+    w3 = None
+    if not args.offline:
+        rpc = os.environ.get("MAINNET_RPC_URL")
+        if not rpc:
+            sys.exit("MAINNET_RPC_URL not set (or pass --offline)")
+        w3 = Web3(Web3.HTTPProvider(rpc))
+        sync(w3, index, nft, args.confirmations)
+    if args.command == "sync":
+        return
+    if len(index) < 2:
+        sys.exit(f"index at {args.index} is empty - run sync first")
+
+    after = args.after
+    if after is None and args.command in ("reach", "forecast"):
+        if w3 is None:
+            sys.exit("--offline needs --after (lastFinalizedRequestId is read on-chain)")
+        after = read_uint32(w3, nft, "lastFinalizedRequestId()")
+    last = len(index) - 1
+
+    if args.command == "sum":
+        if len(args.args) != 2:
+            sys.exit("sum takes FIRST_ID LAST_ID")
+        first, end = int(args.args[0]), int(args.args[1])
+        if not 1 <= first <= end <= last:
+            parser.error(f"sum needs 1 <= FIRST_ID <= LAST_ID <= {last} (the last indexed id)")
+        amount, share = index.range_sum(first, end)
+        print(f"ids {first}..{end}: {end - first + 1} requests, amountOfEEth {amount / 1e18:,.6f} ETH "
+              f"({amount} wei), shareOfEEth {share}")
+        invalid = index.invalid_count(first, end)
+        if invalid:
+            valid_amount, _ = index.valid_range_sum(first, end)
+            print(f"  {invalid} invalidated; valid requests {valid_amount / 1e18:,.6f} ETH")
+
+    elif args.command == "reach":
+        if len(args.args) != 1:
+            sys.exit("reach takes BUDGET_ETH")
+        budget_wei = int(float(args.args[0]) * 1e18)
+        reached = index.reach(after, budget_wei)
+        amount, _ = index.valid_range_sum(after + 1, reached) if reached > after else (0, 0)
+        print(f"from id {after}: {args.args[0]} ETH finalizes through id {reached} "
+              f"({reached - after - index.invalid_count(after + 1, reached)} valid requests, "
+              f"{amount / 1e18:,.6f} ETH); indexed up to {last}")
+
+    elif args.command == "forecast":
+        out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "finalization_forecast.csv")
+        column = AmountColumn(index)
+        base = column[after]
+        invalid = set(index.invalid)
+        skipped = index.invalid_count(after + 1, last)
+        with open(out, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["requestId", "amountOfEEth_wei", "valid", "cumulative_wei", "cumulative_ether"])
+            for request_id in range(after + 1, last + 1):
+                amount, _ = index.range_sum(request_id, request_id)
+                cumulative = column[request_id] - base
+                writer.writerow([request_id, amount, request_id not in invalid, cumulative, f"{cumulative / 1e18:.6f}"])
+        pending, _ = index.valid_range_sum(after + 1, last) if last > after else (0, 0)
+        print(f"pending after id {after}: {last - after - skipped} valid requests, {pending / 1e18:,.6f} ETH "
+              f"({skipped} invalidated)")
+        for budget in args.budget:
+            reached = index.reach(after, int(budget * 1e18))
+            print(f"  {budget:,.2f} ETH finalizes through id {reached} "
+                  f"({reached - after - index.invalid_count(after + 1, reached)} valid requests)")
+        print(f"wrote {out}")
+
+
+if __name__ == "__main__":
+    main()